@@ -3,7 +3,6 @@ import os
 import sys
 import time
 
-import slam.driver as sdriver
 from slam.common.enums import RobotType
 from slam.config import config
 
@@ -12,6 +11,13 @@ if __name__ == "__main__":
     logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
 
     argv = sys.argv[1:]
+    if len(argv) > 0 and argv[0].lower() == "batch":
+        # Headless, without importing the display
+        import slam.batch as sbatch
+        sbatch.main(argv[1:])
+        sys.exit()
+
+    import slam.driver as sdriver
     rtype = RobotType.SIMULATED
 
     for a in argv:
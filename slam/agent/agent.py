@@ -2,15 +2,16 @@ import logging
 import queue
 import random
 import threading
-import time
 
+import slam.common.clock as sclock
 import slam.common.datapoint as datapoint
 
 
 class Agent(threading.Thread):
-    def __init__(self, data_queue: queue.Queue):
+    def __init__(self, data_queue: queue.Queue, clock: sclock.Clock = None):
         threading.Thread.__init__(self)
         self.data_queue = data_queue
+        self.clock = clock if clock is not None else sclock.RealTimeClock()
         self.shutdown_flag = threading.Event()
         logging.info(f"Using agent: {type(self).__name__}")
 
@@ -25,7 +26,7 @@ class Agent(threading.Thread):
         Dummy action
         """
         logging.info("Alive")
-        time.sleep(1)
+        self.clock.sleep(1)
         if random.random() < 0.9:
             x = random.randint(0, 10)
             y = random.randint(0, 10)
@@ -2,32 +2,40 @@ import logging
 import queue
 import random
 import socket
-import time
 
 import slam.agent.agent as agent
 import slam.agent.sensor as sensor
+import slam.common.clock as sclock
 import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
 import slam.planner.action as action
 import slam.planner.planner as planner
 import slam.ssocket as ssocket
+import slam.world.factory as wfactory
 import slam.world.observed as oworld
+import slam.world.occupancy as occupancy
 import slam.world.simulated as sworld
-from slam.common.enums import Message, PathId
+from slam.common.enums import Message, PathId, PlannerType, WorldType
 from slam.config import config
 
 
 class Robot(agent.Agent):
     def __init__(self, data_queue: queue.Queue, origin: geometry.Pose = None,
                  robot_size: float = 10.0, scanning_precision: int = 20,
-                 view_angle: int = 180, **kwargs):
-        super().__init__(data_queue)
+                 view_angle: int = 180,
+                 occupancy_model: occupancy.OccupancyModel = None,
+                 planner_type: PlannerType = PlannerType.RRT,
+                 planner_params: dict = None, clock: sclock.Clock = None,
+                 **kwargs):
+        super().__init__(data_queue, clock)
         self.pose = origin if origin else geometry.Pose(0, 0, 0)
         self.robot_size = robot_size
         self.scanning_precision = scanning_precision
         self.view_angle = view_angle
+        self.planner_type = planner_type
+        self.planner_params = planner_params if planner_params else {}
         self.observation_queue = queue.Queue()
-        self.observed_world = oworld.ObservedWorld()
+        self.observed_world = oworld.ObservedWorld(occupancy_model)
 
         self.init_planner()
         self.init_sensor()
@@ -40,7 +48,8 @@ class Robot(agent.Agent):
     def init_sensor(self):
         self.scanner = sensor.DummySensor(self.observation_queue,
                                           self.view_angle,
-                                          self.scanning_precision)
+                                          self.scanning_precision,
+                                          clock=self.clock)
 
     def init_planner(self):
         move_action = action.Action(self.move_forward)
@@ -63,44 +72,51 @@ class Robot(agent.Agent):
     def scan(self):
         logging.info(f"Scan {self.view_angle/2} in each direction.")
         self.scanner.scan_flag.set()
-        while not self.shutdown_flag.is_set() and \
-                (measurement := self.observation_queue.get()) is not None:
-            polar = measurement.polar
-            polar.change(angle=self.pose.orientation.in_degrees())
-            location = self.pose.position.plus_polar(polar)
-            observed_data = datapoint.Observation(*location, measurement.type)
-            self.data_queue.put(observed_data)
+        while not self.shutdown_flag.is_set():
+            try:
+                frame = self.observation_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            observations = frame.to_observations(self.pose)
+            self.data_queue.put(observations)
             pose_data = datapoint.Pose(*self.pose)
-            self.observed_world.add_observation(pose_data, observed_data)
+            self.observed_world.add_observations(pose_data, observations)
+            return
 
     def perform_action(self):
         self.scan()
-        action = self.planner.select_next_action(self.pose)
+        actions = self.planner.select_next_actions(self.pose)
 
+        # Waiting for the display is not part of the robot's time
         while not self.data_queue.empty():
-            time.sleep(0.5)
-            if self.shutdown_flag.is_set():
+            if self.shutdown_flag.wait(0.5):
                 logging.info("Shutdown flag set")
                 return False
 
-        if action is None:
+        if len(actions) == 0:
             logging.info("Done")
             return False
 
-        time.sleep(1)
+        for next_action in actions:
+            if self.shutdown_flag.is_set():
+                logging.info("Shutdown flag set")
+                return False
 
-        action.execute()
+            self.clock.sleep(1)
 
-        logging.info(f"\tNew pose: {self.pose}")
+            next_action.execute()
 
-        data = datapoint.Pose(*self.pose, path_id=PathId.ROBOT_HISTORY)
-        self.data_queue.put(data)
+            logging.info(f"\tNew pose: {self.pose}")
+
+            data = datapoint.Pose(*self.pose, path_id=PathId.ROBOT_HISTORY)
+            self.data_queue.put(data)
 
         self.data_queue.put(Message.DELETE_TEMPORARY_DATA)
 
         return True
 
     def die(self):
+        self.planner.shutdown()
         self.scanner.shutdown_flag.set()
         self.scanner.join()
         logging.info("Dead")
@@ -109,12 +125,22 @@ class Robot(agent.Agent):
 class SimulatedRobot(Robot):
     def __init__(self, data_queue: queue.Queue, robot_size: float = 10.0,
                  scanning_precision: int = 20, view_angle: int = 180,
-                 world_number: int = 0, limited_view: float = None):
-        self.simulated_world = sworld.PredefinedWorld(world_number)
+                 world_number: int = 0, limited_view: float = None,
+                 occupancy_model: occupancy.OccupancyModel = None,
+                 planner_type: PlannerType = PlannerType.RRT,
+                 planner_params: dict = None, clock: sclock.Clock = None,
+                 world_type: WorldType = WorldType.PREDEFINED,
+                 world_params: dict = None):
+        if world_type == WorldType.PREDEFINED:
+            self.simulated_world = sworld.PredefinedWorld(world_number)
+        else:
+            self.simulated_world = wfactory.create_world(
+                world_type, **(world_params or {}))
         self.limited_view = limited_view
         origin = self.simulated_world.pose
         super().__init__(data_queue, origin, robot_size, scanning_precision,
-                         view_angle)
+                         view_angle, occupancy_model, planner_type,
+                         planner_params, clock)
 
     def init_sensor(self):
         args = [
@@ -123,7 +149,8 @@ class SimulatedRobot(Robot):
         ]
         kwargs = {
             "view_angle": self.view_angle,
-            "precision": self.scanning_precision
+            "precision": self.scanning_precision,
+            "clock": self.clock,
         }
         if self.limited_view is not None:
             scanner = sensor.LimitedInformationSensor
@@ -137,12 +164,17 @@ class SimulatedRobot(Robot):
         turn_action = action.Action(self.rotate)
         move_action = action.Action(self.move_forward)
         turn_move_action = action.Action(self.rotate_move_action)
-        self.planner = planner.RrtPlanner(self.observed_world, self.data_queue,
-                                          turn_action=turn_action,
-                                          move_action=move_action,
-                                          turn_move_action=turn_move_action,
-                                          shutdown_flag=self.shutdown_flag,
-                                          robot_size=self.robot_size)
+        params = {"view_angle": self.view_angle,
+                  "scanning_precision": self.scanning_precision}
+        if self.limited_view is not None:
+            params["sensor_range"] = self.limited_view
+        params.update(self.planner_params)
+        self.planner = planner.create_planner(
+            self.planner_type, self.observed_world, self.data_queue,
+            turn_action=turn_action, move_action=move_action,
+            turn_move_action=turn_move_action,
+            shutdown_flag=self.shutdown_flag, robot_size=self.robot_size,
+            **params)
 
     def scan(self):
         self.simulated_world.update_pose(self.pose)
@@ -158,18 +190,22 @@ class LegoRobot(Robot):
         self.scanner = sensor.LegoIrSensor(self.observation_queue, self.socket,
                                            self.view_angle,
                                            self.scanning_precision,
-                                           self.robot_size / 2)
+                                           self.robot_size / 2,
+                                           clock=self.clock)
 
     def init_planner(self):
         turn_action = action.Action(self.rotate)
         move_action = action.Action(self.move_forward)
         turn_move_action = action.Action(self.rotate_move_action)
-        self.planner = planner.RrtPlanner(self.observed_world, self.data_queue,
-                                          turn_action=turn_action,
-                                          move_action=move_action,
-                                          turn_move_action=turn_move_action,
-                                          shutdown_flag=self.shutdown_flag,
-                                          robot_size=self.robot_size)
+        params = {"view_angle": self.view_angle,
+                  "scanning_precision": self.scanning_precision}
+        params.update(self.planner_params)
+        self.planner = planner.create_planner(
+            self.planner_type, self.observed_world, self.data_queue,
+            turn_action=turn_action, move_action=move_action,
+            turn_move_action=turn_move_action,
+            shutdown_flag=self.shutdown_flag, robot_size=self.robot_size,
+            **params)
 
     def init_socket(self):
         self.socket = ssocket.Socket(config.HOST, config.PORT)
@@ -1,10 +1,17 @@
+from __future__ import annotations
+
 import logging
 import queue
 import random
 import socket
 import threading
 import time
+from typing import List
+
+import numpy as np
 
+import slam.common.clock as sclock
+import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
 import slam.ssocket as ssocket
 import slam.world.simulated as sworld
@@ -13,19 +20,19 @@ from slam.common.enums import ObservationType
 
 class Sensor(threading.Thread):
     def __init__(self, data_queue: queue.Queue, view_angle: int = 360,
-                 precision: int = 20):
+                 precision: int = 20, clock: sclock.Clock = None):
         threading.Thread.__init__(self)
         self.data_queue = data_queue
         self.shutdown_flag = threading.Event()
         self.scan_flag = threading.Event()
         self.view_angle = view_angle
         self.precision = precision
+        self.clock = clock if clock is not None else sclock.RealTimeClock()
 
     def run(self):
         logging.info(f"Turned sensor {type(self).__name__} on")
         while not self.shutdown_flag.is_set():
-            self.scan_flag.wait(1)
-            if self.scan_flag.is_set():
+            if self.clock.wait(self.scan_flag, 1):
                 self.scan()
                 self.scan_flag.clear()
         logging.info("Turned sensor off")
@@ -33,27 +40,27 @@ class Sensor(threading.Thread):
 
 class DummySensor(Sensor):
     """
-    Scanner for dummy scanning. Put scanned values to a queue (as polar
-    coordinates). Put None to the queue when scanning is over.
+    Scanner for dummy scanning. Put a ScanFrame of scanned values to a queue
+    when scanning is over.
     """
     def __init__(self, data_queue: queue.Queue, view_angle: int = 360,
-                 precision: int = 20):
-        super().__init__(data_queue, view_angle, precision)
+                 precision: int = 20, clock: sclock.Clock = None):
+        super().__init__(data_queue, view_angle, precision, clock)
 
     def scan(self):
         logging.info("Scanning started")
         prev_measurement = 10
         start_angle = int(- self.view_angle / 2)
+        measurements = []
         for angle in range(start_angle, start_angle + self.view_angle + 1,
                            self.precision):
             new_measurement = prev_measurement + random.random() * 2 - 1
             polar = geometry.Polar(angle, new_measurement)
-            data = SensorMeasurement(polar, ObservationType.OBSTACLE)
-
-            self.data_queue.put(data)
+            measurements.append(
+                SensorMeasurement(polar, ObservationType.OBSTACLE))
             prev_measurement = new_measurement
-            time.sleep(0.5)
-        self.data_queue.put(None)
+            self.clock.sleep(0.5)
+        self.data_queue.put(ScanFrame.from_measurements(measurements))
         logging.info("Scanning finished")
 
 
@@ -63,22 +70,24 @@ class SimulatedSensor(Sensor):
     """
     def __init__(self, simulated_world: sworld.SimulatedWorld,
                  data_queue: queue.Queue, view_angle: int = 360,
-                 precision: int = 20):
-        super().__init__(data_queue, view_angle, precision)
+                 precision: int = 20, clock: sclock.Clock = None):
+        super().__init__(data_queue, view_angle, precision, clock)
         self.world = simulated_world
 
     def scan(self):
         logging.info("Scanning started")
         start_angle = int(- self.view_angle / 2)
-        for angle in range(start_angle, start_angle + self.view_angle + 1,
-                           self.precision):
-            data = self.measure(angle)
-            self.data_queue.put(data)
-            time.sleep(0.2)
-        self.data_queue.put(None)
+        angles = np.arange(start_angle, start_angle + self.view_angle + 1,
+                           self.precision)
+        frame = self.measure_frame(angles)
+        self.clock.sleep(0.2 * len(frame))
+        self.data_queue.put(frame)
         logging.info("Scanning finished")
 
-    def measure(self, angle):
+    def measure(self, angle) -> SensorMeasurement:
+        return self.measure_frame([angle])[0]
+
+    def measure_frame(self, angles: np.ndarray) -> ScanFrame:
         raise NotImplementedError
 
 
@@ -86,11 +95,10 @@ class FullInformationSensor(SimulatedSensor):
     """
     Sensor that has full information about the world.
     """
-    def measure(self, angle):
-        measurement = self.world.get_distance_to_wall(angle)
-        polar = geometry.Polar(angle, measurement)
-        data = SensorMeasurement(polar, ObservationType.OBSTACLE)
-        return data
+    def measure_frame(self, angles: np.ndarray) -> ScanFrame:
+        distances = self.world.cast_rays(angles)
+        types = np.full(len(distances), ObservationType.OBSTACLE)
+        return ScanFrame(angles, distances, types)
 
 
 class LimitedInformationSensor(SimulatedSensor):
@@ -103,17 +111,13 @@ class LimitedInformationSensor(SimulatedSensor):
         self.max_distance = max_distance
         self.safety_distance = safety_distance
 
-    def measure(self, angle):
-        measurement = self.world.get_distance_to_wall(angle)
-        if measurement > self.max_distance:
-            measurement = self.max_distance - self.safety_distance
-            otype = ObservationType.FREE
-        else:
-            otype = ObservationType.OBSTACLE
-
-        polar = geometry.Polar(angle, measurement)
-        data = SensorMeasurement(polar, otype)
-        return data
+    def measure_frame(self, angles: np.ndarray) -> ScanFrame:
+        distances = self.world.cast_rays(angles, self.max_distance)
+        free = distances > self.max_distance
+        distances[free] = self.max_distance - self.safety_distance
+        types = np.where(free, ObservationType.FREE,
+                         ObservationType.OBSTACLE)
+        return ScanFrame(angles, distances, types)
 
 
 class LegoIrSensor(Sensor):
@@ -128,8 +132,8 @@ class LegoIrSensor(Sensor):
     """
     def __init__(self, data_queue: queue.Queue, socket: socket.socket,
                  view_angle: int = 360, precision: int = 20,
-                 safety_distance: float = 10.0):
-        super().__init__(data_queue, view_angle, precision)
+                 safety_distance: float = 10.0, clock: sclock.Clock = None):
+        super().__init__(data_queue, view_angle, precision, clock)
         self.socket = socket
         self.safety_distance = safety_distance
 
@@ -145,6 +149,8 @@ class LegoIrSensor(Sensor):
         num_steps = self.view_angle // self.precision + 1
         increasing = self.orientation.in_degrees() < 0
 
+        measurements = []
+
         @ssocket.handle_socket_error
         def loop():
             self.socket.send(f"SCAN {self.precision} {num_steps} {increasing}")
@@ -162,8 +168,7 @@ class LegoIrSensor(Sensor):
 
                 polar_angle = self.orientation.in_degrees() + angle
                 polar = geometry.Polar(polar_angle, measurement)
-                data = SensorMeasurement(polar, otype)
-                self.data_queue.put(data)
+                measurements.append(SensorMeasurement(polar, otype))
         loop()
 
         total_rotation = (num_steps - 1) * self.precision
@@ -171,7 +176,7 @@ class LegoIrSensor(Sensor):
             total_rotation = -total_rotation
         self.rotate(total_rotation)
 
-        self.data_queue.put(None)
+        self.data_queue.put(ScanFrame.from_measurements(measurements))
         logging.info("Scanning finished")
 
     def rotate(self, angle):
@@ -185,3 +190,45 @@ class SensorMeasurement():
     def __init__(self, polar: geometry.Polar, otype: ObservationType):
         self.polar = polar
         self.type = otype
+
+
+class ScanFrame():
+    """
+    Measurements of one scan: angles (in degrees, wrt. sensor coordinate
+    system), ranges and observation types, one array element per
+    measurement.
+    """
+    def __init__(self, angles: np.ndarray, ranges: np.ndarray,
+                 types: np.ndarray):
+        self.angles = np.asarray(angles, dtype=float)
+        self.ranges = np.asarray(ranges, dtype=float)
+        self.types = np.asarray(types, dtype=object)
+
+    @classmethod
+    def from_measurements(cls, measurements: List[SensorMeasurement]) \
+            -> ScanFrame:
+        return cls([m.polar.angle.in_degrees() for m in measurements],
+                   [m.polar.radius for m in measurements],
+                   [m.type for m in measurements])
+
+    def __getitem__(self, key: int) -> SensorMeasurement:
+        if not isinstance(key, int):
+            raise TypeError("Wrong key type")
+        if key >= 0 and key < len(self.angles):
+            polar = geometry.Polar(self.angles[key], self.ranges[key])
+            return SensorMeasurement(polar, self.types[key])
+        raise IndexError(f"Key {key} out of range for array of length "
+                         f"{len(self.angles)}")
+
+    def __len__(self):
+        return len(self.angles)
+
+    def to_observations(self, pose: geometry.Pose) -> datapoint.Observations:
+        """
+        Returns locations of measurements made from pose in world
+        coordinates.
+        """
+        angles = np.radians(self.angles + pose.orientation.in_degrees())
+        xs = pose.position.x + self.ranges * np.cos(angles)
+        ys = pose.position.y + self.ranges * np.sin(angles)
+        return datapoint.Observations(*pose.position, xs, ys, self.types)
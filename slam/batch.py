@@ -0,0 +1,215 @@
+"""
+Headless runs of many simulated exploration episodes. Nothing is drawn, so
+matplotlib is not needed.
+"""
+import argparse
+import concurrent.futures
+import itertools
+import json
+import logging
+import multiprocessing
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+import slam.agent.robot as robot
+import slam.common.clock as sclock
+import slam.common.datapoint as datapoint
+import slam.world.occupancy as occupancy
+import slam.world.simulated as sworld
+from slam.common.enums import PathId, RobotType, WorldType
+from slam.config import config
+
+
+class EpisodeRecorder():
+    """
+    Takes the place of the display queue of a robot and collects metrics
+    from the data it receives. It is always empty, so the robot never waits
+    for it.
+    """
+    def __init__(self):
+        self.steps = 0
+        self.scans = 0
+        self.distance = 0.0
+        self.position = None
+
+    def put(self, data):
+        if isinstance(data, datapoint.Observations):
+            self.scans += 1
+        elif isinstance(data, datapoint.Pose) and \
+                data.path_id == PathId.ROBOT_HISTORY:
+            if self.position is not None:
+                self.steps += 1
+                self.distance += self.position.distance_to(data.location)
+            self.position = data.location
+
+    def empty(self) -> bool:
+        return True
+
+
+def get_coverage(simulated_world: sworld.SimulatedWorld,
+                 agent: robot.Robot) -> float:
+    """
+    Fraction of cells of the simulated world that are known (free or
+    obstacle) in the last prediction of the robot.
+    """
+    observed = agent.observed_world
+    if observed.last_prediction is None:
+        return 0.0
+    known_y, known_x = np.nonzero(abs(observed.last_prediction) >= 1)
+    x = np.rint(known_x + observed.prediction_origin.x).astype(int)
+    y = np.rint(known_y + observed.prediction_origin.y).astype(int)
+    height, width = simulated_world.map.shape
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    return float(np.count_nonzero(inside) / simulated_world.map.size)
+
+
+def run_episode(episode: Dict) -> Dict:
+    """
+    Runs one exploration episode with a virtual clock and returns its
+    metrics. episode has keys world, seed, max_steps and values of
+    SCANNING_PRECISION, VIEW_ANGLE, LIMITED_VIEW and ROBOT_SIZE. The rest of
+    the configuration is read from config. Worlds other than predefined ones
+    are generated (or placed, for bitmaps) with the seed of the episode.
+    """
+    if config.rtype is None:
+        # Worker processes start with a fresh config
+        config.setup(RobotType.SIMULATED)
+    random.seed(episode["seed"])
+    np.random.seed(episode["seed"])
+    world_params = config.WORLD_PARAMS
+    if config.WORLD_TYPE != WorldType.PREDEFINED:
+        world_params = {**world_params, "seed": episode["seed"]}
+
+    clock = sclock.VirtualClock()
+    recorder = EpisodeRecorder()
+    start_time = time.monotonic()
+    agent = robot.SimulatedRobot(
+        recorder, robot_size=episode["ROBOT_SIZE"],
+        scanning_precision=episode["SCANNING_PRECISION"],
+        view_angle=episode["VIEW_ANGLE"], world_number=episode["world"],
+        limited_view=episode["LIMITED_VIEW"],
+        occupancy_model=occupancy.create_model(
+            config.OCCUPANCY_MODEL, **config.OCCUPANCY_MODEL_PARAMS),
+        planner_type=config.PLANNER, planner_params=config.PLANNER_PARAMS,
+        clock=clock, world_type=config.WORLD_TYPE,
+        world_params=world_params)
+
+    coverage = []
+    finished = False
+    try:
+        while recorder.steps < episode["max_steps"]:
+            if not agent.perform_action():
+                finished = True
+                break
+            coverage.append([round(clock.time(), 2),
+                             get_coverage(agent.simulated_world, agent)])
+    finally:
+        agent.die()
+
+    return {
+        **episode,
+        "world_type": config.WORLD_TYPE.name,
+        "finished": finished,
+        "steps": recorder.steps,
+        "scans": recorder.scans,
+        "distance": recorder.distance,
+        "coverage": coverage,
+        "planner_failures": agent.planner.failed_plans,
+        "robot_time": clock.time(),
+        "wall_time": time.monotonic() - start_time,
+    }
+
+
+def create_episodes(worlds: List[int], seeds: List[int],
+                    variants: Dict[str, List], max_steps: int) -> List[Dict]:
+    """
+    Returns episodes for every combination of a world, a seed and values of
+    variants (lists of values of config keys, see run_episode).
+    """
+    keys = list(variants.keys())
+    episodes = []
+    for (world, seed, *values) in itertools.product(
+            worlds, seeds, *[variants[k] for k in keys]):
+        episode = {"world": world, "seed": seed, "max_steps": max_steps}
+        episode.update(zip(keys, values))
+        episodes.append(episode)
+    return episodes
+
+
+def run_batch(episodes: List[Dict], filename: str, workers: int = None):
+    """
+    Runs episodes in parallel processes and appends metrics of each episode
+    as a line of JSON to filename as soon as it finishes.
+    """
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=context) as executor, \
+            open(filename, "a") as results:
+        futures = {executor.submit(run_episode, e): e for e in episodes}
+        for (i, future) in enumerate(
+                concurrent.futures.as_completed(futures)):
+            episode = futures[future]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                logging.error(f"Episode {episode} failed: {e!r}")
+                metrics = {**episode, "error": repr(e)}
+            results.write(json.dumps(metrics) + "\n")
+            results.flush()
+            logging.info(f"Finished {i + 1}/{len(episodes)} episodes")
+
+
+def parse_limited_view(value: str) -> float:
+    if value.lower() == "none":
+        return None
+    return float(value)
+
+
+def main(argv: List[str]):
+    config.setup(RobotType.SIMULATED)
+    parser = argparse.ArgumentParser(
+        prog="python -m slam batch",
+        description="Run simulated exploration episodes without a display. "
+                    "Options with several values are combined into a grid "
+                    "of episodes; the rest of the configuration is read "
+                    "from slam/config.py.")
+    parser.add_argument("--worlds", type=int, nargs="+",
+                        help="numbers of predefined worlds, only used if "
+                             "WORLD_TYPE is WorldType.PREDEFINED (other "
+                             "worlds are generated from --seeds)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--scanning-precision", type=int, nargs="+",
+                        default=[config.SCANNING_PRECISION])
+    parser.add_argument("--view-angle", type=int, nargs="+",
+                        default=[config.VIEW_ANGLE])
+    parser.add_argument("--limited-view", type=parse_limited_view,
+                        nargs="+", default=[config.LIMITED_VIEW],
+                        help="'none' for unlimited view")
+    parser.add_argument("--robot-size", type=float, nargs="+",
+                        default=[config.ROBOT_SIZE])
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="results.jsonl")
+    args = parser.parse_args(argv)
+
+    variants = {
+        "SCANNING_PRECISION": args.scanning_precision,
+        "VIEW_ANGLE": args.view_angle,
+        "LIMITED_VIEW": args.limited_view,
+        "ROBOT_SIZE": args.robot_size,
+    }
+    worlds = args.worlds
+    if config.WORLD_TYPE != WorldType.PREDEFINED:
+        if worlds is not None:
+            logging.warning(f"--worlds is ignored for {config.WORLD_TYPE}")
+        worlds = [None]
+    elif worlds is None:
+        worlds = [config.WORLD_NUMBER]
+    episodes = create_episodes(worlds, args.seeds, variants,
+                               args.max_steps)
+    logging.info(f"Running {len(episodes)} episodes, results are written "
+                 f"to {args.output}")
+    run_batch(episodes, args.output, args.workers)
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from slam.common.enums import ClockType
+
+
+class Clock():
+    """
+    Source of time for the agent, its sensors and the driver. Simulated
+    delays (waiting for a scan, a move or the display) go through a clock so
+    that simulations can run faster than real time.
+    """
+    def time(self) -> float:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float):
+        raise NotImplementedError
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        """
+        Waits until event is set or timeout passes. Returns whether the event
+        is set.
+        """
+        raise NotImplementedError
+
+
+class RealTimeClock(Clock):
+    def time(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout)
+
+
+class VirtualClock(Clock):
+    """
+    Clock that runs as fast as possible: sleeping only moves the clock
+    forward. Sleeps of all threads add up. Waiting for an event is
+    synchronization between threads, so it still blocks until another thread
+    sets the event (or the timeout passes in real time) and does not move the
+    clock.
+    """
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.lock = threading.Lock()
+
+    def time(self) -> float:
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+        # Let other threads run
+        time.sleep(0)
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout)
+
+    def advance(self, seconds: float):
+        with self.lock:
+            self.now += max(seconds, 0.0)
+
+
+def create_clock(clock_type: ClockType, **kwargs) -> Clock:
+    if clock_type == ClockType.REAL_TIME:
+        return RealTimeClock(**kwargs)
+    if clock_type == ClockType.VIRTUAL:
+        return VirtualClock(**kwargs)
+    raise TypeError(f"Unknown clock type {clock_type}")
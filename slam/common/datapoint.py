@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import List
 
+import numpy as np
+
 import slam.common.enums as enums
 import slam.common.geometry as geometry
 from slam.common.enums import Existence, ObservationType
@@ -33,16 +35,52 @@ class DataPoint():
         raise IndexError("Only index 0 is accepted")
 
 
+OBSERVATION_COLORS = {
+    ObservationType.OBSTACLE: (0.1, 0.2, 0.9, 0.3),
+    ObservationType.FREE: (0.4, 1.0, 0.1, 0.3),
+}
+
+
 class Observation(DataPoint):
     def __init__(self, x, y, otype: ObservationType):
-        if otype == ObservationType.OBSTACLE:
-            c = (0.1, 0.2, 0.9, 0.3)
-        elif otype == ObservationType.FREE:
-            c = (0.4, 1.0, 0.1, 0.3)
-        super().__init__(x, y, color=c)
+        super().__init__(x, y, color=OBSERVATION_COLORS[otype])
         self.type = otype
 
 
+class Observations(DataPoint):
+    """
+    Observations made from one pose at once.
+    (x, y) is the location of the pose; xs, ys and types are arrays with one
+    element per observation.
+    """
+    def __init__(self, x, y, xs: np.ndarray, ys: np.ndarray,
+                 types: np.ndarray):
+        super().__init__(x, y)
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.types = np.asarray(types, dtype=object)
+
+    def __getitem__(self, key) -> Observation:
+        if not isinstance(key, int):
+            raise TypeError("Wrong key type")
+        if key >= 0 and key < len(self.xs):
+            return Observation(self.xs[key], self.ys[key], self.types[key])
+        raise IndexError(f"Key {key} out of range for array of length "
+                         f"{len(self.xs)}")
+
+    def __len__(self):
+        return len(self.xs)
+
+    def get_colors(self) -> np.ndarray:
+        """
+        Returns RGBA colors of observations, one row per observation.
+        """
+        colors = np.empty([len(self.types), 4])
+        for (otype, color) in OBSERVATION_COLORS.items():
+            colors[self.types == otype] = color
+        return colors
+
+
 class Pose(DataPoint):
     def __init__(self, x, y, angle, path_id: int = None):
         c = (0.9, 0.2, 0.1, 0.3)
@@ -28,3 +28,26 @@ class ObservationType(enum.Enum):
 class RobotType(enum.Enum):
     SIMULATED = enum.auto()
     LEGO = enum.auto()
+
+
+class OccupancyModelType(enum.Enum):
+    EVIDENCE = enum.auto()
+    LOG_ODDS = enum.auto()
+
+
+class PlannerType(enum.Enum):
+    RRT = enum.auto()
+    GRID = enum.auto()
+
+
+class ClockType(enum.Enum):
+    REAL_TIME = enum.auto()
+    VIRTUAL = enum.auto()
+
+
+class WorldType(enum.Enum):
+    PREDEFINED = enum.auto()
+    ROOMS = enum.auto()
+    CLUTTERED = enum.auto()
+    MAZE = enum.auto()
+    BITMAP = enum.auto()
@@ -115,7 +115,9 @@ class Map():
         ]
 
     def add_data(self, data: datapoint.DataPoint):
-        if data.graph_type == GraphType.SCATTER:
+        if isinstance(data, datapoint.Observations):
+            self.storage.add_scatter_batch(data)
+        elif data.graph_type == GraphType.SCATTER:
             for d in data:
                 self.storage.add_scatter_data(d)
                 if self.draw_path and data.path_id is not None:
@@ -29,6 +29,9 @@ class MapStorage():
     def add_scatter_data(self, data: datapoint.DataPoint):
         self.scatter_storage.add_data(data)
 
+    def add_scatter_batch(self, data: datapoint.Observations):
+        self.scatter_storage.add_batch(data)
+
     def add_heatmap_data(self, data: datapoint.DataPoint):
         self.heatmap_storage.set_data(data)
 
@@ -48,6 +51,9 @@ class ScatterStorage():
     def add_data(self, data: datapoint.DataPoint):
         self.data[data.existence].add_data(data)
 
+    def add_batch(self, data: datapoint.Observations):
+        self.data[data.existence].add_batch(data)
+
     def get_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         data = np.vstack([self.data[e].get_data() for e in Existence])
         x_data = data[:, 0]
@@ -70,6 +76,10 @@ class ScatterStorageEntry():
     def add_data(self, data: datapoint.DataPoint):
         self.data = np.vstack((self.data, [*data.location, *data.color]))
 
+    def add_batch(self, data: datapoint.Observations):
+        rows = np.column_stack((data.xs, data.ys, data.get_colors()))
+        self.data = np.vstack((self.data, rows))
+
     def get_data(self):
         return self.data
 
@@ -3,12 +3,24 @@ import queue
 import time
 
 import slam.agent.robot as robot
+import slam.common.clock as sclock
 import slam.display.map as smap
-from slam.common.enums import Message, RobotType
+import slam.world.occupancy as occupancy
+from slam.common.enums import ClockType, Message, RobotType
 from slam.config import config
 
 
-def init_robot(rtype: RobotType, data_queue: queue.Queue) -> robot.Robot:
+def init_clock(rtype: RobotType) -> sclock.Clock:
+    clock_type = config.CLOCK
+    if rtype == RobotType.LEGO and clock_type != ClockType.REAL_TIME:
+        logging.warning(f"{clock_type} is not supported by the LEGO robot. "
+                        f"Using real time.")
+        clock_type = ClockType.REAL_TIME
+    return sclock.create_clock(clock_type)
+
+
+def init_robot(rtype: RobotType, data_queue: queue.Queue,
+               clock: sclock.Clock = None) -> robot.Robot:
     args = [
         data_queue,
     ]
@@ -16,10 +28,17 @@ def init_robot(rtype: RobotType, data_queue: queue.Queue) -> robot.Robot:
         "robot_size": config.ROBOT_SIZE,
         "scanning_precision": config.SCANNING_PRECISION,
         "view_angle": config.VIEW_ANGLE,
+        "occupancy_model": occupancy.create_model(
+            config.OCCUPANCY_MODEL, **config.OCCUPANCY_MODEL_PARAMS),
+        "planner_type": config.PLANNER,
+        "planner_params": config.PLANNER_PARAMS,
+        "clock": clock,
     }
 
     if rtype == RobotType.SIMULATED:
         kwargs["world_number"] = config.WORLD_NUMBER
+        kwargs["world_type"] = config.WORLD_TYPE
+        kwargs["world_params"] = config.WORLD_PARAMS
         kwargs["limited_view"] = config.LIMITED_VIEW
         agent = robot.SimulatedRobot(*args, **kwargs)
     elif rtype == RobotType.LEGO:
@@ -34,7 +53,9 @@ def run(rtype: RobotType, save: bool = False, filename: str = None):
     map = smap.Map(robot_size=config.ROBOT_SIZE, filename=filename,
                    save_params=config.SAVE_PARAMS)
     data_queue = queue.Queue()
-    agent = init_robot(rtype, data_queue)
+    clock = init_clock(rtype)
+    start_time = clock.time()
+    agent = init_robot(rtype, data_queue, clock)
     agent.start()
 
     try:
@@ -55,6 +76,7 @@ def run(rtype: RobotType, save: bool = False, filename: str = None):
 
     agent.shutdown_flag.set()
     agent.join()
+    logging.info(f"Robot time: {clock.time() - start_time:.1f}s")
 
     try:
         logging.info("Waiting for KeyboardInterrupt")
@@ -0,0 +1,168 @@
+import heapq
+import math
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import dijkstra
+
+import slam.planner.deadline as sdeadline
+
+SQRT2 = math.sqrt(2)
+
+# (dx, dy, cost) of moves to the 8 neighbours of a cell
+MOVES = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2)]
+
+
+def octile_distance(dx: int, dy: int) -> float:
+    """
+    Length of the shortest 8-connected path between cells (dx, dy) apart.
+    """
+    dx, dy = abs(dx), abs(dy)
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+def open_neighbours(free: np.ndarray, closed: np.ndarray, x: int,
+                    y: int) -> Iterator[Tuple[int, int, float]]:
+    """
+    Yields (x, y, cost) of free neighbours of cell (x, y) that are not
+    closed yet. Diagonal moves may not cut corners of blocked cells.
+    """
+    height, width = free.shape
+    for (dx, dy, cost) in MOVES:
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < width and 0 <= ny < height):
+            continue
+        if closed[ny, nx] or not free[ny, nx]:
+            continue
+        if dx != 0 and dy != 0 and \
+                not (free[y, nx] and free[ny, x]):
+            continue
+        yield (nx, ny, cost)
+
+
+def find_path(free: np.ndarray, start: Tuple[int, int],
+              goal: Tuple[int, int],
+              deadline: sdeadline.Deadline = None) -> List[Tuple[int, int]]:
+    """
+    A* search over the 8-connected grid of cells where free[y][x] is True.
+    start and goal are (x, y) indices. Diagonal moves may not cut corners of
+    blocked cells. Returns the list of cells from start to goal or None if
+    the goal cannot be reached. The start cell does not have to be free.
+    If the deadline expires, returns the path to the expanded cell that is
+    the closest to the goal.
+    """
+    height, width = free.shape
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= gx < width and 0 <= gy < height) or not free[gy, gx]:
+        return None
+    if not (0 <= sx < width and 0 <= sy < height):
+        return None
+
+    g_scores = np.full(free.shape, np.inf)
+    closed = np.zeros(free.shape, dtype=bool)
+    parents = np.full(free.shape, -1, dtype=np.intp)
+    g_scores[sy, sx] = 0
+    open_list = [(octile_distance(gx - sx, gy - sy), 0.0, sx, sy)]
+    closest = (np.inf, start)
+    expanded = 0
+    while len(open_list) > 0:
+        f, g, x, y = heapq.heappop(open_list)
+        if closed[y, x]:
+            continue
+        closed[y, x] = True
+        if x == gx and y == gy:
+            return reconstruct_path(parents, goal)
+
+        closest = min(closest, (f - g, (x, y)))
+        expanded += 1
+        if deadline is not None and expanded % 256 == 0 and \
+                deadline.expired():
+            return reconstruct_path(parents, closest[1])
+
+        for (nx, ny, cost) in open_neighbours(free, closed, x, y):
+            new_g = g + cost
+            if new_g < g_scores[ny, nx]:
+                g_scores[ny, nx] = new_g
+                parents[ny, nx] = y * width + x
+                heapq.heappush(open_list, (
+                    new_g + octile_distance(gx - nx, gy - ny), new_g, nx, ny))
+    return None
+
+
+def reconstruct_path(parents: np.ndarray, goal: Tuple[int, int]) \
+        -> List[Tuple[int, int]]:
+    width = parents.shape[1]
+    path = [goal]
+    index = parents[goal[1], goal[0]]
+    while index >= 0:
+        y, x = divmod(int(index), width)
+        path.append((x, y))
+        index = parents[y, x]
+    path.reverse()
+    return path
+
+
+def distance_field(free: np.ndarray, start: Tuple[int, int]) -> np.ndarray:
+    """
+    Lengths of the shortest 8-connected paths from start to every cell over
+    cells where free[y][x] is True, with the same moves as find_path.
+    Unreachable cells have distance inf. The start cell does not have to be
+    free.
+    """
+    return distance_fields(free, [start])[0]
+
+
+def distance_fields(free: np.ndarray,
+                    starts: List[Tuple[int, int]]) -> np.ndarray:
+    """
+    Distance fields (see distance_field) from each of starts, stacked along
+    the first axis. The grid graph is built only once; all start cells are
+    treated as free.
+    """
+    height, width = free.shape
+    free = free.copy()
+    inside = [0 <= sx < width and 0 <= sy < height for (sx, sy) in starts]
+    for ((sx, sy), is_inside) in zip(starts, inside):
+        if is_inside:
+            free[sy, sx] = True
+
+    fields = np.full([len(starts), height, width], np.inf)
+    indices = [sy * width + sx for ((sx, sy), is_inside)
+               in zip(starts, inside) if is_inside]
+    if len(indices) == 0:
+        return fields
+    distances = dijkstra(grid_graph(free), directed=False, indices=indices)
+    fields[np.array(inside)] = distances.reshape([-1, height, width])
+    return fields
+
+
+def grid_graph(free: np.ndarray):
+    """
+    Sparse adjacency matrix of free cells (indexed y * width + x) with the
+    moves of find_path.
+    """
+    height, width = free.shape
+    index = np.arange(free.size).reshape(free.shape)
+    sources, targets, weights = [], [], []
+    # Every undirected edge is added once, from its left or upper cell
+    for (dx, dy, cost) in [(1, 0, 1.0), (0, 1, 1.0), (1, 1, SQRT2),
+                           (1, -1, SQRT2)]:
+        y_from, y_to = max(0, -dy), height - max(0, dy)
+        x_to = width - dx
+        a = (slice(y_from, y_to), slice(0, x_to))
+        b = (slice(y_from + dy, y_to + dy), slice(dx, x_to + dx))
+        valid = free[a] & free[b]
+        if dx != 0 and dy != 0:
+            # Do not cut corners
+            valid &= free[y_from:y_to, dx:x_to + dx] & \
+                free[y_from + dy:y_to + dy, 0:x_to]
+        sources.append(index[a][valid])
+        targets.append(index[b][valid])
+        weights.append(np.full(np.count_nonzero(valid), cost))
+
+    return coo_matrix((np.concatenate(weights),
+                       (np.concatenate(sources), np.concatenate(targets))),
+                      shape=(free.size, free.size)).tocsr()
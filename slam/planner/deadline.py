@@ -0,0 +1,32 @@
+import time
+
+
+class Deadline():
+    """
+    Time by which planning has to finish, budget seconds after the deadline
+    is created. A deadline without a budget never expires.
+    """
+    def __init__(self, budget: float = None):
+        self.budget = budget
+        self.start = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        if self.budget is None:
+            return float("inf")
+        return self.budget - self.elapsed()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def used(self) -> float:
+        """
+        Returns the used fraction of the budget (0 without a budget).
+        """
+        if self.budget is None:
+            return 0.0
+        if self.budget <= 0:
+            return 1.0
+        return self.elapsed() / self.budget
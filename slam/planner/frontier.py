@@ -0,0 +1,171 @@
+import copy
+from typing import List
+
+import numpy as np
+from scipy import ndimage
+
+import slam.common.geometry as geometry
+import slam.world.grid as sgrid
+import slam.world.observed as oworld
+
+
+def frontier_mask(grid: np.ndarray, radius: int, region: sgrid.Region = None,
+                  free_threshold: float = -10.0,
+                  obstacle_threshold: float = 1.0,
+                  min_unknown: float = 0.3) -> np.ndarray:
+    """
+    Finds locations where the search can be continued: cells with a weak
+    evidence of being free (free_threshold <= value < 0), without obstacles
+    (values over obstacle_threshold) within radius and with at least
+    min_unknown of unknown cells (absolute value below 1) within radius.
+    Windows are squares with the side 2 * radius + 1; cells outside the grid
+    count as unknown.
+    region (x_min, y_min, x_max, y_max) are inclusive indices of grid. If it is
+    given, only cells within region are evaluated and the returned mask has
+    the shape of region.
+    """
+    height, width = grid.shape
+    if region is None:
+        region = (0, 0, width - 1, height - 1)
+    bounds = (0, 0, width - 1, height - 1)
+    # Windows of cells in region are within source
+    source = sgrid.expand_region(region, radius, bounds)
+    sx_min, sy_min, sx_max, sy_max = source
+    values = grid[sy_min:sy_max+1, sx_min:sx_max+1]
+
+    x_min, y_min, x_max, y_max = region
+    cells = values[y_min-sy_min:y_max-sy_min+1, x_min-sx_min:x_max-sx_min+1]
+    mask = (cells >= free_threshold) & (cells < 0)
+    y, x = np.nonzero(mask)
+    if len(y) == 0:
+        return mask
+
+    # Indices of candidates in source
+    x = x + x_min - sx_min
+    y = y + y_min - sy_min
+    window = (x - radius, y - radius, x + radius, y + radius)
+
+    obstacles = sgrid.IntegralImage(values > obstacle_threshold)
+    obstacle_count, _ = obstacles.window_sum(*window)
+
+    unknown = sgrid.IntegralImage(abs(values) < 1)
+    unknown_count, size = unknown.window_sum(*window)
+    total_size = (2 * radius + 1) ** 2
+    unknown_count = unknown_count + total_size - size
+
+    selected = (obstacle_count == 0) & \
+        (unknown_count / total_size >= min_unknown)
+    mask[mask] = selected
+    return mask
+
+
+class FrontierTracker():
+    """
+    Keeps the frontier mask of the last prediction of an ObservedWorld up to
+    date. When a prediction reports its dirty regions, only cells within
+    radius of them are evaluated again.
+    """
+    def __init__(self, observed_world: oworld.ObservedWorld, radius: int,
+                 **kwargs):
+        self.observed_world = observed_world
+        self.radius = radius
+        self.kwargs = kwargs
+        self.mask = None
+        self.bounds = None
+        self.version = None
+
+    def update(self) -> np.ndarray:
+        """
+        Returns the frontier mask of the last prediction.
+        """
+        world = self.observed_world
+        if self.mask is not None and self.version == world.prediction_version:
+            return self.mask
+
+        grid = world.last_prediction_blurred
+        bounds = world.prediction_bounds
+        up_to_date = self.mask is not None and \
+            self.version == world.prediction_version - 1
+        if not up_to_date or world.dirty_regions is None:
+            self.mask = frontier_mask(grid, self.radius, **self.kwargs)
+        else:
+            if bounds != self.bounds:
+                self.mask = self.move_mask(self.mask, self.bounds, bounds)
+            x_min, y_min, _, _ = bounds
+            for dirty in world.dirty_regions:
+                region = sgrid.expand_region(dirty, self.radius, bounds)
+                rx_min, ry_min, rx_max, ry_max = region
+                self.mask[ry_min-y_min:ry_max-y_min+1,
+                          rx_min-x_min:rx_max-x_min+1] = frontier_mask(
+                    grid, self.radius, (rx_min - x_min, ry_min - y_min,
+                                        rx_max - x_min, ry_max - y_min),
+                    **self.kwargs)
+
+        self.bounds = bounds
+        self.version = world.prediction_version
+        return self.mask
+
+    def move_mask(self, mask: np.ndarray, old_bounds: sgrid.Region,
+                  bounds: sgrid.Region) -> np.ndarray:
+        """
+        Returns mask with cell bounds old_bounds placed in a mask with cell
+        bounds bounds.
+        """
+        x_min, y_min, x_max, y_max = bounds
+        moved = np.zeros([y_max - y_min + 1, x_max - x_min + 1], dtype=bool)
+        overlap = sgrid.intersect_regions(old_bounds, bounds)
+        if overlap is None:
+            return moved
+        ox_min, oy_min, _, _ = old_bounds
+        cx_min, cy_min, cx_max, cy_max = overlap
+        moved[cy_min-y_min:cy_max-y_min+1, cx_min-x_min:cx_max-x_min+1] = \
+            mask[cy_min-oy_min:cy_max-oy_min+1, cx_min-ox_min:cx_max-ox_min+1]
+        return moved
+
+
+class FrontierCluster():
+    """
+    Connected group of frontier cells.
+    cells: locations of cells, one (x, y) row per cell
+    goal: the cell to be visited, initially the one that is the closest to
+    the centroid
+    """
+    def __init__(self, cells: np.ndarray):
+        self.cells = cells
+        self.size = len(cells)
+        self.centroid = geometry.Point(*cells.mean(axis=0))
+        self.bounding_box = (geometry.Point(*cells.min(axis=0)),
+                             geometry.Point(*cells.max(axis=0)))
+        distances = np.hypot(cells[:, 0] - self.centroid.x,
+                             cells[:, 1] - self.centroid.y)
+        self.goal = geometry.Point(*cells[np.argmin(distances)])
+
+    def __len__(self):
+        return self.size
+
+    def with_goal(self, goal: geometry.Point) -> "FrontierCluster":
+        """
+        Returns a copy of the cluster with a different goal.
+        """
+        cluster = copy.copy(self)
+        cluster.goal = goal
+        return cluster
+
+    def __str__(self):
+        return f"Cluster of {self.size} cells around {self.centroid}"
+
+
+def cluster_frontier(mask: np.ndarray, origin: geometry.Point) \
+        -> List[FrontierCluster]:
+    """
+    Groups frontier cells of mask into 8-connected clusters. origin is the
+    location of mask[0][0].
+    """
+    labels, num_clusters = ndimage.label(mask, structure=np.ones([3, 3]))
+    clusters = []
+    for (i, box) in enumerate(ndimage.find_objects(labels)):
+        y, x = np.nonzero(labels[box] == i + 1)
+        cells = np.stack([x + box[1].start + origin.x,
+                          y + box[0].start + origin.y], axis=1)
+        clusters.append(FrontierCluster(cells))
+    return clusters
@@ -0,0 +1,89 @@
+import numpy as np
+
+import slam.world.raytrace as raytrace
+
+
+def get_scan_angles(view_angle: int, precision: int) -> np.ndarray:
+    """
+    Returns angles of measurements of a scan relative to the orientation of
+    the robot, the same as sensors use.
+    """
+    start_angle = int(- view_angle / 2)
+    return np.arange(start_angle, start_angle + view_angle + 1, precision)
+
+
+def information_gain(grid: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                     headings: np.ndarray, scan_angles: np.ndarray,
+                     max_range: float,
+                     obstacle_threshold: float = 1.0) -> np.ndarray:
+    """
+    Counts unknown cells (absolute value below 1) that a scan made on each
+    candidate cell (xs[i], ys[i]) of grid with the robot oriented at
+    headings[i] degrees would reveal: cells on rays of the scan within
+    max_range and before the first obstacle (value over obstacle_threshold).
+    Cells outside the grid are unknown. A cell crossed by several rays of one
+    candidate is counted once.
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    num_candidates, num_rays = len(xs), len(scan_angles)
+    if num_candidates == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    angles = np.radians(np.asarray(headings, dtype=float)[:, None] +
+                        scan_angles[None, :]).ravel()
+    x_start = np.repeat(xs, num_rays)
+    y_start = np.repeat(ys, num_rays)
+    x_end = np.rint(x_start + max_range * np.cos(angles)).astype(np.int64)
+    y_end = np.rint(y_start + max_range * np.sin(angles)).astype(np.int64)
+    ray, x, y = raytrace.trace_rays(x_start, y_start, x_end, y_end,
+                                    include_end=True)
+
+    height, width = grid.shape
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    values = np.zeros(len(x))
+    values[inside] = grid[y[inside], x[inside]]
+
+    # Number of obstacles before each cell on its ray
+    obstacle = values > obstacle_threshold
+    cumulative = np.cumsum(obstacle) - obstacle
+    first = np.searchsorted(ray, ray)
+    visible = cumulative == cumulative[first]
+    unknown = visible & (abs(values) < 1)
+
+    # Count unique cells per candidate
+    margin = int(np.ceil(max_range)) + 1
+    key_width, key_height = width + 2 * margin, height + 2 * margin
+    candidate = ray[unknown] // num_rays
+    keys = (candidate * key_height + y[unknown] + margin) * key_width + \
+        x[unknown] + margin
+    unique = np.unique(keys)
+    return np.bincount(unique // (key_height * key_width),
+                       minlength=num_candidates)
+
+
+class InformationGainScorer():
+    """
+    Scores candidate goals by the information gain of a scan made there
+    (see information_gain), discounted by the distance the robot has to
+    travel: gain * exp(-travel_cost_weight * distance).
+    """
+    def __init__(self, view_angle: int = 360, scanning_precision: int = 20,
+                 max_range: float = 30.0, travel_cost_weight: float = 0.05,
+                 obstacle_threshold: float = 1.0):
+        self.scan_angles = get_scan_angles(view_angle, scanning_precision)
+        self.max_range = max_range
+        self.travel_cost_weight = travel_cost_weight
+        self.obstacle_threshold = obstacle_threshold
+
+    def score(self, grid: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+              headings: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """
+        Returns scores of candidate cells (xs[i], ys[i]) of grid. The robot
+        arrives to them with orientation headings[i] after travelling
+        distances[i] (inf for unreachable candidates, which score 0).
+        """
+        gain = information_gain(grid, xs, ys, headings, self.scan_angles,
+                                self.max_range, self.obstacle_threshold)
+        return gain * np.exp(-self.travel_cost_weight *
+                             np.asarray(distances, dtype=float))
@@ -1,28 +1,245 @@
 from __future__ import annotations
 
+import math
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
 import slam.common.geometry as geometry
 
 
 class Node():
-    def __init__(self, location: geometry.Point, parent: Node = None):
-        self.parent = parent
-        self.location = location
+    """
+    View of a node stored in a Graph.
+    """
+    def __init__(self, graph: Graph, index: int):
+        self.graph = graph
+        self.index = index
+
+    @property
+    def location(self) -> geometry.Point:
+        return geometry.Point(*self.graph.coordinates[self.index])
+
+    @property
+    def parent(self) -> Node:
+        parent = self.graph.parents[self.index]
+        if parent < 0:
+            return None
+        return Node(self.graph, int(parent))
+
+
+class GridIndex():
+    """
+    Uniform grid hash of 2D points that supports incremental insertion,
+    nearest neighbour and radius queries. Points are referenced by their
+    index in coordinates, which is owned by the caller.
+    """
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = dict()
+        self.cell_min = None
+        self.cell_max = None
+
+    def get_cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / self.cell_size),
+                math.floor(y / self.cell_size))
+
+    def insert(self, index: int, x: float, y: float):
+        cell = self.get_cell(x, y)
+        self.cells.setdefault(cell, []).append(index)
+        if self.cell_min is None:
+            self.cell_min = cell
+            self.cell_max = cell
+        else:
+            self.cell_min = (min(self.cell_min[0], cell[0]),
+                             min(self.cell_min[1], cell[1]))
+            self.cell_max = (max(self.cell_max[0], cell[0]),
+                             max(self.cell_max[1], cell[1]))
+
+    def ring(self, cx: int, cy: int, r: int) -> Iterator[int]:
+        """
+        Iterates over indices in cells at Chebyshev distance r from (cx, cy).
+        """
+        if r == 0:
+            yield from self.cells.get((cx, cy), [])
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield from self.cells.get((x, cy - r), [])
+            yield from self.cells.get((x, cy + r), [])
+        for y in range(cy - r + 1, cy + r):
+            yield from self.cells.get((cx - r, y), [])
+            yield from self.cells.get((cx + r, y), [])
+
+    def nearest(self, coordinates: np.ndarray, x: float, y: float) -> int:
+        """
+        Returns the index of the point closest to (x, y) or None if the index
+        is empty.
+        """
+        if self.cell_min is None:
+            return None
+        cx, cy = self.get_cell(x, y)
+        # Rings closer than the occupied cells are empty
+        r = max(self.cell_min[0] - cx, cx - self.cell_max[0],
+                self.cell_min[1] - cy, cy - self.cell_max[1], 0)
+        r_max = max(cx - self.cell_min[0], self.cell_max[0] - cx,
+                    cy - self.cell_min[1], self.cell_max[1] - cy)
+        best, best_distance = None, np.inf
+        while r <= r_max:
+            candidates = list(self.ring(cx, cy, r))
+            if len(candidates) > 0:
+                points = coordinates[candidates]
+                distances = np.hypot(points[:, 0] - x, points[:, 1] - y)
+                i = np.argmin(distances)
+                if distances[i] < best_distance:
+                    best, best_distance = candidates[i], distances[i]
+            # Points in further rings are at least r * cell_size away
+            if best_distance <= r * self.cell_size:
+                break
+            r += 1
+        return best
+
+    def within_radius(self, coordinates: np.ndarray, x: float, y: float,
+                      radius: float) -> np.ndarray:
+        """
+        Returns indices of points that are at most radius away from (x, y).
+        """
+        cx_min, cy_min = self.get_cell(x - radius, y - radius)
+        cx_max, cy_max = self.get_cell(x + radius, y + radius)
+        candidates = []
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                candidates.extend(self.cells.get((cx, cy), []))
+        candidates = np.array(candidates, dtype=np.intp)
+        if len(candidates) == 0:
+            return candidates
+        points = coordinates[candidates]
+        distances = np.hypot(points[:, 0] - x, points[:, 1] - y)
+        return candidates[distances <= radius]
 
 
 class Graph():
-    def __init__(self):
-        self.nodes = []
+    """
+    Tree of locations. Coordinates of nodes are stored in an Nx2 array, the
+    index of the parent of each node (-1 for roots) in an int array and the
+    cost of reaching each node from its root in a float array.
+    cell_size is the cell size of the spatial index used for nearest
+    neighbour and radius queries.
+    """
+    def __init__(self, cell_size: float = 10.0, capacity: int = 64):
+        self.coordinates = np.empty([capacity, 2])
+        self.parents = np.empty(capacity, dtype=np.intp)
+        self.costs = np.empty(capacity)
+        self.size = 0
+        self.index = GridIndex(cell_size)
 
     def __len__(self):
-        return len(self.nodes)
+        return self.size
 
     def __getitem__(self, key):
-        if not isinstance(key, int):
+        if not isinstance(key, (int, np.integer)):
             raise TypeError("Wrong key type")
-        if key >= 0 and key < len(self.nodes):
-            return self.nodes[key]
+        if key >= 0 and key < self.size:
+            return Node(self, int(key))
         raise IndexError(f"Key {key} out of range for array of length "
-                         f"{len(self.nodes)}")
+                         f"{self.size}")
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield Node(self, i)
+
+    @property
+    def locations(self) -> np.ndarray:
+        return self.coordinates[:self.size]
+
+    def add_node(self, location: geometry.Point, parent: int = -1,
+                 cost: float = 0.0) -> Node:
+        """
+        Adds a node with the given parent index and returns it.
+        """
+        if self.size == len(self.coordinates):
+            capacity = 2 * len(self.coordinates)
+            self.coordinates = np.resize(self.coordinates, [capacity, 2])
+            self.parents = np.resize(self.parents, capacity)
+            self.costs = np.resize(self.costs, capacity)
+        i = self.size
+        self.coordinates[i] = (location.x, location.y)
+        self.parents[i] = parent
+        self.costs[i] = cost
+        self.size += 1
+        self.index.insert(i, location.x, location.y)
+        return Node(self, i)
+
+    def nearest(self, location: geometry.Point) -> Node:
+        """
+        Returns the node closest to location or None if the graph is empty.
+        """
+        i = self.index.nearest(self.coordinates, location.x, location.y)
+        if i is None:
+            return None
+        return Node(self, i)
+
+    def within_radius(self, location: geometry.Point,
+                      radius: float) -> np.ndarray:
+        """
+        Returns indices of nodes that are at most radius away from location.
+        """
+        return self.index.within_radius(self.coordinates, location.x,
+                                        location.y, radius)
+
+    def descendants(self, index: int) -> np.ndarray:
+        """
+        Returns a mask of nodes in the subtree of node index (including it).
+        """
+        parents = self.parents[:self.size]
+        mask = np.zeros(self.size, dtype=bool)
+        mask[index] = True
+        level = np.array([index])
+        while len(level) > 0:
+            level = np.nonzero(np.isin(parents, level))[0]
+            mask[level] = True
+        return mask
+
+    def reroot(self, index: int):
+        """
+        Makes node index the root of its tree by reversing the edges on the
+        path from it to the old root.
+        """
+        previous = -1
+        while index >= 0:
+            parent = self.parents[index]
+            self.parents[index] = previous
+            previous, index = index, parent
+
+    def update_costs(self):
+        """
+        Recomputes costs of all nodes as path lengths from their roots.
+        """
+        parents = self.parents[:self.size]
+        coordinates = self.coordinates[:self.size]
+        level = np.nonzero(parents < 0)[0]
+        self.costs[level] = 0
+        while len(level) > 0:
+            level = np.nonzero(np.isin(parents, level))[0]
+            steps = coordinates[level] - coordinates[parents[level]]
+            self.costs[level] = self.costs[parents[level]] + \
+                np.hypot(steps[:, 0], steps[:, 1])
+
+    def remove_nodes(self, mask: np.ndarray):
+        """
+        Removes nodes selected by mask. Nodes whose parent is removed become
+        roots. Remaining nodes are renumbered in their original order.
+        """
+        keep = ~mask[:self.size]
+        new_index = np.cumsum(keep) - 1
+        parents = self.parents[:self.size][keep]
+        orphans = parents < 0
+        orphans[~orphans] = mask[parents[~orphans]]
+        parents = np.where(orphans, -1, new_index[parents])
 
-    def add_node(self, node: Node):
-        self.nodes.append(node)
+        self.size = int(np.sum(keep))
+        self.coordinates[:self.size] = self.coordinates[:len(keep)][keep]
+        self.costs[:self.size] = self.costs[:len(keep)][keep]
+        self.parents[:self.size] = parents
+        self.index = GridIndex(self.index.cell_size)
+        for (i, (x, y)) in enumerate(self.coordinates[:self.size]):
+            self.index.insert(i, x, y)
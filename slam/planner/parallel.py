@@ -0,0 +1,114 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+from typing import Dict, List, Tuple
+
+import slam.common.geometry as geometry
+import slam.planner.deadline as sdeadline
+import slam.world.observed as oworld
+
+# Cancellation event of the worker process, set by init_worker
+worker_cancel_event = None
+
+
+def init_worker(cancel_event: multiprocessing.Event):
+    global worker_cancel_event
+    worker_cancel_event = cancel_event
+
+
+def plan_path(path_planner_type: type, planner_kwargs: Dict,
+              snapshot: oworld.WorldSnapshot, start: geometry.Point,
+              goal: geometry.Point, deadline: sdeadline.Deadline,
+              cancel_event: threading.Event = None) -> List[geometry.Point]:
+    """
+    Plans a path from start to goal on snapshot with a new path planner.
+    Workers in other processes use the event passed to init_worker.
+    """
+    if cancel_event is None:
+        cancel_event = worker_cancel_event
+    path_planner = path_planner_type(snapshot, shutdown_flag=cancel_event,
+                                     data_queue=None, **planner_kwargs)
+    return path_planner.plan_path(start, goal, deadline)
+
+
+class ParallelGoalEvaluator():
+    """
+    Plans paths to several goals at the same time in a pool of workers
+    (processes by default, threads if use_processes is False). Every worker
+    gets a read-only snapshot of the world. The first path found wins and the
+    other workers are cancelled through a shared event.
+    path_planner_type and planner_kwargs define the path planners of the
+    workers (without observed_world, shutdown_flag and data_queue).
+    """
+    def __init__(self, path_planner_type: type, planner_kwargs: Dict,
+                 workers: int, use_processes: bool = True):
+        self.path_planner_type = path_planner_type
+        self.planner_kwargs = planner_kwargs
+        self.workers = workers
+        self.use_processes = use_processes
+        if use_processes:
+            context = multiprocessing.get_context("spawn")
+            self.cancel_event = context.Event()
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=context, initializer=init_worker,
+                initargs=(self.cancel_event,))
+        else:
+            self.cancel_event = threading.Event()
+            self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self.futures = set()
+
+    def plan(self, snapshot: oworld.WorldSnapshot, start: geometry.Point,
+             goals: List[geometry.Point], deadline: sdeadline.Deadline,
+             shutdown_flag: threading.Event = None) \
+            -> Tuple[geometry.Point, List[geometry.Point]]:
+        """
+        Returns the goal and the path of the first successful plan or
+        (None, None) if no path is found. Goals are evaluated in the given
+        order when there are more goals than workers.
+        """
+        self.cancel_event.clear()
+        # Workers in other processes get the event from init_worker
+        cancel_event = None if self.use_processes else self.cancel_event
+        futures = {
+            self.executor.submit(plan_path, self.path_planner_type,
+                                 self.planner_kwargs, snapshot, start, goal,
+                                 deadline, cancel_event): goal
+            for goal in goals
+        }
+        self.futures = set(futures)
+
+        result = (None, None)
+        pending = set(futures)
+        while len(pending) > 0:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=0.1,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            if shutdown_flag is not None and shutdown_flag.is_set():
+                self.cancel_event.set()
+            for future in done:
+                try:
+                    path = future.result()
+                except concurrent.futures.CancelledError:
+                    continue
+                except Exception:
+                    logging.exception("Planning in a worker failed")
+                    continue
+                if path is not None and result[0] is None:
+                    result = (futures[future], path)
+                    self.cancel_event.set()
+                    for other in pending:
+                        other.cancel()
+
+        # All workers are done, the event can be reused
+        self.cancel_event.clear()
+        return result
+
+    def shutdown(self):
+        # Executor.shutdown can only cancel futures since Python 3.9
+        if any(not future.done() for future in self.futures):
+            # Stops workers of a plan that is still running
+            self.cancel_event.set()
+            for future in self.futures:
+                future.cancel()
+        self.executor.shutdown(wait=True)
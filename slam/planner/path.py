@@ -2,11 +2,16 @@ import logging
 import queue
 import random
 import threading
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
 
 import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
+import slam.planner.astar as astar
+import slam.planner.deadline as sdeadline
 import slam.planner.graph as sgraph
+import slam.world.cspace as cspace
 import slam.world.observed as oworld
 from slam.common.enums import Existence, PathId
 
@@ -17,7 +22,8 @@ class PathPlanner():
                  max_step_size: int = 10, min_step_size: int = 0,
                  tilt_towards_goal: float = 0.5,
                  distance_tollerance: float = 5.0,
-                 data_queue: queue.Queue = None, robot_size: float = 10.0):
+                 data_queue: queue.Queue = None, robot_size: float = 10.0,
+                 max_nodes: int = 200):
         self.observed_world = observed_world
         self.max_step_size = max_step_size
         self.min_step_size = min_step_size
@@ -26,16 +32,56 @@ class PathPlanner():
         self.data_queue = data_queue
         self.robot_size = robot_size
         self.shutdown_flag = shutdown_flag
+        self.max_nodes = max_nodes
+
+    def plan_next_step(self, start: geometry.Point, goal: geometry.Point,
+                       deadline: sdeadline.Deadline = None) -> geometry.Point:
+        path = self.plan_path(start, goal, deadline)
+        if path is None:
+            return None
+
+        if len(path) < 2:
+            logging.warning(f"Path planner returned starting point")
+            return path[0]
+        return path[1]
 
-    def plan_next_step(self, start: geometry.Point, goal: geometry.Point) \
-            -> geometry.Point:
-        graph = sgraph.Graph()
-        graph.add_node(sgraph.Node(start))
+    def plan_path(self, start: geometry.Point, goal: geometry.Point,
+                  deadline: sdeadline.Deadline = None) \
+            -> List[geometry.Point]:
+        """
+        Returns a shortcut path (see shortcut_path) from start to a location
+        less than self.tollerance away from the goal or None if no path is
+        found. If the deadline expires, the path leads to the location
+        closest to the goal found so far.
+        """
+        graph = self.get_tree(start)
 
-        node = self.find_path(graph, goal)
+        node = self.find_path(graph, goal, deadline)
         if node is None:
             return None
 
+        path = [node.location]
+        while node.parent is not None:
+            node = node.parent
+            path.append(node.location)
+        path[-1] = start
+        path.reverse()
+        path = shortcut_path(
+            path, self.observed_world.get_configuration_space(threshold=1.0),
+            int(self.robot_size / 2), self.max_step_size)
+        self.add_path_to_queue(path, goal)
+
+        return path
+
+    def add_path_to_queue(self, path: List[geometry.Point],
+                          goal: geometry.Point):
+        """
+        Sends the planned path (from start to its end) and the goal to the
+        data queue.
+        """
+        if self.data_queue is None:
+            return
+
         def add_point_to_path(location: geometry.Point, color: Tuple):
             data = datapoint.DataPoint(*location, color=color,
                                        path_id=PathId.ROBOT_PATH_PLAN,
@@ -46,42 +92,42 @@ class PathPlanner():
         # Add goal to path
         add_point_to_path(goal, (1., 0.6, 0., 1.))
 
-        if node.parent is None:
-            logging.warning(f"Path planner returned starting point")
-            return node.location
+        if len(path) < 2:
+            return
 
         color = (1., 0.6, 0., 0.3)
-        while node.parent is not None:
-            old_node = node
-            add_point_to_path(node.location, color)
-            node = node.parent
-
-        add_point_to_path(start, color)
+        for location in reversed(path):
+            add_point_to_path(location, color)
 
-        return old_node.location
+    def get_tree(self, start: geometry.Point) -> sgraph.Graph:
+        """
+        Returns a tree rooted at start that the search starts from.
+        """
+        graph = sgraph.Graph(cell_size=self.max_step_size)
+        graph.add_node(start)
+        return graph
 
-    def find_path(self, graph: sgraph.Graph, goal: geometry.Point):
+    def find_path(self, graph: sgraph.Graph, goal: geometry.Point,
+                  deadline: sdeadline.Deadline = None):
         """
         Returns a node that is less than self.tollerance away from the
         goal. Use Node.parent recursively to get the whole path.
+        When the deadline expires, returns the node closest to the goal (or
+        None if the tree did not grow from the root).
         """
         min_step_size = self.min_step_size
+        configuration_space = self.observed_world.get_configuration_space(
+            threshold=1.0)
+        free_radius = int(self.robot_size / 2)
+        initial_size = len(graph)
         while not self.shutdown_flag.is_set():
-            r = random.random()
-            if r < self.tilt_towards_goal:
-                approx_target = goal
-
-                # Randomly change the target
-                d = abs(random.gauss(0, self.tollerance))
-                a = random.randint(0, 359)
-                p = geometry.Polar(a, d)
-                target = approx_target.plus_polar(p)
-            else:
-                # Select random point
-                target = self.observed_world.get_random_point()
+            if deadline is not None and deadline.expired():
+                return self.closest_node(graph, goal)
+
+            target = self.sample_target(goal)
 
             # Find node that is closest to the target
-            parent = min(graph, key=get_fun_distance_to(target))
+            parent = graph.nearest(target)
 
             angle = parent.location.angle_to(target).in_degrees()
             distance = parent.location.distance_to(target)
@@ -99,34 +145,259 @@ class PathPlanner():
             if not self.observed_world.point_in_bounds(candidate):
                 continue
 
-            free_radius = int(self.robot_size / 2)
-            if not self.observed_world.is_surrrounding_free(candidate,
-                                                            free_radius,
-                                                            threshold=1):
+            if not configuration_space.is_point_free(candidate, free_radius):
                 # Candidate is not free
                 continue
 
-            if not self.observed_world.is_path_free(parent.location, candidate,
-                                                    radius=free_radius,
-                                                    threshold=1.0):
+            new_node = self.add_candidate(graph, parent, candidate,
+                                          configuration_space, free_radius)
+            if new_node is None:
                 # Path to the candidate is not free
                 continue
-
-            new_node = sgraph.Node(candidate, parent)
-            graph.add_node(new_node)
             min_step_size = self.min_step_size
 
             if candidate.distance_to(goal) < self.tollerance:
                 return new_node
 
-            if len(graph) > 200:
+            if len(graph) - initial_size > self.max_nodes:
                 # Give up trying to find path to the goal
                 logging.warning(f"Couldn't find a path to node {goal}")
                 return None
         return None
 
+    def sample_target(self, goal: geometry.Point) -> geometry.Point:
+        """
+        Returns a random point near the goal or anywhere in the world.
+        """
+        r = random.random()
+        if r < self.tilt_towards_goal:
+            approx_target = goal
+
+            # Randomly change the target
+            d = abs(random.gauss(0, self.tollerance))
+            a = random.randint(0, 359)
+            p = geometry.Polar(a, d)
+            return approx_target.plus_polar(p)
+        # Select random point
+        return self.observed_world.get_random_point()
+
+    def closest_node(self, graph: sgraph.Graph,
+                     goal: geometry.Point) -> sgraph.Node:
+        """
+        Returns the node of graph closest to the goal or None if it is the
+        root (the tree did not grow).
+        """
+        node = graph.nearest(goal)
+        logging.warning(f"Planning deadline reached, {node.location} is the "
+                        f"closest to the goal {goal}")
+        if node.parent is None:
+            return None
+        return node
+
+    def add_candidate(self, graph: sgraph.Graph, parent: sgraph.Node,
+                      candidate: geometry.Point,
+                      configuration_space: cspace.ConfigurationSpace,
+                      free_radius: float) -> sgraph.Node:
+        """
+        Connects candidate to parent. Returns the new node or None if the
+        path from parent to candidate is not free.
+        """
+        if not configuration_space.is_segment_free(parent.location,
+                                                   candidate, free_radius):
+            return None
+        cost = graph.costs[parent.index] + \
+            parent.location.distance_to(candidate)
+        return graph.add_node(candidate, parent.index, cost)
+
+
+class RrtStarPathPlanner(PathPlanner):
+    """
+    RRT* path planner. New nodes are connected to the neighbour that gives
+    the shortest path from the root and neighbours are rewired through new
+    nodes when that shortens their paths.
+    The tree is kept between calls. Before each search it is pruned of
+    edges that newly observed obstacles block and re-rooted at the node
+    closest to the start.
+    rewire_radius: neighbourhood of new nodes that is considered for
+    rewiring, max_step_size by default
+    max_tree_size: the tree is discarded when it grows over this size
+    """
+    def __init__(self, *args, rewire_radius: float = None,
+                 max_tree_size: int = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rewire_radius = rewire_radius if rewire_radius is not None \
+            else self.max_step_size
+        self.max_tree_size = max_tree_size if max_tree_size is not None \
+            else 4 * self.max_nodes
+        self.graph = None
+        self.configuration_space = None
+
+    def get_tree(self, start: geometry.Point) -> sgraph.Graph:
+        configuration_space = self.observed_world.get_configuration_space(
+            threshold=1.0)
+        free_radius = int(self.robot_size / 2)
+        graph = self.graph
+        if graph is None or len(graph) > self.max_tree_size:
+            graph = super().get_tree(start)
+        else:
+            if configuration_space is not self.configuration_space:
+                self.prune(graph, configuration_space, free_radius)
+            nearest = graph.nearest(start)
+            graph.reroot(nearest.index)
+            if nearest.location.distance_to(start) > 1e-9:
+                if configuration_space.is_segment_free(start,
+                                                       nearest.location,
+                                                       free_radius):
+                    root = graph.add_node(start)
+                    graph.parents[nearest.index] = root.index
+                else:
+                    graph = super().get_tree(start)
+            # Drop the nodes that are not connected to the new root
+            root = graph.nearest(start).index
+            graph.remove_nodes(~graph.descendants(root))
+            graph.update_costs()
+
+        self.graph = graph
+        self.configuration_space = configuration_space
+        return graph
+
+    def prune(self, graph: sgraph.Graph,
+              configuration_space: cspace.ConfigurationSpace,
+              free_radius: float):
+        """
+        Removes subtrees of nodes that are no longer free or that can no
+        longer be reached from their parents.
+        """
+        removed = np.zeros(len(graph), dtype=bool)
+        for node in graph:
+            parent = node.parent
+            if parent is None or removed[node.index]:
+                continue
+            location = node.location
+            if not configuration_space.is_point_free(location, free_radius) \
+                    or not configuration_space.is_segment_free(
+                        parent.location, location, free_radius):
+                removed |= graph.descendants(node.index)
+        if np.any(removed):
+            graph.remove_nodes(removed)
+
+    def find_path(self, graph: sgraph.Graph, goal: geometry.Point,
+                  deadline: sdeadline.Deadline = None):
+        # The tree may already reach the goal
+        near_goal = graph.within_radius(goal, self.tollerance)
+        if len(near_goal) > 0:
+            return graph[near_goal[np.argmin(graph.costs[near_goal])]]
+        return super().find_path(graph, goal, deadline)
+
+    def add_candidate(self, graph: sgraph.Graph, parent: sgraph.Node,
+                      candidate: geometry.Point,
+                      configuration_space: cspace.ConfigurationSpace,
+                      free_radius: float) -> sgraph.Node:
+        neighbours = np.union1d(
+            graph.within_radius(candidate, self.rewire_radius),
+            [parent.index])
+        steps = graph.locations[neighbours] - (candidate.x, candidate.y)
+        distances = np.hypot(steps[:, 0], steps[:, 1])
+        costs = graph.costs[neighbours] + distances
+
+        # Connect to the neighbour with the cheapest free path
+        new_node = None
+        for i in np.argsort(costs):
+            neighbour = graph[neighbours[i]]
+            if configuration_space.is_segment_free(neighbour.location,
+                                                   candidate, free_radius):
+                new_node = graph.add_node(candidate, neighbour.index,
+                                          costs[i])
+                break
+        if new_node is None:
+            return None
+
+        # Rewire neighbours through the new node
+        cost = graph.costs[new_node.index]
+        for i in np.nonzero(cost + distances < graph.costs[neighbours])[0]:
+            neighbour = graph[neighbours[i]]
+            if neighbour.parent is None:
+                continue
+            if configuration_space.is_segment_free(
+                    candidate, neighbour.location, free_radius):
+                subtree = graph.descendants(neighbour.index)
+                graph.costs[:len(graph)][subtree] -= \
+                    graph.costs[neighbour.index] - (cost + distances[i])
+                graph.parents[neighbour.index] = new_node.index
+        return new_node
+
+
+class GridPathPlanner(PathPlanner):
+    """
+    Deterministic path planner: A* over the cells of the configuration
+    space where the robot fits. The cell path is shortcut to waypoints at
+    most max_step_size apart.
+    """
+    def plan_path(self, start: geometry.Point, goal: geometry.Point,
+                  deadline: sdeadline.Deadline = None) \
+            -> List[geometry.Point]:
+        path = self.find_grid_path(start, goal, deadline)
+        if path is None:
+            logging.warning(f"Couldn't find a path to node {goal}")
+            return None
+
+        self.add_path_to_queue(path, goal)
+        return path
+
+    def find_grid_path(self, start: geometry.Point, goal: geometry.Point,
+                       deadline: sdeadline.Deadline = None) \
+            -> List[geometry.Point]:
+        """
+        Returns waypoints from start to the goal cell or None if the goal
+        cannot be reached. If the deadline expires, the path leads to the
+        searched cell closest to the goal.
+        """
+        configuration_space = self.observed_world.get_configuration_space(
+            threshold=1.0)
+        free_radius = int(self.robot_size / 2)
+        free = configuration_space.free_cells(free_radius, start)
+        cells = astar.find_path(free,
+                                configuration_space.location_to_index(start),
+                                configuration_space.location_to_index(goal),
+                                deadline)
+        if cells is None:
+            return None
+
+        origin = configuration_space.origin
+        locations = [geometry.Point(origin.x + x, origin.y + y)
+                     for (x, y) in cells]
+        locations[0] = start
+        return shortcut_path(locations, configuration_space, free_radius,
+                             self.max_step_size)
+
 
-def get_fun_distance_to(goal: geometry.Point):
-    def f(node: sgraph.Node):
-        return node.location.distance_to(goal)
-    return f
+def shortcut_path(path: List[geometry.Point],
+                  configuration_space: cspace.ConfigurationSpace,
+                  free_radius: float,
+                  max_length: float = None) -> List[geometry.Point]:
+    """
+    Shortens path by skipping locations: from each kept location it goes
+    straight to the furthest later location that can be reached on a free
+    segment at most max_length long. The first and the last location are
+    always kept.
+    """
+    if len(path) < 3:
+        return path
+    coordinates = np.array([(p.x, p.y) for p in path])
+    shortcut = [path[0]]
+    i = 0
+    while i < len(path) - 1:
+        steps = coordinates[i+2:] - coordinates[i]
+        candidates = np.arange(i + 2, len(path))
+        if max_length is not None:
+            candidates = candidates[
+                np.hypot(steps[:, 0], steps[:, 1]) <= max_length]
+        next_i = i + 1
+        for j in candidates[::-1]:
+            if configuration_space.is_segment_free(path[i], path[j],
+                                                   free_radius):
+                next_i = j
+                break
+        shortcut.append(path[next_i])
+        i = next_i
+    return shortcut
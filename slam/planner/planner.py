@@ -2,27 +2,56 @@ import logging
 import queue
 import random
 import threading
+from typing import List
 
 import numpy as np
 
 import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
 import slam.planner.action as action
+import slam.planner.astar as astar
+import slam.planner.deadline as sdeadline
+import slam.planner.frontier as sfrontier
+import slam.planner.gain as sgain
+import slam.planner.parallel as sparallel
 import slam.planner.path as spath
+import slam.planner.tour as stour
 import slam.world.observed as oworld
+from slam.common.enums import PlannerType
 
 
 class Planner():
+    """
+    failed_plans: number of steps in which no path to any frontier goal was
+    found
+    """
     def __init__(self, turn_action: action.Action, move_action: action.Action,
                  turn_move_action: action.Action):
         logging.info(f"Using planner: {type(self).__name__}")
         self.turn_action = turn_action
         self.move_action = move_action
         self.turn_move_action = turn_move_action
+        self.failed_plans = 0
 
     def select_next_action(self, current_pose: geometry.Pose):
         raise NotImplementedError
 
+    def select_next_actions(self, current_pose: geometry.Pose) \
+            -> List[action.ActionWithParams]:
+        """
+        Returns actions to be executed before the next scan.
+        """
+        next_action = self.select_next_action(current_pose)
+        if next_action is None:
+            return []
+        return [next_action]
+
+    def shutdown(self):
+        """
+        Releases resources held by the planner.
+        """
+        pass
+
 
 class RrtPlanner(Planner):
     def __init__(self, observed_world: oworld.ObservedWorld,
@@ -30,35 +59,101 @@ class RrtPlanner(Planner):
                  move_action: action.Action, turn_move_action: action.Action,
                  shutdown_flag: threading.Event,
                  distance_tollerance: float = None,
-                 angle_tollerance: float = 3.0, robot_size: float = 10.0):
+                 angle_tollerance: float = 3.0, robot_size: float = 10.0,
+                 rrt_star: bool = False, max_waypoints: int = 1,
+                 time_budget: float = None, parallel_goals: int = 1,
+                 parallel_processes: bool = True,
+                 information_gain: bool = False, view_angle: int = 360,
+                 scanning_precision: int = 20, sensor_range: float = 30.0,
+                 travel_cost_weight: float = 0.05,
+                 gain_candidates: int = 5, frontier_tour: bool = False):
         super().__init__(turn_action, move_action, turn_move_action)
         self.observed_world = observed_world
         self.data_queue = data_queue
         self.angle_tollerance = angle_tollerance
         self.robot_size = robot_size
         self.shutdown_flag = shutdown_flag
+        self.max_waypoints = max_waypoints
+        self.time_budget = time_budget
+        self.budget_used = 0.0
+        self.parallel_goals = parallel_goals
+        self.parallel_processes = parallel_processes
+        self.goal_evaluator = None
+        if information_gain and frontier_tour:
+            raise ValueError("information_gain and frontier_tour both order "
+                             "the frontier, enable only one of them")
+        self.gain_candidates = gain_candidates
+        self.gain_scorer = None
+        if information_gain:
+            self.gain_scorer = sgain.InformationGainScorer(
+                view_angle, scanning_precision, sensor_range,
+                travel_cost_weight)
+        self.frontier_tour = None
+        if frontier_tour:
+            self.frontier_tour = stour.FrontierTour(
+                match_distance=robot_size)
 
         if distance_tollerance is not None:
             self.distance_tollerance = distance_tollerance
         else:
             self.distance_tollerance = robot_size / 2
 
-        self.path_planner = spath.PathPlanner(observed_world,
-                                              shutdown_flag=shutdown_flag,
-                                              max_step_size=2*robot_size,
-                                              min_step_size=robot_size/3,
-                                              distance_tollerance=self.distance_tollerance,
-                                              data_queue=data_queue,
-                                              robot_size=robot_size)
+        self.frontier_tracker = sfrontier.FrontierTracker(
+            observed_world, radius=int(robot_size / 2))
+        self.path_planner_type = self.get_path_planner_type(rrt_star)
+        self.path_planner_kwargs = {
+            "max_step_size": 2 * robot_size,
+            "min_step_size": robot_size / 3,
+            "distance_tollerance": self.distance_tollerance,
+            "robot_size": robot_size,
+            "max_nodes": 1000,
+        }
+        self.path_planner = self.path_planner_type(
+            observed_world, shutdown_flag=shutdown_flag,
+            data_queue=data_queue, **self.path_planner_kwargs)
+
+    def get_path_planner_type(self, rrt_star: bool) -> type:
+        if rrt_star:
+            return spath.RrtStarPathPlanner
+        return spath.PathPlanner
 
     def select_next_action(self, current_pose: geometry.Pose) -> \
             action.ActionWithParams:
         goal = self.select_new_goal(current_pose)
         if goal is None:
             return None
+        return self.get_action_to(current_pose, goal)
 
-        angle_deg = current_pose.angle_to_point(goal).in_degrees()
-        distance = current_pose.position.distance_to(goal)
+    def select_next_actions(self, current_pose: geometry.Pose) \
+            -> List[action.ActionWithParams]:
+        """
+        Returns actions that follow the first waypoints of the planned path:
+        the first one and then at most max_waypoints in total while the
+        segments between them have been observed as free.
+        """
+        path = self.select_new_path(current_pose)
+        if path is None:
+            return []
+
+        # Pose of the robot after the actions
+        pose = geometry.Pose(*current_pose)
+        actions = []
+        for waypoint in path[:max(self.max_waypoints, 1)]:
+            if len(actions) > 0 and not \
+                    self.observed_world.is_segment_known_free(pose.position,
+                                                              waypoint):
+                break
+            actions.append(self.get_action_to(pose, waypoint))
+            angle_deg = pose.angle_to_point(waypoint).in_degrees()
+            if abs(angle_deg) > self.angle_tollerance:
+                pose.rotate(angle_deg)
+            pose.move_forward(pose.position.distance_to(waypoint))
+        return actions
+
+    def get_action_to(self, pose: geometry.Pose, goal: geometry.Point) \
+            -> action.ActionWithParams:
+        angle_deg = pose.angle_to_point(goal).in_degrees()
+        distance = pose.position.distance_to(goal)
 
         if abs(angle_deg) > self.angle_tollerance:
             return action.ActionWithParams(self.turn_move_action, angle_deg,
@@ -67,114 +162,318 @@ class RrtPlanner(Planner):
         return action.ActionWithParams(self.move_action, distance)
 
     def select_new_goal(self, current_pose: geometry.Pose):
+        path = self.select_new_path(current_pose)
+        if path is None:
+            return None
+        return path[0]
+
+    def select_new_path(self, current_pose: geometry.Pose) \
+            -> List[geometry.Point]:
+        """
+        Selects a frontier goal and returns waypoints of the path to it
+        (without the current position) or None if there is no reachable
+        goal.
+        Planning takes at most time_budget seconds (if set); when it runs
+        out, the path leads to the location closest to the goal found so
+        far. The used fraction of the budget is stored in budget_used.
+        """
+        deadline = sdeadline.Deadline(self.time_budget)
+        path = self.plan_to_frontier(current_pose, deadline)
+        self.budget_used = deadline.used()
+        if self.time_budget is not None:
+            logging.info(f"Planning used {self.budget_used:.0%} of "
+                         f"{self.time_budget}s")
+        return path
+
+    def plan_to_frontier(self, current_pose: geometry.Pose,
+                         deadline: sdeadline.Deadline) \
+            -> List[geometry.Point]:
         predicted_world, origin = self.observed_world.predict_world()
         if predicted_world is None or origin is None:
             return None
 
         self.data_queue.put(datapoint.Prediction(*origin, predicted_world))
-        frontier = self.get_unknown_locations()
+        mask = self.get_frontier_mask()
+        frontier = self.get_unknown_locations(mask)
         self.data_queue.put(frontier)
+        clusters = sfrontier.cluster_frontier(mask, origin)
+        travel_distances = self.get_travel_distances(current_pose.position)
 
-        intermediate_goal = None
+        if self.parallel_goals > 1:
+            return self.plan_in_parallel(clusters, current_pose,
+                                         travel_distances, deadline)
+
+        path = None
         c = 0
         num_allowed_tries = 5
-        while intermediate_goal is None and c < num_allowed_tries and \
-                not self.shutdown_flag.is_set():
+        while path is None and c < num_allowed_tries and \
+                not self.shutdown_flag.is_set() and not deadline.expired():
             select_randomly = c > 0
-            goal = self.select_from_frontier(frontier, current_pose,
-                                             select_randomly)
+            goal = self.select_from_frontier(clusters, current_pose,
+                                             select_randomly,
+                                             travel_distances)
             if goal is None:
                 # No candidates remain
                 return None
 
-            if self.observed_world.is_path_free(current_pose.position, goal,
-                                                radius=int(self.robot_size/2),
-                                                threshold=1):
-                return goal
+            configuration_space = \
+                self.observed_world.get_configuration_space(threshold=1.0)
+            if configuration_space.is_segment_free(
+                    current_pose.position, goal,
+                    radius=int(self.robot_size/2)):
+                return [goal]
 
-            intermediate_goal = self.path_planner.plan_next_step(
-                current_pose.position, goal)
+            path = self.path_planner.plan_path(current_pose.position, goal,
+                                               deadline)
             c += 1
 
-        if intermediate_goal is None:
+        if path is None:
             if self.shutdown_flag.is_set():
                 logging.info("Planning interrupted.")
+                return None
+            self.failed_plans += 1
+            if deadline.expired():
+                logging.warning("Planning deadline reached without a path")
             else:
                 try_text = f"{'try' if num_allowed_tries == 1 else 'tries'}"
                 logging.warning(f"Couldn't find a reachable goal in "
                                 f"{num_allowed_tries} {try_text}")
             return None
 
-        return intermediate_goal
+        if len(path) < 2:
+            logging.warning("Path planner returned starting point")
+            return path
+        return path[1:]
+
+    def get_frontier_mask(self) -> np.ndarray:
+        """
+        Returns mask of frontier cells of the last prediction.
+        """
+        return self.frontier_tracker.update()
 
-    def get_unknown_locations(self) \
+    def get_unknown_locations(self, mask: np.ndarray = None) \
             -> datapoint.Frontier:
         """
         Finds locations where the search can be continued (locations free of
         obstacles that are near to locations with unknown occupancy).
         TODO: Make selection more precize.
         """
-        grid = self.observed_world.last_prediction_blurred
-        y_shape, x_shape = grid.shape
-        frontier = []
-        min_border, _ = self.observed_world.get_world_borders()
-        for yi in range(y_shape):
-            for xi in range(x_shape):
-                x = min_border.x + xi
-                y = min_border.y + yi
-                p = geometry.Point(x, y)
-                if grid[yi][xi] >= 0:
-                    continue
-                if grid[yi][xi] < -10:
-                    continue  # Enough evidence that here is a free spot
-                if not self.observed_world.is_surrrounding_free(
-                        p, radius=int(self.robot_size / 2), threshold=1.0):
-                    continue
-                u = self.observed_world.perc_unknown_surround(
-                    p, radius=int(self.robot_size / 2))
-                if u < 0.3:
-                    continue
-                frontier.append(p)
-        return datapoint.Frontier(min_border.x, min_border.y, frontier)
-
-    def select_from_frontier(self, frontier: datapoint.Frontier,
-                             current_pose: geometry.Pose,
-                             select_randomly: bool = False) -> geometry.Point:
+        if mask is None:
+            mask = self.get_frontier_mask()
+        origin = self.observed_world.prediction_origin
+        frontier = [geometry.Point(origin.x + int(xi), origin.y + int(yi))
+                    for (yi, xi) in np.argwhere(mask)]
+        return datapoint.Frontier(origin.x, origin.y, frontier)
+
+    def get_travel_distances(self, start: geometry.Point) -> np.ndarray:
         """
-        Selects a point to be visited next.
-        TODO: Take orientation in consideration.
+        Returns lengths of the shortest paths of the robot from start to each
+        cell of the last prediction (inf for unreachable cells).
+        """
+        configuration_space = \
+            self.observed_world.get_configuration_space(threshold=1.0)
+        free = configuration_space.free_cells(int(self.robot_size / 2),
+                                              start)
+        return astar.distance_field(
+            free, configuration_space.location_to_index(start))
+
+    def get_tour_distances(self, clusters: List[sfrontier.FrontierCluster],
+                           start: geometry.Point) -> np.ndarray:
+        """
+        Returns the matrix of travel distances between start (row and column
+        0) and goals of clusters.
         """
-        if len(frontier) == 0:
+        configuration_space = \
+            self.observed_world.get_configuration_space(threshold=1.0)
+        free = configuration_space.free_cells(int(self.robot_size / 2),
+                                              start)
+        cells = [configuration_space.location_to_index(start)] + \
+            [configuration_space.location_to_index(c.goal) for c in clusters]
+        fields = astar.distance_fields(free, cells)
+        xs, ys = np.array(cells).T
+        distances = fields[:, ys, xs]
+        return np.minimum(distances, distances.T)
+
+    def plan_in_parallel(self, clusters: List[sfrontier.FrontierCluster],
+                         current_pose: geometry.Pose,
+                         travel_distances: np.ndarray,
+                         deadline: sdeadline.Deadline) \
+            -> List[geometry.Point]:
+        """
+        Plans paths to the goals of the parallel_goals closest clusters at
+        the same time and returns the first path found (without the current
+        position).
+        """
+        candidates = self.rank_frontier(clusters, current_pose,
+                                        travel_distances)
+        goals = [c.goal for c in candidates[:self.parallel_goals]]
+        if len(goals) == 0:
             return None
 
-        num_points = len(frontier)
-        distances = np.zeros([num_points, num_points])
-        for i in range(num_points):
-            p = frontier[i].location
-            for j in range(i+1, num_points):
-                d = p.distance_to(frontier[j].location)
-                distances[i][j] = d
-                distances[j][i] = d
+        start = current_pose.position
+        configuration_space = \
+            self.observed_world.get_configuration_space(threshold=1.0)
+        for goal in goals:
+            if configuration_space.is_segment_free(
+                    start, goal, radius=int(self.robot_size/2)):
+                logging.info(f"Selected goal: {goal}")
+                return [goal]
 
-        # Choose between points that have some neighbouring points
-        count = [sum(1 for d in distances[i] if d < self.distance_tollerance)
-                 for i in range(num_points)]
-        candidates = [p for (i, p) in enumerate(frontier) if count[i] >= 3]
+        if self.goal_evaluator is None:
+            self.goal_evaluator = sparallel.ParallelGoalEvaluator(
+                self.path_planner_type, self.path_planner_kwargs,
+                workers=self.parallel_goals,
+                use_processes=self.parallel_processes)
+        snapshot = oworld.WorldSnapshot(self.observed_world)
+        goal, path = self.goal_evaluator.plan(snapshot, start, goals,
+                                              deadline, self.shutdown_flag)
+        if path is None:
+            if not self.shutdown_flag.is_set():
+                self.failed_plans += 1
+            logging.warning(f"Couldn't find a path to any of {len(goals)} "
+                            f"goals")
+            return None
 
+        logging.info(f"Selected goal: {goal} (planned in parallel)")
+        self.path_planner.add_path_to_queue(path, goal)
+        if len(path) < 2:
+            logging.warning("Path planner returned starting point")
+            return path
+        return path[1:]
+
+    def shutdown(self):
+        if self.goal_evaluator is not None:
+            self.goal_evaluator.shutdown()
+            self.goal_evaluator = None
+
+    def select_from_frontier(self, clusters: List[sfrontier.FrontierCluster],
+                             current_pose: geometry.Pose,
+                             select_randomly: bool = False,
+                             travel_distances: np.ndarray = None) \
+            -> geometry.Point:
+        """
+        Selects a point to be visited next: the goal of the closest frontier
+        cluster (see rank_frontier) or of a random one.
+        TODO: Take orientation in consideration.
+        """
+        candidates = self.rank_frontier(clusters, current_pose,
+                                        travel_distances)
         if len(candidates) == 0:
             return None
 
         if select_randomly:
-            index = random.randint(0, len(candidates) - 1)
-            chosen = candidates[index]
-            logging.info(f"Selected goal: {chosen.location} "
+            chosen = random.choice(candidates)
+            logging.info(f"Selected goal: {chosen.goal} "
                          f"(selected randomly)")
         else:
-            chosen = min(candidates,
-                         key=lambda p: geometry.Point(*p.location).distance_to(
-                            current_pose.position))
-            logging.info(f"Selected goal: {chosen.location}")
-        return geometry.Point(*chosen.location)
+            chosen = candidates[0]
+            logging.info(f"Selected goal: {chosen.goal}")
+        return chosen.goal
+
+    def rank_frontier(self, clusters: List[sfrontier.FrontierCluster],
+                      current_pose: geometry.Pose,
+                      travel_distances: np.ndarray = None) \
+            -> List[sfrontier.FrontierCluster]:
+        """
+        Returns candidate clusters sorted from the closest one.
+        If travel_distances (see get_travel_distances) are given, clusters
+        are ranked by the distance the robot has to travel to their goals and
+        unreachable clusters are rejected. Otherwise they are ranked by the
+        straight-line distance.
+        With information gain enabled, clusters are ranked by scores instead
+        (see score_frontier). With the frontier tour enabled, reachable
+        clusters are returned in the order of the tour (see
+        get_tour_distances).
+        """
+        # Choose between clusters that are not just a few isolated cells
+        candidates = [c for c in clusters if len(c) >= 3]
+
+        if self.gain_scorer is not None and travel_distances is not None:
+            return self.score_frontier(candidates, current_pose,
+                                       travel_distances)
+
+        if travel_distances is not None:
+            def distance(cluster: sfrontier.FrontierCluster) -> float:
+                x, y = self.observed_world.location_to_index(cluster.goal)
+                return travel_distances[y][x]
+            reachable = [c for c in candidates if distance(c) < np.inf]
+            if len(reachable) < len(candidates):
+                logging.info(f"Rejected {len(candidates) - len(reachable)} "
+                             f"unreachable frontier clusters")
+            candidates = reachable
+            if self.frontier_tour is not None:
+                return self.frontier_tour.order(
+                    candidates, lambda clusters: self.get_tour_distances(
+                        clusters, current_pose.position))
+        else:
+            def distance(cluster: sfrontier.FrontierCluster) -> float:
+                return cluster.goal.distance_to(current_pose.position)
+
+        return sorted(candidates, key=distance)
+
+    def score_frontier(self, clusters: List[sfrontier.FrontierCluster],
+                       current_pose: geometry.Pose,
+                       travel_distances: np.ndarray) \
+            -> List[sfrontier.FrontierCluster]:
+        """
+        Scores the goal and up to gain_candidates - 1 other cells of each
+        cluster with gain_scorer, assuming that the robot arrives facing away
+        from its current position. Returns copies of clusters with their best
+        cell as the goal, sorted from the best one; clusters without a
+        reachable cell that reveals anything are rejected.
+        """
+        if len(clusters) == 0:
+            return []
+
+        cells, owners = [], []
+        for (i, cluster) in enumerate(clusters):
+            step = max(1, len(cluster) // max(self.gain_candidates - 1, 1))
+            others = cluster.cells[::step][:self.gain_candidates - 1]
+            cells.append([(cluster.goal.x, cluster.goal.y)])
+            cells.append(others)
+            owners.extend([i] * (len(others) + 1))
+        cells = np.concatenate(cells)
+        owners = np.array(owners)
+
+        origin = self.observed_world.prediction_origin
+        xs = np.rint(cells[:, 0] - origin.x).astype(int)
+        ys = np.rint(cells[:, 1] - origin.y).astype(int)
+        position = current_pose.position
+        headings = np.degrees(np.arctan2(cells[:, 1] - position.y,
+                                         cells[:, 0] - position.x))
+        scores = self.gain_scorer.score(
+            self.observed_world.last_prediction_blurred, xs, ys, headings,
+            travel_distances[ys, xs])
+
+        ranked = []
+        for (i, cluster) in enumerate(clusters):
+            indices = np.nonzero(owners == i)[0]
+            best = indices[np.argmax(scores[indices])]
+            if scores[best] > 0:
+                ranked.append((scores[best], i,
+                               cluster.with_goal(geometry.Point(*cells[best]))))
+        if len(ranked) < len(clusters):
+            logging.info(f"Rejected {len(clusters) - len(ranked)} frontier "
+                         f"clusters without information gain")
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        return [cluster for (_, _, cluster) in ranked]
+
+
+class GridPlanner(RrtPlanner):
+    """
+    Explores the same frontier as RrtPlanner, but plans paths with A* over
+    the configuration space grid.
+    """
+    def get_path_planner_type(self, rrt_star: bool) -> type:
+        return spath.GridPathPlanner
+
+
+def create_planner(planner_type: PlannerType, *args, **kwargs) -> Planner:
+    if planner_type == PlannerType.RRT:
+        return RrtPlanner(*args, **kwargs)
+    if planner_type == PlannerType.GRID:
+        return GridPlanner(*args, **kwargs)
+    raise TypeError(f"Unknown planner type {planner_type}")
 
 
 class DummyPlanner(Planner):
@@ -0,0 +1,119 @@
+from typing import Callable, List
+
+import numpy as np
+
+import slam.planner.frontier as sfrontier
+
+
+def tour_length(tour: List[int], distances: np.ndarray) -> float:
+    return float(sum(distances[a, b] for (a, b) in zip(tour, tour[1:])))
+
+
+def nearest_insertion(distances: np.ndarray) -> List[int]:
+    """
+    Approximates the shortest open tour that starts at node 0 and visits
+    every node of the distance matrix: repeatedly takes the node closest to
+    the tour and inserts it where it lengthens the tour the least.
+    """
+    n = len(distances)
+    if n == 0:
+        return []
+    tour = [0]
+    in_tour = np.zeros(n, dtype=bool)
+    in_tour[0] = True
+    closest = distances[0].astype(float)
+    for _ in range(n - 1):
+        k = int(np.argmin(np.where(in_tour, np.inf, closest)))
+        nodes = np.array(tour)
+        # Insertion between consecutive nodes or after the last one
+        costs = np.append(distances[nodes[:-1], k] + distances[k, nodes[1:]] -
+                          distances[nodes[:-1], nodes[1:]],
+                          distances[nodes[-1], k])
+        tour.insert(int(np.argmin(costs)) + 1, k)
+        in_tour[k] = True
+        closest = np.minimum(closest, distances[k])
+    return tour
+
+
+def two_opt(tour: List[int], distances: np.ndarray) -> List[int]:
+    """
+    Shortens an open tour with a fixed first node by reversing its sections
+    while that makes it shorter.
+    """
+    tour = list(tour)
+    n = len(tour)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b, c = tour[i - 1], tour[i], tour[j]
+                change = distances[a, c] - distances[a, b]
+                if j + 1 < n:
+                    d = tour[j + 1]
+                    change += distances[b, d] - distances[c, d]
+                if change < -1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    improved = True
+    return tour
+
+
+class FrontierTour():
+    """
+    Order in which frontier clusters are visited. The tour is computed from
+    a travel distance matrix (see order) and kept as long as the same
+    clusters exist; clusters are matched by centroids that are at most
+    match_distance apart.
+    """
+    def __init__(self, match_distance: float):
+        self.match_distance = match_distance
+        self.centroids = None
+
+    def order(self, clusters: List[sfrontier.FrontierCluster],
+              get_distances: Callable[[List[sfrontier.FrontierCluster]],
+                                      np.ndarray]) \
+            -> List[sfrontier.FrontierCluster]:
+        """
+        Returns clusters in tour order. If clusters appeared or vanished
+        since the last call, a new tour is computed from
+        get_distances(clusters): a matrix of travel distances between the
+        robot (row and column 0) and the clusters.
+        """
+        if len(clusters) == 0:
+            self.centroids = None
+            return []
+        ordered = self.match(clusters)
+        if ordered is None:
+            distances = np.array(get_distances(clusters), dtype=float)
+            # Keep unreachable pairs last
+            distances[np.isinf(distances)] = 10 * np.max(
+                distances[np.isfinite(distances)], initial=1.0)
+            tour = two_opt(nearest_insertion(distances), distances)
+            ordered = [clusters[i - 1] for i in tour[1:]]
+        self.centroids = np.array([(c.centroid.x, c.centroid.y)
+                                   for c in ordered])
+        return ordered
+
+    def match(self, clusters: List[sfrontier.FrontierCluster]) \
+            -> List[sfrontier.FrontierCluster]:
+        """
+        Returns clusters in the order of the stored tour or None if they do
+        not match it.
+        """
+        if self.centroids is None or len(clusters) != len(self.centroids):
+            return None
+        centroids = np.array([(c.centroid.x, c.centroid.y)
+                              for c in clusters])
+        distances = np.hypot(
+            self.centroids[:, None, 0] - centroids[None, :, 0],
+            self.centroids[:, None, 1] - centroids[None, :, 1])
+        ordered = []
+        used = np.zeros(len(clusters), dtype=bool)
+        for row in distances:
+            row = np.where(used, np.inf, row)
+            i = int(np.argmin(row))
+            if row[i] > self.match_distance:
+                return None
+            used[i] = True
+            ordered.append(clusters[i])
+        return ordered
@@ -0,0 +1,101 @@
+"""
+Worlds loaded from bitmaps of floor plans. Dark pixels are obstacles. The
+pixels are memory-mapped, so only the parts of a large plan the robot
+actually looks at are read from disk.
+"""
+import os
+from typing import Tuple
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.world.simulated as sworld
+
+
+def read_pgm_header(filename: str) -> Tuple[int, int, int, int]:
+    """
+    Returns width, height, maximal value and offset of pixel data of a
+    binary (P5) PGM file.
+    """
+    tokens = []
+    with open(filename, "rb") as f:
+        if f.read(2) != b"P5":
+            raise ValueError(f"{filename} is not a binary PGM (P5) file")
+        token = b""
+        while len(tokens) < 3:
+            char = f.read(1)
+            if char == b"":
+                raise ValueError(f"Unexpected end of file {filename}")
+            if char == b"#":
+                f.readline()
+            elif char.isspace():
+                if token:
+                    tokens.append(int(token))
+                    token = b""
+            else:
+                token += char
+        # A single whitespace character was read after the maximal value
+        offset = f.tell()
+    width, height, maxval = tokens
+    return width, height, maxval, offset
+
+
+def load_pgm(filename: str) -> Tuple[np.ndarray, int]:
+    """
+    Memory-maps pixels of a binary PGM file. Rows are flipped, so that row
+    0 of the result is the bottom row of the image. Returns the pixels and
+    the value of white.
+    """
+    width, height, maxval, offset = read_pgm_header(filename)
+    dtype = np.uint8 if maxval < 256 else np.dtype(">u2")
+    pixels = np.memmap(filename, dtype=dtype, mode="r", offset=offset,
+                       shape=(height, width))
+    return pixels[::-1], maxval
+
+
+def load_png(filename: str) -> Tuple[np.ndarray, int]:
+    """
+    PNG files are compressed and cannot be memory-mapped, so they are
+    decoded once (requires Pillow) and cached as a grayscale .npy file next
+    to the image. The cache is memory-mapped. Rows are flipped like in
+    load_pgm.
+    """
+    cache = os.path.splitext(filename)[0] + ".npy"
+    if not os.path.exists(cache) or \
+            os.path.getmtime(cache) < os.path.getmtime(filename):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError("Loading PNG worlds requires Pillow "
+                              "(pip install Pillow)")
+        with Image.open(filename) as image:
+            np.save(cache, np.asarray(image.convert("L")))
+    return np.load(cache, mmap_mode="r")[::-1], 255
+
+
+def load_bitmap(filename: str) -> Tuple[np.ndarray, int]:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".pgm":
+        return load_pgm(filename)
+    if extension == ".png":
+        return load_png(filename)
+    raise ValueError(f"Unsupported bitmap format {extension}")
+
+
+class BitmapWorld(sworld.SimulatedWorld):
+    """
+    World loaded from a PGM or PNG bitmap. Map holds pixel values, pixels
+    darker than threshold (a fraction of white) are obstacles. If pose is
+    not given, a random free pose (seeded by seed) is chosen.
+    """
+    def __init__(self, filename: str, pose: geometry.Pose = None,
+                 threshold: float = 0.5, clearance: float = 5.0,
+                 seed: int = None):
+        self.map, white = load_bitmap(filename)
+        self.threshold = threshold * white
+        if pose is None:
+            pose = self.random_free_pose(clearance, seed)
+        self.pose = pose
+
+    def is_obstacle(self, values: np.ndarray) -> np.ndarray:
+        return values < self.threshold
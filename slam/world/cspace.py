@@ -0,0 +1,90 @@
+from typing import Tuple
+
+import numpy as np
+from scipy.ndimage import distance_transform_edt
+
+import slam.common.geometry as geometry
+import slam.world.raytrace as raytrace
+
+
+class ConfigurationSpace():
+    """
+    Configuration space of a prediction: for every cell, the distance to the
+    closest obstacle (a cell with value over threshold). A robot with radius
+    r fits on a cell if the distance is larger than r. Cells outside the
+    prediction are free.
+    origin is the location of cell [0][0] of the prediction.
+    """
+    def __init__(self, prediction: np.ndarray, origin: geometry.Point,
+                 threshold: float = 1.0):
+        self.origin = origin
+        self.threshold = threshold
+        obstacles = prediction > threshold
+        if np.any(obstacles):
+            self.distances = distance_transform_edt(~obstacles)
+        else:
+            self.distances = np.full(prediction.shape, np.inf)
+
+    def location_to_index(self, location: geometry.Point) -> Tuple[int, int]:
+        return (int(round(location.x - self.origin.x)),
+                int(round(location.y - self.origin.y)))
+
+    def distance_to_obstacle(self, location: geometry.Point) -> float:
+        x, y = self.location_to_index(location)
+        height, width = self.distances.shape
+        if 0 <= x < width and 0 <= y < height:
+            return self.distances[y][x]
+        return np.inf
+
+    def is_point_free(self, location: geometry.Point,
+                      radius: float) -> bool:
+        return self.distance_to_obstacle(location) > radius
+
+    def free_cells(self, radius: float,
+                   start: geometry.Point = None) -> np.ndarray:
+        """
+        Returns a mask of cells where a robot with radius fits. If start is
+        given, cells closer than radius to start only have to be as far from
+        obstacles as start is (see is_segment_free).
+        """
+        free = self.distances > radius
+        if start is not None:
+            x_start, y_start = self.location_to_index(start)
+            height, width = self.distances.shape
+            y, x = np.ogrid[:height, :width]
+            near_start = np.hypot(x - x_start, y - y_start) < radius
+            free |= near_start & self.keeps_clearance(self.distances, start)
+        return free
+
+    def keeps_clearance(self, distances: np.ndarray,
+                        start: geometry.Point) -> np.ndarray:
+        """
+        Which of distances (to the closest obstacle) are free of obstacles
+        and at least as large as the distance at start.
+        """
+        return (distances > 0) & \
+            (distances >= self.distance_to_obstacle(start))
+
+    def is_segment_free(self, start: geometry.Point, end: geometry.Point,
+                        radius: float) -> bool:
+        """
+        Checks that a robot with radius fits on every cell of the rasterized
+        segment from start to end. Cells closer than radius to start (where
+        the robot already is) only have to be at least as far from obstacles
+        as start, so that a robot that is too close to an obstacle can move
+        along or away from it, but not closer to it.
+        """
+        x_start, y_start = self.location_to_index(start)
+        x_end, y_end = self.location_to_index(end)
+        _, x, y = raytrace.trace_rays([x_start], [y_start], [x_end], [y_end],
+                                      include_end=True)
+        height, width = self.distances.shape
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        x, y = x[inside], y[inside]
+        distances = self.distances[y, x]
+        near_start = np.hypot(x - x_start, y - y_start) < radius
+        free = np.where(near_start,
+                        self.keeps_clearance(distances, start) |
+                        (distances > radius),
+                        distances > radius)
+        return bool(np.all(free))
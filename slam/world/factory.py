@@ -0,0 +1,41 @@
+import slam.common.geometry as geometry
+import slam.world.bitmap as bitmap
+import slam.world.generated as generated
+import slam.world.simulated as sworld
+from slam.common.enums import WorldType
+
+GENERATORS = {
+    WorldType.ROOMS: generated.rooms,
+    WorldType.CLUTTERED: generated.cluttered,
+    WorldType.MAZE: generated.maze,
+}
+
+
+def generate_world(world_type: WorldType, width: int, height: int,
+                   seed: int = None, pose: geometry.Pose = None,
+                   clearance: float = 5.0, **kwargs) -> sworld.SimulatedWorld:
+    """
+    Random world made by the generator of world_type. kwargs are passed to
+    the generator. If pose is not given, the robot starts at a random pose
+    at least clearance cells away from obstacles.
+    """
+    obstacle_map = GENERATORS[world_type](width, height, seed, **kwargs)
+    world = sworld.SimulatedWorld.from_array(obstacle_map, pose)
+    if pose is None:
+        world.update_pose(world.random_free_pose(clearance, seed))
+    return world
+
+
+def create_world(world_type: WorldType, **kwargs) -> sworld.SimulatedWorld:
+    """
+    kwargs for WorldType.PREDEFINED: key (see PredefinedWorld),
+    WorldType.BITMAP: filename and others of BitmapWorld,
+    generated worlds: width, height and others of generate_world.
+    """
+    if world_type == WorldType.PREDEFINED:
+        return sworld.PredefinedWorld(**kwargs)
+    if world_type == WorldType.BITMAP:
+        return bitmap.BitmapWorld(**kwargs)
+    if world_type in GENERATORS:
+        return generate_world(world_type, **kwargs)
+    raise TypeError(f"Unknown world type {world_type}")
@@ -0,0 +1,184 @@
+"""
+Seeded random worlds of configurable size. Generators return maps of
+obstacles, boolean arrays indexed [y][x].
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+
+def cluttered(width: int, height: int, seed: int = None,
+              density: float = 0.1, min_size: int = 2,
+              max_size: int = 10) -> np.ndarray:
+    """
+    Open space with rectangular obstacles of random sizes. Obstacles may
+    overlap, so density is an upper bound of the fraction of obstacle cells.
+    """
+    rng = np.random.default_rng(seed)
+    obstacle_map = np.zeros((height, width), dtype=bool)
+    mean_area = ((min_size + max_size) / 2) ** 2
+    count = int(density * width * height / mean_area)
+    xs = rng.integers(0, width, count)
+    ys = rng.integers(0, height, count)
+    sizes_x = rng.integers(min_size, max_size + 1, count)
+    sizes_y = rng.integers(min_size, max_size + 1, count)
+    for (x, y, w, h) in zip(xs, ys, sizes_x, sizes_y):
+        obstacle_map[y:y+h, x:x+w] = True
+    return obstacle_map
+
+
+def maze(width: int, height: int, seed: int = None,
+         corridor_width: int = 20, wall_thickness: int = 2) -> np.ndarray:
+    """
+    Perfect maze (exactly one path between any two places) with corridors
+    of width corridor_width, carved by a randomized depth-first search.
+    """
+    rng = np.random.default_rng(seed)
+    pitch = corridor_width + wall_thickness
+    cols = (width - wall_thickness) // pitch
+    rows = (height - wall_thickness) // pitch
+    if cols < 1 or rows < 1:
+        raise ValueError(f"World {width}x{height} is too small for a maze "
+                         f"with corridors of width {corridor_width}")
+
+    def corridor(size: int, count: int) -> np.ndarray:
+        offsets = np.arange(size) - wall_thickness
+        return (offsets >= 0) & (offsets < count * pitch) & \
+            (offsets % pitch < corridor_width)
+
+    obstacle_map = np.ones((height, width), dtype=bool)
+    # Every cell of the maze is reached, so all of them are carved at once
+    obstacle_map[np.outer(corridor(height, rows), corridor(width, cols))] = \
+        False
+
+    visited = np.zeros((rows, cols), dtype=bool)
+    start = (int(rng.integers(rows)), int(rng.integers(cols)))
+    visited[start] = True
+    stack = [start]
+    while stack:
+        (r, c) = stack[-1]
+        neighbours = [(r + dr, c + dc)
+                      for (dr, dc) in [(0, 1), (1, 0), (0, -1), (-1, 0)]
+                      if 0 <= r + dr < rows and 0 <= c + dc < cols and
+                      not visited[r + dr, c + dc]]
+        if not neighbours:
+            stack.pop()
+            continue
+        (nr, nc) = neighbours[rng.integers(len(neighbours))]
+        # Remove the wall between both cells
+        x0 = wall_thickness + min(c, nc) * pitch
+        y0 = wall_thickness + min(r, nr) * pitch
+        x1 = wall_thickness + max(c, nc) * pitch + corridor_width
+        y1 = wall_thickness + max(r, nr) * pitch + corridor_width
+        obstacle_map[y0:y1, x0:x1] = False
+        visited[nr, nc] = True
+        stack.append((nr, nc))
+    return obstacle_map
+
+
+Rectangle = Tuple[int, int, int, int]  # x_min, x_max, y_min, y_max (excl.)
+
+
+def overlap(a: Rectangle, b: Rectangle) -> bool:
+    return a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]
+
+
+def add_wall(obstacle_map: np.ndarray, rng: np.random.Generator,
+             room: Rectangle, position: int, vertical: bool, door_width: int,
+             wall_thickness: int) -> Tuple[Rectangle, Rectangle, Rectangle]:
+    """
+    Adds a wall with a door across room, returns the door and both parts
+    of room.
+    """
+    (x0, x1, y0, y1) = room
+    if vertical:
+        y = int(rng.integers(y0, y1 - door_width + 1))
+        obstacle_map[y0:y1, position:position+wall_thickness] = True
+        door = (position, position + wall_thickness, y, y + door_width)
+        first = (x0, position, y0, y1)
+        second = (position + wall_thickness, x1, y0, y1)
+    else:
+        x = int(rng.integers(x0, x1 - door_width + 1))
+        obstacle_map[position:position+wall_thickness, x0:x1] = True
+        door = (x, x + door_width, position, position + wall_thickness)
+        first = (x0, x1, y0, position)
+        second = (x0, x1, position + wall_thickness, y1)
+    obstacle_map[door[2]:door[3], door[0]:door[1]] = False
+    return door, first, second
+
+
+def blocks_door(room: Rectangle, position: int, size: int, vertical: bool,
+                doors: List[Rectangle]) -> bool:
+    (x0, x1, y0, y1) = room
+    if vertical:
+        wall = (position, position + size, y0 - 1, y1 + 1)
+    else:
+        wall = (x0 - 1, x1 + 1, position, position + size)
+    return any(overlap(wall, door) for door in doors)
+
+
+def touching(room: Rectangle, doors: List[Rectangle]) -> List[Rectangle]:
+    (x0, x1, y0, y1) = room
+    return [d for d in doors if overlap((x0 - 1, x1 + 1, y0 - 1, y1 + 1), d)]
+
+
+def find_split(rng: np.random.Generator, room: Rectangle, start: int,
+               end: int, size: int, vertical: bool, doors: List[Rectangle],
+               room_size: int) -> int:
+    """
+    Returns the position of new walls of width size between start and end
+    that leave room_size on both sides and do not block doors, or None if
+    there is none.
+    """
+    if end - start < 2 * room_size + size:
+        return None
+    # A few tries to find a place where the new walls do not block doors
+    for _ in range(10):
+        position = int(rng.integers(start + room_size,
+                                    end - room_size - size + 1))
+        if not blocks_door(room, position, size, vertical, doors):
+            return position
+    return None
+
+
+def rooms(width: int, height: int, seed: int = None, room_size: int = 40,
+          corridor_width: int = 20, corridor_probability: float = 0.3,
+          door_width: int = 16, wall_thickness: int = 2) -> np.ndarray:
+    """
+    Rooms and corridors made by splitting the world recursively. Each split
+    adds a wall with a door or, with corridor_probability, a corridor
+    between two walls with a door each. Rooms are at least room_size cells
+    wide, all of them are connected.
+    """
+    if door_width > room_size or door_width > corridor_width:
+        raise ValueError("Doors must be narrower than rooms and corridors")
+    rng = np.random.default_rng(seed)
+    obstacle_map = np.zeros((height, width), dtype=bool)
+
+    # Rooms to split with doors in their surrounding walls
+    stack = [((0, width, 0, height), [])]
+    while stack:
+        (room, doors) = stack.pop()
+        (x0, x1, y0, y1) = room
+        vertical = x1 - x0 >= y1 - y0
+        (start, end) = (x0, x1) if vertical else (y0, y1)
+        corridor = rng.random() < corridor_probability
+        size = 2 * wall_thickness + corridor_width if corridor \
+            else wall_thickness
+        position = find_split(rng, room, start, end, size, vertical, doors,
+                              room_size)
+        if position is None:
+            continue
+
+        door, first, second = add_wall(obstacle_map, rng, room, position,
+                                       vertical, door_width, wall_thickness)
+        new_doors = [door]
+        if corridor:
+            position += wall_thickness + corridor_width
+            door, _, second = add_wall(obstacle_map, rng, second, position,
+                                       vertical, door_width, wall_thickness)
+            new_doors.append(door)
+        doors = doors + new_doors
+        stack.append((first, touching(first, doors)))
+        stack.append((second, touching(second, doors)))
+    return obstacle_map
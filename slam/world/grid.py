@@ -0,0 +1,173 @@
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+
+class TiledGrid():
+    """
+    Unbounded grid stored as a dictionary of fixed-size numpy tiles, keyed by
+    the tile index (tx, ty). Cell (0, 0) never moves, so growing the grid
+    only allocates new tiles and leaves existing values in place.
+    Cells that belong to no tile have value 0.
+    """
+    def __init__(self, tile_size: int = 32, dtype: np.dtype = np.float64):
+        self.tile_size = tile_size
+        self.dtype = dtype
+        self.tiles: Dict[Tuple[int, int], np.ndarray] = dict()
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def get_tile(self, tx: int, ty: int, create: bool = False) -> np.ndarray:
+        """
+        Returns the tile with index (tx, ty). Returns None if the tile does not
+        exist and create is False.
+        """
+        tile = self.tiles.get((tx, ty))
+        if tile is None and create:
+            tile = np.zeros([self.tile_size, self.tile_size], dtype=self.dtype)
+            self.tiles[(tx, ty)] = tile
+        return tile
+
+    def overlapping_tiles(self, x_min: int, y_min: int, x_max: int,
+                          y_max: int) -> Iterator[Tuple[int, int, slice,
+                                                        slice, slice, slice]]:
+        """
+        Iterates over tiles that overlap the region [x_min, x_max] x
+        [y_min, y_max] (inclusive). For each tile yields its index and the
+        slices of the overlap in tile and in region coordinates:
+        (tx, ty, tile_y, tile_x, region_y, region_x).
+        """
+        ts = self.tile_size
+        for ty in range(y_min // ts, y_max // ts + 1):
+            y_from = max(y_min, ty * ts)
+            y_to = min(y_max, (ty + 1) * ts - 1)
+            tile_y = slice(y_from - ty * ts, y_to - ty * ts + 1)
+            region_y = slice(y_from - y_min, y_to - y_min + 1)
+            for tx in range(x_min // ts, x_max // ts + 1):
+                x_from = max(x_min, tx * ts)
+                x_to = min(x_max, (tx + 1) * ts - 1)
+                tile_x = slice(x_from - tx * ts, x_to - tx * ts + 1)
+                region_x = slice(x_from - x_min, x_to - x_min + 1)
+                yield tx, ty, tile_y, tile_x, region_y, region_x
+
+    def add_region(self, x_min: int, y_min: int, values: np.ndarray,
+                   limits: Tuple[float, float] = None):
+        """
+        Adds values to the grid. values[0][0] is added to the cell
+        (x_min, y_min). If limits are given, changed cells are clamped to
+        [limits[0], limits[1]]. Grids with an integer dtype store values
+        rounded to integers and clamped to the range of the dtype.
+        """
+        integer = np.issubdtype(self.dtype, np.integer)
+        if integer:
+            info = np.iinfo(self.dtype)
+            if limits is None:
+                limits = (info.min, info.max)
+            limits = (max(limits[0], info.min), min(limits[1], info.max))
+        height, width = values.shape
+        x_max = x_min + width - 1
+        y_max = y_min + height - 1
+        for (tx, ty, tile_y, tile_x, region_y, region_x) in \
+                self.overlapping_tiles(x_min, y_min, x_max, y_max):
+            region = values[region_y, region_x]
+            if not np.any(region):
+                continue
+            tile = self.get_tile(tx, ty, create=True)
+            if integer:
+                # Sum without overflow, then store rounded and clamped
+                tile[tile_y, tile_x] = np.clip(
+                    tile[tile_y, tile_x] + np.rint(region), *limits)
+                continue
+            tile[tile_y, tile_x] += region
+            if limits is not None:
+                np.clip(tile[tile_y, tile_x], *limits,
+                        out=tile[tile_y, tile_x])
+
+    def get_region(self, x_min: int, y_min: int, x_max: int, y_max: int,
+                   out: np.ndarray = None) -> np.ndarray:
+        """
+        Returns values in the region [x_min, x_max] x [y_min, y_max]
+        (inclusive) as an array indexed by [y - y_min][x - x_min].
+        If out is given, values are written into it.
+        """
+        shape = (y_max - y_min + 1, x_max - x_min + 1)
+        if out is None:
+            out = np.zeros(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError(f"Expected array of shape {shape}, got "
+                             f"{out.shape}")
+        for (tx, ty, tile_y, tile_x, region_y, region_x) in \
+                self.overlapping_tiles(x_min, y_min, x_max, y_max):
+            tile = self.get_tile(tx, ty)
+            if tile is None:
+                out[region_y, region_x] = 0
+            else:
+                out[region_y, region_x] = tile[tile_y, tile_x]
+        return out
+
+
+Region = Tuple[int, int, int, int]
+
+
+def intersect_regions(first: Region, second: Region) -> Region:
+    """
+    Returns the intersection of two regions (x_min, y_min, x_max, y_max) with
+    inclusive bounds or None if they do not overlap.
+    """
+    x_min, y_min = max(first[0], second[0]), max(first[1], second[1])
+    x_max, y_max = min(first[2], second[2]), min(first[3], second[3])
+    if x_min > x_max or y_min > y_max:
+        return None
+    return (x_min, y_min, x_max, y_max)
+
+
+def expand_region(region: Region, margin: int, bounds: Region = None) \
+        -> Region:
+    """
+    Expands region by margin on every side and crops it to bounds.
+    """
+    x_min, y_min, x_max, y_max = region
+    expanded = (x_min - margin, y_min - margin, x_max + margin,
+                y_max + margin)
+    if bounds is None:
+        return expanded
+    return intersect_regions(expanded, bounds)
+
+
+class IntegralImage():
+    """
+    Summed-area table of a 2D array. The sum over any rectangle of the array
+    takes four lookups.
+    """
+    def __init__(self, values: np.ndarray):
+        height, width = values.shape
+        self.shape = values.shape
+        self.table = np.zeros([height + 1, width + 1],
+                              dtype=np.result_type(values.dtype, np.int64))
+        np.cumsum(values, axis=0, out=self.table[1:, 1:])
+        np.cumsum(self.table[1:, 1:], axis=1, out=self.table[1:, 1:])
+
+    def window_sum(self, x_min, y_min, x_max, y_max):
+        """
+        Returns sums of values in [x_min, x_max] x [y_min, y_max] (inclusive
+        indices) and the number of cells in each window. Windows are cropped
+        to the array. Arguments can be integers or arrays of integers.
+        """
+        height, width = self.shape
+        if isinstance(x_min, (int, np.integer)):
+            # Scalar window, avoid the overhead of numpy functions
+            x_from = min(max(x_min, 0), width)
+            y_from = min(max(y_min, 0), height)
+            x_to = min(max(x_max + 1, x_from), width)
+            y_to = min(max(y_max + 1, y_from), height)
+        else:
+            x_from = np.clip(x_min, 0, width)
+            y_from = np.clip(y_min, 0, height)
+            x_to = np.clip(np.asarray(x_max) + 1, x_from, width)
+            y_to = np.clip(np.asarray(y_max) + 1, y_from, height)
+        table = self.table
+        sums = table[y_to, x_to] - table[y_from, x_to] - \
+            table[y_to, x_from] + table[y_from, x_from]
+        sizes = (x_to - x_from) * (y_to - y_from)
+        return sums, sizes
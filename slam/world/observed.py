@@ -1,3 +1,4 @@
+import functools
 import random
 from typing import Callable, Dict, List, Tuple
 
@@ -6,15 +7,26 @@ from scipy.ndimage import gaussian_filter
 
 import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
+import slam.world.cspace as cspace
+import slam.world.grid as sgrid
+import slam.world.occupancy as occupancy
+import slam.world.raytrace as raytrace
 import slam.world.world as world
 from slam.common.enums import ObservationType
 
+# Same as the default truncate of scipy.ndimage.gaussian_filter
+BLUR_TRUNCATE = 4.0
 
-def get_obstacle_filter(size: int = 7, sigma: float = 2.) -> np.ndarray:
 
+@functools.lru_cache(maxsize=None)
+def get_obstacle_filter(size: int = 7, sigma: float = 2.) -> np.ndarray:
+    """
+    Kernels are cached per (size, sigma). The returned array is read-only.
+    """
     kernel = np.zeros([size, size])
     kernel[size//2][size//2] = 1
     kernel = 100 * gaussian_filter(kernel, sigma=sigma)
+    kernel.setflags(write=False)
     return kernel
 
 
@@ -37,37 +49,42 @@ def apply_filter_on_coordinate(grid: np.ndarray, x_center: int,
     return grid
 
 
-def apply_function_on_path(grid: np.ndarray, x_start: int, y_start: int,
-                           x_end: int, y_end: int,
-                           f: Callable[[float], float]) -> np.ndarray:
+def apply_filter_on_coordinates(grid: np.ndarray, x_centers: np.ndarray,
+                                y_centers: np.ndarray,
+                                kernel: np.ndarray) -> np.ndarray:
     """
-    Apply function f on the path from (x_start, y_start) to (x_end, y_end).
+    Add kernel to grid once for every center (x_centers[i], y_centers[i]).
+    Equivalent to calling apply_filter_on_coordinate with f=sum for each
+    center, including how cells outside the grid are skipped.
     """
-    p = geometry.Pose(x_start, y_start)
-    p_end = geometry.Point(x_end, y_end)
-    p.turn_towards(p_end)
-    x_old = x_start
-    y_old = y_start
+    # Sparse hit image: every distinct center with the number of its hits
+    centers, hits = np.unique(np.stack([np.asarray(x_centers).ravel(),
+                                        np.asarray(y_centers).ravel()]),
+                              axis=1, return_counts=True)
+    if centers.size == 0:
+        return grid
 
-    while p.position.distance_to(p_end) > 0.5:
-        x = int(round(p.position.x))
-        y = int(round(p.position.y))
-        p.move_forward(1)
-
-        if x == x_old and y == y_old:
-            continue
+    filter_sizey, filter_sizex = kernel.shape
+    offset_y, offset_x = np.indices(kernel.shape)
+    offset_x = (offset_x - filter_sizex // 2).ravel()
+    offset_y = (offset_y - filter_sizey // 2).ravel()
 
-        grid[y][x] = f(grid[y][x])
+    x = (centers[0][:, np.newaxis] + offset_x).ravel()
+    y = (centers[1][:, np.newaxis] + offset_y).ravel()
+    values = (hits[:, np.newaxis] * kernel.ravel()).ravel()
 
-        x_old = x
-        y_old = y
+    height, width = grid.shape
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    np.add.at(grid, (y[inside], x[inside]), values[inside])
     return grid
 
 
 class DictEntry():
-    def __init__(self, observations: List[datapoint.Observation]):
+    """
+    Batches of observations made from one pose.
+    """
+    def __init__(self, observations: List[datapoint.Observations]):
         self.observations = observations
-        self.used_in_prediction = False
 
     def __getitem__(self, key: int):
         if not isinstance(key, int):
@@ -79,51 +96,138 @@ class DictEntry():
 
 
 class ObservedWorld(world.World):
-    def __init__(self):
+    """
+    Evidence about the world is accumulated in a tiled grid with a fixed
+    origin (the location of the first pose). last_prediction and
+    last_prediction_blurred are dense views of the part of the grid within
+    the world borders; prediction_origin is the location of their cell [0][0].
+    How observations change the grid is defined by the occupancy model. Dense
+    views are always in the evidence scale of the model.
+    """
+    def __init__(self, model: occupancy.OccupancyModel = None,
+                 tile_size: int = 32):
         self.map: Dict[geometry.Point, DictEntry] = dict()
         self.last_prediction = None
         self.last_prediction_blurred = None
 
+        # Bounding box of all poses and observations, kept up to date in
+        # add_observation. borders_version changes whenever the box changes.
+        self.borders = None
+        self.borders_version = 0
+
+        self.model = model if model is not None else \
+            occupancy.EvidenceModel()
+        self.origin = None
+        self.grid = sgrid.TiledGrid(tile_size, dtype=self.model.dtype)
+        self.unprocessed: List[Tuple[geometry.Point,
+                                     datapoint.Observations]] = []
+
+        # Cell bounds (x_min, y_min, x_max, y_max) of the dense views
+        self.prediction_bounds = None
+        self.prediction_origin = None
+        self.prediction_sigma = None
+        self.prediction_version = 0
+        self.dirty_regions = None
+
+        self.integral_images: Dict[Tuple[str, float],
+                                   sgrid.IntegralImage] = dict()
+        self.integral_images_version = None
+        self.configuration_spaces: Dict[float,
+                                        cspace.ConfigurationSpace] = dict()
+        self.configuration_spaces_version = None
+
     def add_observation(self, pose: datapoint.Pose,
                         observation: datapoint.Observation):
+        self.add_observations(pose, datapoint.Observations(
+            *pose.location, [observation.location.x],
+            [observation.location.y], [observation.type]))
+
+    def add_observations(self, pose: datapoint.Pose,
+                         observations: datapoint.Observations):
+        """
+        Adds a batch of observations made from pose (e.g. a whole scan).
+        """
         if pose.location in self.map:
-            self.map[pose.location].observations.append(observation)
+            self.map[pose.location].observations.append(observations)
         else:
-            self.map[pose.location] = DictEntry([observation])
+            self.map[pose.location] = DictEntry([observations])
+        if self.origin is None:
+            self.origin = geometry.Point(*pose.location)
+        self.extend_borders(pose.location)
+        if len(observations) == 0:
+            return
+        self.unprocessed.append((pose.location, observations))
+        self.extend_borders(geometry.Point(observations.xs.min(),
+                                           observations.ys.min()))
+        self.extend_borders(geometry.Point(observations.xs.max(),
+                                           observations.ys.max()))
+
+    def extend_borders(self, location: geometry.Point):
+        """
+        Extends the world borders so that they include location.
+        """
+        x, y = *location,
+        if self.borders is None:
+            self.borders = [x, y, x, y]
+            self.borders_version += 1
+            return
+
+        x_min, y_min, x_max, y_max = self.borders
+        if x_min <= x <= x_max and y_min <= y <= y_max:
+            return
+        self.borders = [min(x_min, x), min(y_min, y),
+                        max(x_max, x), max(y_max, y)]
+        self.borders_version += 1
 
     def get_world_borders(self) -> Tuple[geometry.Point, geometry.Point]:
-        if len(self.map) == 0:
+        if self.borders is None:
             return None, None
 
-        x_min, y_min = np.Inf, np.Inf
-        x_max, y_max = np.NINF, np.NINF
-        for key, entry in self.map.items():
-            x_coords = [o.location.x for o in entry] + [key.x]
-            x_min = min(x_min, min(x_coords))
-            x_max = max(x_max, max(x_coords))
-
-            y_coords = [o.location.y for o in entry] + [key.y]
-            y_min = min(y_min, min(y_coords))
-            y_max = max(y_max, max(y_coords))
+        x_min, y_min, x_max, y_max = self.borders
         return (geometry.Point(x_min, y_min), geometry.Point(x_max, y_max))
 
+    def location_to_cell(self, location: geometry.Point) -> Tuple[int, int]:
+        """
+        Returns the grid cell (wrt. the fixed origin) containing location.
+        """
+        return (int(round(location.x - self.origin.x)),
+                int(round(location.y - self.origin.y)))
+
+    def locations_to_cells(self, xs: np.ndarray, ys: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized location_to_cell.
+        """
+        return (np.rint(xs - self.origin.x).astype(int),
+                np.rint(ys - self.origin.y).astype(int))
+
+    def location_to_index(self, location: geometry.Point) -> Tuple[int, int]:
+        """
+        Returns indices (x, y) of location in the last prediction. Indices
+        can be out of range.
+        """
+        x, y = self.location_to_cell(location)
+        x_min, y_min, _, _ = self.prediction_bounds
+        return x - x_min, y - y_min
+
     def get_area_around_point(self, location: geometry.Point, radius: int,
                               blurred: bool = True) -> np.array:
         """
         Returns a square area with the center in location and the square side
-        of 2 * radius + 1.
+        of 2 * radius + 1. The area is cropped to the world borders.
         """
-        min_border, max_border = self.get_world_borders()
-        loc_x, loc_y = *location,
-        x_min = int(round(max(min_border.x, loc_x - radius) - min_border.x))
-        x_max = int(round(min(max_border.x, loc_x + radius) - min_border.x))
-        y_min = int(round(max(min_border.y, loc_y - radius) - min_border.y))
-        y_max = int(round(min(max_border.y, loc_y + radius) - min_border.y))
-
         if blurred:
             grid = self.last_prediction_blurred
         else:
             grid = self.last_prediction
+        height, width = grid.shape
+        loc_x, loc_y = self.location_to_index(location)
+        x_min = max(0, loc_x - radius)
+        x_max = min(width - 1, loc_x + radius)
+        y_min = max(0, loc_y - radius)
+        y_max = min(height - 1, loc_y + radius)
+        # Empty area if the square is completely out of the world
+        x_max, y_max = max(x_min - 1, x_max), max(y_min - 1, y_max)
         area = grid[y_min:y_max+1, x_min:x_max+1]
         return area
 
@@ -132,57 +236,224 @@ class ObservedWorld(world.World):
         return min_border.x <= point.x <= max_border.x and \
             min_border.y <= point.y <= max_border.y
 
+    def process_observations(self):
+        """
+        Adds evidence of observations that were not yet processed to the grid.
+        Only the part of the grid that is covered by new observations is
+        touched. Returns the affected cell bounds or None.
+        """
+        if len(self.unprocessed) == 0:
+            return None
+
+        kernel = self.model.hit_kernel(get_obstacle_filter(sigma=1))
+        margin = max(kernel.shape) // 2
+        positions = np.array([self.location_to_cell(position)
+                              for (position, _) in self.unprocessed])
+        counts = [len(obs) for (_, obs) in self.unprocessed]
+        pos_x, pos_y = np.repeat(positions, counts, axis=0).T
+        x, y = self.locations_to_cells(
+            np.concatenate([obs.xs for (_, obs) in self.unprocessed]),
+            np.concatenate([obs.ys for (_, obs) in self.unprocessed]))
+        x_min = min(pos_x.min(), x.min()) - margin
+        x_max = max(pos_x.max(), x.max()) + margin
+        y_min = min(pos_y.min(), y.min()) - margin
+        y_max = max(pos_y.max(), y.max()) + margin
+
+        pos_x, pos_y = pos_x - x_min, pos_y - y_min
+        x, y = x - x_min, y - y_min
+        patch = np.zeros([y_max - y_min + 1, x_max - x_min + 1])
+        obstacle = np.concatenate([obs.types == ObservationType.OBSTACLE
+                                   for (_, obs) in self.unprocessed])
+        patch = apply_filter_on_coordinates(patch, x[obstacle], y[obstacle],
+                                            kernel)
+        patch = raytrace.add_on_rays(patch, pos_x, pos_y, x, y,
+                                     self.model.miss_value())
+        self.grid.add_region(x_min, y_min, patch, limits=self.model.limits)
+        self.unprocessed = []
+        return (x_min, y_min, x_max, y_max)
+
     def predict_world(self, sigma: int = 1) \
             -> Tuple[np.ndarray, geometry.Point]:
         """
         Returns predited world and the origin of the world.
+        Only the part of the blurred prediction that new observations or new
+        borders could change is blurred again. The regions that changed are
+        stored in dirty_regions (None if the whole prediction changed).
         """
         min_border, max_border = self.get_world_borders()
         if min_border is None or max_border is None:
             return (None, None)
-        width = int(round(max_border.x - min_border.x)) + 1
-        height = int(round(max_border.y - min_border.y)) + 1
-        if self.last_prediction is not None and \
-                self.last_prediction.shape == (height, width):
-            predicted = self.last_prediction
-            reset_saved_prediction = False
+
+        changed = self.process_observations()
+        bounds = (*self.location_to_cell(min_border),
+                  *self.location_to_cell(max_border))
+        x_min, y_min, x_max, y_max = bounds
+        radius = int(BLUR_TRUNCATE * sigma + 0.5)
+        old_bounds = self.prediction_bounds
+        dirty = self.get_dirty_regions(changed, bounds, sigma, radius)
+
+        if self.last_prediction is None or old_bounds != bounds:
+            self.last_prediction = self.model.to_evidence(
+                self.grid.get_region(*bounds))
+            self.prediction_bounds = bounds
+            self.prediction_origin = geometry.Point(self.origin.x + x_min,
+                                                    self.origin.y + y_min)
+
+        if dirty is None:
+            blurred = gaussian_filter(self.last_prediction, sigma=sigma,
+                                      truncate=BLUR_TRUNCATE)
         else:
-            predicted = np.zeros([height, width])
-            reset_saved_prediction = True
-        kernel = get_obstacle_filter(sigma=1)
-        for (position, observations) in self.map.items():
-            if not reset_saved_prediction and observations.used_in_prediction:
-                continue
-            pos_x = int(round(position.x - min_border.x))
-            pos_y = int(round(position.y - min_border.y))
-            observations.used_in_prediction = True
-            for obs in observations:
-                x = int(round(obs.location.x - min_border.x))
-                y = int(round(obs.location.y - min_border.y))
-                if obs.type == ObservationType.OBSTACLE:
-                    predicted = apply_filter_on_coordinate(predicted, x, y,
-                                                           kernel)
-                predicted = apply_function_on_path(predicted, pos_x, pos_y, x,
-                                                   y, lambda x: x - 6)
-        self.last_prediction = predicted
-        predicted = gaussian_filter(predicted, sigma=sigma)
-        self.last_prediction_blurred = predicted
-        return (predicted, min_border)
+            blurred = np.zeros_like(self.last_prediction)
+            if old_bounds != bounds:
+                # Keep the old blurred values in place
+                ox_min, oy_min, ox_max, oy_max = old_bounds
+                blurred[oy_min-y_min:oy_max-y_min+1,
+                        ox_min-x_min:ox_max-x_min+1] = \
+                    self.last_prediction_blurred
+            else:
+                blurred = self.last_prediction_blurred
+            for region in dirty:
+                self.blur_region(blurred, region, sigma, radius)
+
+        self.last_prediction_blurred = blurred
+        self.prediction_sigma = sigma
+        self.dirty_regions = dirty
+        if dirty is None or len(dirty) > 0:
+            self.prediction_version += 1
+        return (blurred, self.prediction_origin)
+
+    def get_dirty_regions(self, changed: sgrid.Region, bounds: sgrid.Region,
+                          sigma: int, radius: int) -> List[sgrid.Region]:
+        """
+        Returns regions of the prediction with bounds that have to be blurred
+        again after cells in changed (or None) changed, or None if the whole
+        prediction has to be blurred. If bounds did not change, the changed
+        cells are copied into last_prediction.
+        """
+        old_bounds = self.prediction_bounds
+        if self.last_prediction is None or sigma != self.prediction_sigma:
+            return None
+        if old_bounds != bounds:
+            dirty = self.get_grown_regions(old_bounds, bounds, radius)
+            if changed is not None:
+                dirty.append(sgrid.expand_region(changed, radius, bounds))
+            return dirty
+
+        if changed is not None:
+            changed = sgrid.intersect_regions(changed, bounds)
+        if changed is None:
+            return []
+        # Copy only the changed part of the grid
+        x_min, y_min, _, _ = bounds
+        cx_min, cy_min, cx_max, cy_max = changed
+        region = self.grid.get_region(*changed)
+        self.last_prediction[cy_min-y_min:cy_max-y_min+1,
+                             cx_min-x_min:cx_max-x_min+1] = \
+            self.model.to_evidence(region)
+        return [sgrid.expand_region(changed, radius, bounds)]
+
+    def get_grown_regions(self, old_bounds: sgrid.Region,
+                          bounds: sgrid.Region,
+                          radius: int) -> List[sgrid.Region]:
+        """
+        Returns regions of the blurred prediction that change when the
+        borders grow from old_bounds to bounds: new cells and old cells that
+        are within radius of a side that moved.
+        """
+        ox_min, oy_min, ox_max, oy_max = old_bounds
+        x_min, y_min, x_max, y_max = bounds
+        regions = []
+        if x_min < ox_min:
+            regions.append((x_min, y_min, ox_min + radius - 1, y_max))
+        if x_max > ox_max:
+            regions.append((ox_max - radius + 1, y_min, x_max, y_max))
+        if y_min < oy_min:
+            regions.append((x_min, y_min, x_max, oy_min + radius - 1))
+        if y_max > oy_max:
+            regions.append((x_min, oy_max - radius + 1, x_max, y_max))
+        return [r for r in (sgrid.intersect_regions(r, bounds)
+                            for r in regions) if r is not None]
+
+    def blur_region(self, blurred: np.ndarray, region: sgrid.Region,
+                    sigma: int, radius: int):
+        """
+        Blurs the cells of last_prediction within region (cell bounds) and
+        writes them to blurred. Values match blurring the whole prediction.
+        """
+        x_min, y_min, _, _ = self.prediction_bounds
+        source = sgrid.expand_region(region, radius, self.prediction_bounds)
+        sx_min, sy_min, sx_max, sy_max = source
+        part = gaussian_filter(
+            self.last_prediction[sy_min-y_min:sy_max-y_min+1,
+                                 sx_min-x_min:sx_max-x_min+1],
+            sigma=sigma, truncate=BLUR_TRUNCATE)
+        rx_min, ry_min, rx_max, ry_max = region
+        blurred[ry_min-y_min:ry_max-y_min+1, rx_min-x_min:rx_max-x_min+1] = \
+            part[ry_min-sy_min:ry_max-sy_min+1, rx_min-sx_min:rx_max-sx_min+1]
 
     def get_state_on_coordiante(self, location: geometry.Point, blurred=True):
-        min_border, _ = self.get_world_borders()
-        x = int(round(location.x - min_border.x))
-        y = int(round(location.y - min_border.y))
+        x, y = self.location_to_index(location)
         if blurred:
             return self.last_prediction_blurred[y][x]
         else:
             return self.last_prediction[y][x]
 
+    def get_integral_image(self, name: str, threshold: float = None) \
+            -> sgrid.IntegralImage:
+        """
+        Returns integral image of cell counts in last_prediction_blurred.
+        name "over": cells with value over threshold; name "unknown": cells
+        with absolute value below 1. Images are cached until the prediction
+        changes.
+        """
+        if self.integral_images_version != self.prediction_version:
+            self.integral_images = dict()
+            self.integral_images_version = self.prediction_version
+
+        key = (name, threshold)
+        if key not in self.integral_images:
+            grid = self.last_prediction_blurred
+            if name == "over":
+                counted = grid > threshold
+            elif name == "unknown":
+                counted = abs(grid) < 1
+            else:
+                raise ValueError(f"Unknown integral image {name}")
+            self.integral_images[key] = sgrid.IntegralImage(counted)
+        return self.integral_images[key]
+
+    def get_configuration_space(self, threshold: float = 1.0) \
+            -> cspace.ConfigurationSpace:
+        """
+        Returns configuration space of last_prediction_blurred. It is computed
+        once per prediction.
+        """
+        if self.configuration_spaces_version != self.prediction_version:
+            self.configuration_spaces = dict()
+            self.configuration_spaces_version = self.prediction_version
+
+        if threshold not in self.configuration_spaces:
+            self.configuration_spaces[threshold] = cspace.ConfigurationSpace(
+                self.last_prediction_blurred, self.prediction_origin,
+                threshold)
+        return self.configuration_spaces[threshold]
+
+    def count_around_point(self, location: geometry.Point, radius: int,
+                           image: sgrid.IntegralImage) -> Tuple[int, int]:
+        """
+        Returns the count of image within the area returned by
+        get_area_around_point and the size of the area.
+        """
+        x, y = self.location_to_index(location)
+        counts, sizes = image.window_sum(x - radius, y - radius, x + radius,
+                                         y + radius)
+        return int(counts), int(sizes)
+
     def is_surrrounding_free(self, location: geometry.Point, radius: int = 5,
                              threshold: float = 0.0):
-        area = self.get_area_around_point(location, radius)
-        area_over_threshold = area > threshold
-        return not np.any(area_over_threshold)
+        image = self.get_integral_image("over", threshold)
+        count, _ = self.count_around_point(location, radius, image)
+        return count == 0
 
     def is_path_free(self, start: geometry.Point, end: geometry.Point,
                      radius: int = 5, threshold: float = 0.0):
@@ -195,6 +466,23 @@ class ObservedWorld(world.World):
                 return False
         return True
 
+    def is_segment_known_free(self, start: geometry.Point,
+                              end: geometry.Point,
+                              threshold: float = -1.0) -> bool:
+        """
+        Checks that every cell of the rasterized segment from start to end
+        has been observed as free: its value in the blurred prediction is at
+        most threshold. Cells outside the prediction are not known.
+        """
+        x_start, y_start = self.location_to_index(start)
+        x_end, y_end = self.location_to_index(end)
+        _, x, y = raytrace.trace_rays([x_start], [y_start], [x_end], [y_end],
+                                      include_start=True, include_end=True)
+        height, width = self.last_prediction_blurred.shape
+        if np.any((x < 0) | (x >= width) | (y < 0) | (y >= height)):
+            return False
+        return bool(np.all(self.last_prediction_blurred[y, x] <= threshold))
+
     def perc_unknown_surround(self, location: geometry.Point,
                               radius: int = 5) -> float:
         """
@@ -202,10 +490,10 @@ class ObservedWorld(world.World):
         not within the world borders are not included in calculation.
         """
         total_area_size = ((2 * radius + 1) ** 2)
-        area = self.get_area_around_point(location, radius, blurred=True)
-        unknown = abs(area) < 1
-        unknown_count = np.sum(unknown)
-        unknkown_out_of_map = total_area_size - area.size
+        image = self.get_integral_image("unknown")
+        unknown_count, area_size = self.count_around_point(location, radius,
+                                                           image)
+        unknkown_out_of_map = total_area_size - area_size
         unknown_count += unknkown_out_of_map
         return unknown_count / total_area_size
 
@@ -227,11 +515,11 @@ class ObservedWorld(world.World):
         if len(candidates) == 0:
             return None
 
-        min_border, max_border = self.get_world_borders()
+        _, max_border = self.get_world_borders()
         index = random.randint(0, len(candidates) - 1)
         y, x = candidates[index]
-        new_x = min(min_border.x + x, max_border.x)
-        new_y = min(min_border.y + y, max_border.y)
+        new_x = min(self.prediction_origin.x + x, max_border.x)
+        new_y = min(self.prediction_origin.y + y, max_border.y)
         return geometry.Point(new_x, new_y)
 
     def print(self):
@@ -241,3 +529,37 @@ class ObservedWorld(world.World):
                 s.append(f"{self.last_prediction[y][x]:3.0f}")
             s.append("\n")
         print(''.join(s))
+
+
+class WorldSnapshot():
+    """
+    Read-only copy of the last prediction of an ObservedWorld that answers
+    the queries path planners make. Unlike ObservedWorld it can be sent to
+    other processes.
+    """
+    def __init__(self, observed_world: ObservedWorld):
+        self.borders = tuple(observed_world.borders)
+        self.origin = observed_world.origin
+        self.prediction_bounds = observed_world.prediction_bounds
+        self.prediction_origin = observed_world.prediction_origin
+        self.prediction_version = observed_world.prediction_version
+        self.last_prediction_blurred = \
+            observed_world.last_prediction_blurred.copy()
+        self.last_prediction_blurred.flags.writeable = False
+
+        # Configuration spaces that are already computed are shared
+        self.configuration_spaces_version = \
+            observed_world.configuration_spaces_version
+        self.configuration_spaces = dict(observed_world.configuration_spaces)
+
+    def __setstate__(self, state: Dict):
+        # Arrays are writeable after unpickling
+        self.__dict__.update(state)
+        self.last_prediction_blurred.flags.writeable = False
+
+    get_world_borders = ObservedWorld.get_world_borders
+    location_to_cell = ObservedWorld.location_to_cell
+    location_to_index = ObservedWorld.location_to_index
+    point_in_bounds = ObservedWorld.point_in_bounds
+    get_configuration_space = ObservedWorld.get_configuration_space
+    get_random_point = ObservedWorld.get_random_point
@@ -0,0 +1,109 @@
+from typing import Tuple
+
+import numpy as np
+
+from slam.common.enums import OccupancyModelType
+
+
+class OccupancyModel():
+    """
+    Defines how observations change the cells of ObservedWorld and how the
+    stored values translate to the evidence scale that queries use
+    (> 1: obstacle, |value| < 1: unknown, < -10: surely free).
+    """
+    dtype = np.float64
+    limits: Tuple[float, float] = None
+
+    def hit_kernel(self, kernel: np.ndarray) -> np.ndarray:
+        """
+        Returns values added around a detected obstacle. kernel is the
+        obstacle filter of ObservedWorld.
+        """
+        raise NotImplementedError
+
+    def miss_value(self) -> float:
+        """
+        Returns the value added to every cell a ray passes through.
+        """
+        raise NotImplementedError
+
+    def to_evidence(self, values: np.ndarray) -> np.ndarray:
+        """
+        Converts stored values to the evidence scale.
+        """
+        raise NotImplementedError
+
+
+class EvidenceModel(OccupancyModel):
+    """
+    Unbounded accumulation of evidence: a scaled Gaussian per obstacle hit and
+    a fixed decrement for every traversed cell.
+    """
+    def __init__(self, miss: float = -6.0):
+        self.miss = miss
+
+    def hit_kernel(self, kernel: np.ndarray) -> np.ndarray:
+        return kernel
+
+    def miss_value(self) -> float:
+        return self.miss
+
+    def to_evidence(self, values: np.ndarray) -> np.ndarray:
+        return values
+
+
+class LogOddsModel(OccupancyModel):
+    """
+    Log-odds occupancy with values clamped to [logit(p_min), logit(p_max)].
+    The center of an obstacle hit gets logit(p_hit), every traversed cell
+    gets logit(p_miss). For queries, values are scaled so that a single miss
+    equals one miss of EvidenceModel.
+    With an integer dtype (e.g. np.int16), values are stored in fixed point:
+    log-odds divided by resolution, chosen so that the limits span the
+    range of the dtype.
+    """
+    def __init__(self, p_hit: float = 0.7, p_miss: float = 0.4,
+                 p_min: float = 0.12, p_max: float = 0.97,
+                 dtype: np.dtype = np.float32,
+                 evidence_per_miss: float = 6.0):
+        if not 0 < p_miss < 0.5 < p_hit < 1:
+            raise ValueError("Expected 0 < p_miss < 0.5 < p_hit < 1")
+        if not 0 < p_min < 0.5 < p_max < 1:
+            raise ValueError("Expected 0 < p_min < 0.5 < p_max < 1")
+        self.dtype = np.dtype(dtype)
+        if np.issubdtype(self.dtype, np.integer):
+            self.resolution = max(-logit(p_min), logit(p_max)) / \
+                np.iinfo(self.dtype).max
+            self.evidence_dtype = np.dtype(np.float32)
+        elif np.issubdtype(self.dtype, np.floating):
+            self.resolution = 1.0
+            self.evidence_dtype = self.dtype
+        else:
+            raise ValueError(f"Unsupported dtype {self.dtype}")
+        self.hit = logit(p_hit) / self.resolution
+        self.miss = logit(p_miss) / self.resolution
+        self.limits = (logit(p_min) / self.resolution,
+                       logit(p_max) / self.resolution)
+        self.scale = evidence_per_miss / -self.miss
+
+    def hit_kernel(self, kernel: np.ndarray) -> np.ndarray:
+        return self.hit * kernel / kernel.max()
+
+    def miss_value(self) -> float:
+        return self.miss
+
+    def to_evidence(self, values: np.ndarray) -> np.ndarray:
+        return values.astype(self.evidence_dtype, copy=False) * \
+            self.evidence_dtype.type(self.scale)
+
+
+def logit(p: float) -> float:
+    return float(np.log(p / (1 - p)))
+
+
+def create_model(model_type: OccupancyModelType, **kwargs) -> OccupancyModel:
+    if model_type == OccupancyModelType.EVIDENCE:
+        return EvidenceModel(**kwargs)
+    if model_type == OccupancyModelType.LOG_ODDS:
+        return LogOddsModel(**kwargs)
+    raise TypeError(f"Unknown occupancy model type {model_type}")
@@ -0,0 +1,57 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def trace_rays(x_start: np.ndarray, y_start: np.ndarray, x_end: np.ndarray,
+               y_end: np.ndarray, include_start: bool = False,
+               include_end: bool = False) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rasterizes all rays from (x_start[i], y_start[i]) to (x_end[i], y_end[i])
+    at once. Coordinates are integer cells. Every ray is traversed with an
+    exact integer DDA that makes max(|dx|, |dy|) unit steps, so the cells of a
+    ray are 8-connected and each cell is visited once.
+    Returns arrays (ray_index, x, y), one entry per traversed cell.
+    """
+    x_start = np.asarray(x_start, dtype=np.int64).ravel()
+    y_start = np.asarray(y_start, dtype=np.int64).ravel()
+    dx = np.asarray(x_end, dtype=np.int64).ravel() - x_start
+    dy = np.asarray(y_end, dtype=np.int64).ravel() - y_start
+    num_steps = np.maximum(np.abs(dx), np.abs(dy))
+
+    counts = num_steps + 1
+    ray_index = np.repeat(np.arange(len(num_steps)), counts)
+    first = np.cumsum(counts) - counts
+    k = np.arange(counts.sum()) - first[ray_index]
+    n = np.maximum(num_steps[ray_index], 1)
+
+    # Rounds k * d / n half up using integers only
+    x = x_start[ray_index] + (2 * k * dx[ray_index] + n) // (2 * n)
+    y = y_start[ray_index] + (2 * k * dy[ray_index] + n) // (2 * n)
+
+    keep = np.ones(len(k), dtype=bool)
+    if not include_start:
+        keep &= k > 0
+    if not include_end:
+        keep &= k < num_steps[ray_index]
+    return ray_index[keep], x[keep], y[keep]
+
+
+def add_on_rays(grid: np.ndarray, x_start: np.ndarray, y_start: np.ndarray,
+                x_end: np.ndarray, y_end: np.ndarray,
+                value: float) -> np.ndarray:
+    """
+    Adds value to every cell on the rays from (x_start, y_start) to
+    (x_end, y_end), excluding the first and the last cell of each ray. A cell
+    crossed by several rays is changed several times. Cells outside the grid
+    are ignored. grid has to be C-contiguous.
+    """
+    if not grid.flags.c_contiguous:
+        raise ValueError("Grid has to be C-contiguous")
+    _, x, y = trace_rays(x_start, y_start, x_end, y_end)
+    height, width = grid.shape
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    flat = y[inside] * width + x[inside]
+    np.add.at(grid.reshape(-1), flat, value)
+    return grid
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from typing import List, Tuple
 
 import numpy as np
@@ -11,6 +13,10 @@ class SimulatedWorld(world.World):
     World used for simulation.
     Obstacles format: (x_min, x_max, y_min, y_max)
     """
+    # How far behind the border of the hit cell measured distances end, so
+    # that measured locations round into the hit cell
+    HIT_DEPTH = 1e-6
+
     def __init__(self, width=50, height=50, pose: geometry.Pose = None,
                  obstacles: List[Tuple[int]] = None):
         self.map = np.zeros([height, width])
@@ -19,6 +25,45 @@ class SimulatedWorld(world.World):
             self.map[y_min:y_max+1, x_min:x_max+1] = 1
         self.pose = pose
 
+    @classmethod
+    def from_array(cls, obstacle_map: np.ndarray,
+                   pose: geometry.Pose = None) -> SimulatedWorld:
+        """
+        World with map obstacle_map (indexed [y][x]). The array is used as
+        is, without a copy, so it can be memory-mapped.
+        """
+        world = SimulatedWorld(width=0, height=0, pose=pose, obstacles=[])
+        world.map = obstacle_map
+        return world
+
+    def is_obstacle(self, values: np.ndarray) -> np.ndarray:
+        """
+        Which of values of map cells are obstacles.
+        """
+        return values != 0
+
+    def random_free_pose(self, clearance: float = 5.0, seed: int = None,
+                         attempts: int = 10000) -> geometry.Pose:
+        """
+        Random pose at least clearance cells away from obstacles and the
+        border of the world. Only the cells around sampled locations are
+        read.
+        """
+        rng = np.random.default_rng(seed)
+        height, width = self.map.shape
+        c = int(np.ceil(clearance))
+        if width <= 2 * c or height <= 2 * c:
+            raise ValueError(f"World {width}x{height} is too small for "
+                             f"clearance {clearance}")
+        for _ in range(attempts):
+            x = int(rng.integers(c, width - c))
+            y = int(rng.integers(c, height - c))
+            if not np.any(self.is_obstacle(
+                    self.map[y-c:y+c+1, x-c:x+c+1])):
+                return geometry.Pose(x, y, float(rng.integers(0, 360)))
+        raise ValueError(f"No free pose with clearance {clearance} found in "
+                         f"{attempts} attempts")
+
     def location_in_range(self, x: int, y: int) -> bool:
         return x >= 0 and x < self.map.shape[1] and \
             y >= 0 and y < self.map.shape[0]
@@ -26,21 +71,71 @@ class SimulatedWorld(world.World):
     def update_pose(self, new_pose: geometry.Pose):
         self.pose = new_pose
 
-    def get_distance_to_wall(self, measuring_angle: int) -> int:
+    def get_distance_to_wall(self, measuring_angle: float) -> float:
+        """
+        Distance from the robot to the first obstacle or the border of the
+        world in direction measuring_angle (relative to the orientation of
+        the robot). See cast_rays.
+        """
+        return float(self.cast_rays([measuring_angle])[0])
+
+    def cast_rays(self, measuring_angles: List[float],
+                  max_range: float = np.inf) -> np.ndarray:
         """
-        Very imperfect.
+        Distances from the robot to the first obstacle or the border of the
+        world for each of measuring_angles (in degrees, relative to the
+        orientation of the robot). Rays are traversed cell by cell (DDA) and
+        distances are measured to the point where a ray enters the hit cell,
+        plus HIT_DEPTH. Cell [y][x] covers locations that round to (x, y).
+        Rays that do not hit anything within max_range have distance inf.
         """
-        angle = self.pose.orientation.in_degrees() + measuring_angle
-        p = geometry.Pose(*self.pose.position, angle)
-        distance = 0
-        x = int(round(p.position.x))
-        y = int(round(p.position.y))
-        while self.location_in_range(x, y) and self.map[y][x] == 0:
-            p.move_forward(1)
-            distance += 1
-            x = int(round(p.position.x))
-            y = int(round(p.position.y))
-        return distance
+        angles = np.radians(self.pose.orientation.in_degrees() +
+                            np.asarray(measuring_angles, dtype=float))
+        num_rays = len(angles)
+        if num_rays == 0:
+            return np.zeros(0)
+        height, width = self.map.shape
+        # Cell i covers [i, i + 1) in shifted coordinates
+        x0 = self.pose.position.x + 0.5
+        y0 = self.pose.position.y + 0.5
+        dx, dy = np.cos(angles), np.sin(angles)
+        cx = np.full(num_rays, int(np.floor(x0)))
+        cy = np.full(num_rays, int(np.floor(y0)))
+
+        step_x = np.where(dx > 0, 1, -1)
+        step_y = np.where(dy > 0, 1, -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_delta_x = np.where(dx != 0, abs(1 / dx), np.inf)
+            t_delta_y = np.where(dy != 0, abs(1 / dy), np.inf)
+            t_max_x = np.where(dx != 0, (cx + (dx > 0) - x0) / dx, np.inf)
+            t_max_y = np.where(dy != 0, (cy + (dy > 0) - y0) / dy, np.inf)
+
+        distances = np.full(num_rays, np.inf)
+        if not self.location_in_range(cx[0], cy[0]) or \
+                self.is_obstacle(self.map[cy[0], cx[0]]):
+            distances[:] = 0
+            return distances
+
+        active = np.arange(num_rays)
+        while len(active) > 0:
+            along_x = t_max_x[active] <= t_max_y[active]
+            i, j = active[along_x], active[~along_x]
+            t = np.empty(len(active))
+            t[along_x] = t_max_x[i]
+            t[~along_x] = t_max_y[j]
+            cx[i] += step_x[i]
+            t_max_x[i] += t_delta_x[i]
+            cy[j] += step_y[j]
+            t_max_y[j] += t_delta_y[j]
+
+            x, y = cx[active], cy[active]
+            inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            hit = ~inside
+            hit[inside] = self.is_obstacle(self.map[y[inside], x[inside]])
+            hit &= t <= max_range
+            distances[active[hit]] = t[hit] + self.HIT_DEPTH
+            active = active[~hit & (t <= max_range)]
+        return distances
 
 
 class PredefinedWorld(SimulatedWorld):
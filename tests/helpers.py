@@ -0,0 +1,36 @@
+import slam.common.datapoint as datapoint
+import slam.common.geometry as geometry
+import slam.world.observed as oworld
+import slam.world.simulated as sworld
+from slam.common.enums import ObservationType
+
+
+def add_observations(world: oworld.ObservedWorld, pose_xy, observations_xy,
+                     otype: ObservationType = ObservationType.OBSTACLE):
+    pose = datapoint.Pose(*pose_xy, 0)
+    for (x, y) in observations_xy:
+        world.add_observation(pose, datapoint.Observation(x, y, otype))
+
+
+def scan(world: oworld.ObservedWorld, simulated: sworld.SimulatedWorld,
+         pose: geometry.Pose, view_angle: int = 330, precision: int = 20,
+         max_distance: float = None, safety_distance: float = 5.0):
+    """
+    Adds observations of simulated world made from pose to world. If
+    max_distance is given, more distant measurements are observed as free
+    like LimitedInformationSensor does.
+    """
+    simulated.update_pose(pose)
+    pose_data = datapoint.Pose(*pose)
+    start_angle = int(- view_angle / 2)
+    angles = list(range(start_angle, start_angle + view_angle + 1, precision))
+    for (angle, distance) in zip(angles, simulated.cast_rays(angles)):
+        otype = ObservationType.OBSTACLE
+        if max_distance is not None and distance > max_distance:
+            distance = max_distance - safety_distance
+            otype = ObservationType.FREE
+        polar = geometry.Polar(angle + pose.orientation.in_degrees(),
+                               distance)
+        location = pose.position.plus_polar(polar)
+        observation = datapoint.Observation(*location, otype)
+        world.add_observation(pose_data, observation)
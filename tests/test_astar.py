@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+import slam.planner.astar as astar
+
+
+def path_length(path):
+    steps = np.diff(np.array(path), axis=0)
+    return np.sum(np.hypot(steps[:, 0], steps[:, 1]))
+
+
+class TestAstar(unittest.TestCase):
+    def setUp(self):
+        self.free = np.ones([20, 30], dtype=bool)
+        self.free[:15, 10] = False  # Wall with a gap at the bottom
+
+    def assertValidPath(self, path, start, goal):
+        self.assertEqual(path[0], start)
+        self.assertEqual(path[-1], goal)
+        for (a, b) in zip(path, path[1:]):
+            self.assertLessEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+            self.assertTrue(self.free[b[1], b[0]])
+
+    def test_open_grid(self):
+        path = astar.find_path(self.free, (12, 2), (25, 10))
+        self.assertValidPath(path, (12, 2), (25, 10))
+        self.assertAlmostEqual(path_length(path), astar.octile_distance(13, 8))
+
+    def test_around_wall(self):
+        path = astar.find_path(self.free, (5, 2), (15, 2))
+        self.assertValidPath(path, (5, 2), (15, 2))
+        # Down to the gap at row 15 and back up, without cutting the corner
+        # of the wall
+        self.assertAlmostEqual(path_length(path),
+                               2 * (astar.octile_distance(4, 13) + 1))
+
+    def test_unreachable(self):
+        self.free[15:, 10] = False
+        self.assertIsNone(astar.find_path(self.free, (5, 2), (15, 2)))
+        self.assertIsNone(astar.find_path(self.free, (5, 2), (10, 2)))
+        self.assertIsNone(astar.find_path(self.free, (5, 2), (40, 2)))
+
+    def test_blocked_start(self):
+        path = astar.find_path(self.free, (10, 3), (12, 3))
+        self.assertEqual(path, [(10, 3), (11, 3), (12, 3)])
+
+    def test_distance_field(self):
+        start = (5, 2)
+        distances = astar.distance_field(self.free, start)
+        self.assertEqual(distances[2, 5], 0)
+        for goal in [(15, 2), (25, 10), (9, 14), (11, 0)]:
+            path = astar.find_path(self.free, start, goal)
+            self.assertAlmostEqual(distances[goal[1], goal[0]],
+                                   path_length(path))
+        self.assertEqual(distances[5, 10], np.inf)
+
+        self.free[15:, 10] = False
+        distances = astar.distance_field(self.free, start)
+        self.assertTrue(np.all(distances[:, 11:] == np.inf))
+        self.assertTrue(np.all(distances[:, :10] < np.inf))
+
+    def test_distance_fields(self):
+        starts = [(5, 2), (25, 10), (40, 2)]
+        fields = astar.distance_fields(self.free, starts)
+        self.assertEqual(fields.shape, (3, 20, 30))
+        for (start, field) in zip(starts[:2], fields):
+            np.testing.assert_allclose(
+                field, astar.distance_field(self.free, start))
+        self.assertTrue(np.all(fields[2] == np.inf))
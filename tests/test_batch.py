@@ -0,0 +1,74 @@
+import itertools
+import json
+import os
+import tempfile
+import unittest
+
+import slam.common.datapoint as datapoint
+from slam.common.enums import ObservationType, PathId
+
+try:
+    import slam.batch as sbatch
+except ImportError:
+    sbatch = None  # slam/config.py is created by make init
+
+
+@unittest.skipIf(sbatch is None, "slam/config.py is missing")
+class TestBatch(unittest.TestCase):
+    def episode(self, max_steps: int = 5, seed: int = 0) -> dict:
+        return {"world": 3, "seed": seed, "max_steps": max_steps,
+                "SCANNING_PRECISION": 20, "VIEW_ANGLE": 330,
+                "LIMITED_VIEW": 30.0, "ROBOT_SIZE": 10.0}
+
+    def test_create_episodes(self):
+        variants = {"VIEW_ANGLE": [180, 330], "ROBOT_SIZE": [10.0]}
+        episodes = sbatch.create_episodes([1, 7], [0, 1, 2], variants, 50)
+        self.assertEqual(len(episodes), 2 * 3 * 2)
+        combinations = {(e["world"], e["seed"], e["VIEW_ANGLE"],
+                         e["ROBOT_SIZE"]) for e in episodes}
+        self.assertEqual(combinations, set(itertools.product(
+            [1, 7], [0, 1, 2], [180, 330], [10.0])))
+        self.assertTrue(all(e["max_steps"] == 50 for e in episodes))
+
+    def test_recorder(self):
+        recorder = sbatch.EpisodeRecorder()
+        for (x, y) in [(0, 0), (3, 4), (3, 10)]:
+            recorder.put(datapoint.Pose(x, y, 0,
+                                        path_id=PathId.ROBOT_HISTORY))
+        recorder.put(datapoint.Pose(50, 50, 0,
+                                    path_id=PathId.ROBOT_PATH_PLAN))
+        recorder.put(datapoint.Observations(
+            0, 0, [1], [1], [ObservationType.OBSTACLE]))
+        self.assertEqual(recorder.steps, 2)
+        self.assertAlmostEqual(recorder.distance, 11)
+        self.assertEqual(recorder.scans, 1)
+        self.assertTrue(recorder.empty())
+
+    def test_run_episode(self):
+        metrics = sbatch.run_episode(self.episode(max_steps=3))
+        self.assertFalse(metrics["finished"])
+        self.assertEqual(metrics["steps"], 3)
+        self.assertGreaterEqual(metrics["scans"], metrics["steps"])
+        self.assertGreater(metrics["distance"], 0)
+        coverage = [c for (_, c) in metrics["coverage"]]
+        self.assertEqual(len(coverage), 3)
+        self.assertTrue(all(0 <= c <= 1 for c in coverage))
+        self.assertGreater(coverage[-1], coverage[0])
+        times = [t for (t, _) in metrics["coverage"]]
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(metrics["planner_failures"], 0)
+
+        # Episodes are reproducible
+        again = sbatch.run_episode(self.episode(max_steps=3))
+        for key in ["steps", "scans", "distance", "coverage", "robot_time"]:
+            self.assertEqual(metrics[key], again[key])
+
+    def test_run_batch(self):
+        episodes = [self.episode(max_steps=1, seed=s) for s in [0, 1]]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "results.jsonl")
+            sbatch.run_batch(episodes, filename, workers=1)
+            with open(filename) as f:
+                results = [json.loads(line) for line in f]
+        self.assertEqual(sorted(r["seed"] for r in results), [0, 1])
+        self.assertTrue(all("error" not in r for r in results))
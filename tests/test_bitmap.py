@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.world.bitmap as bitmap
+import slam.world.simulated as sworld
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+
+def write_pgm(filename: str, pixels: np.ndarray, maxval: int = 255):
+    """
+    pixels: indexed [y][x] with row 0 at the bottom, like maps of worlds
+    """
+    dtype = np.uint8 if maxval < 256 else np.dtype(">u2")
+    height, width = pixels.shape
+    with open(filename, "wb") as f:
+        f.write(f"P5\n# floor plan\n{width} {height}\n{maxval}\n".encode())
+        f.write(pixels[::-1].astype(dtype).tobytes())
+
+
+class TestBitmapWorld(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        # Obstacles of PredefinedWorld(3) as black pixels on white
+        self.obstacles = sworld.PredefinedWorld(3).map != 0
+        self.pixels = np.where(self.obstacles, 0, 255)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_pgm_header(self):
+        write_pgm(self.path("world.pgm"), self.pixels)
+        width, height, maxval, offset = bitmap.read_pgm_header(
+            self.path("world.pgm"))
+        self.assertEqual((width, height, maxval), (50, 50, 255))
+        self.assertEqual(offset, os.path.getsize(self.path("world.pgm")) -
+                         50 * 50)
+
+    def test_pgm(self):
+        write_pgm(self.path("world.pgm"), self.pixels)
+        pose = geometry.Pose(40, 40, 180)
+        world = bitmap.BitmapWorld(self.path("world.pgm"), pose)
+        self.assertIsInstance(world.map, np.memmap)
+        np.testing.assert_array_equal(world.is_obstacle(world.map),
+                                      self.obstacles)
+        predefined = sworld.PredefinedWorld(3)
+        angles = np.arange(0, 360, 10)
+        np.testing.assert_allclose(world.cast_rays(angles),
+                                   predefined.cast_rays(angles))
+
+    def test_16_bit_pgm(self):
+        write_pgm(self.path("world.pgm"), self.pixels * 4, maxval=1023)
+        world = bitmap.BitmapWorld(self.path("world.pgm"), seed=0)
+        np.testing.assert_array_equal(world.is_obstacle(world.map),
+                                      self.obstacles)
+        x, y = int(world.pose.position.x), int(world.pose.position.y)
+        self.assertFalse(self.obstacles[y, x])
+
+    def test_wrong_format(self):
+        with open(self.path("world.pgm"), "wb") as f:
+            f.write(b"P2\n2 2\n255\n0 0 0 0\n")
+        with self.assertRaises(ValueError):
+            bitmap.BitmapWorld(self.path("world.pgm"))
+        with self.assertRaises(ValueError):
+            bitmap.BitmapWorld(self.path("world.bmp"))
+
+    @unittest.skipIf(PIL is None, "Pillow is not installed")
+    def test_png(self):
+        from PIL import Image
+        Image.fromarray(self.pixels[::-1].astype(np.uint8)).save(
+            self.path("world.png"))
+        world = bitmap.BitmapWorld(self.path("world.png"), seed=0)
+        self.assertTrue(os.path.exists(self.path("world.npy")))
+        np.testing.assert_array_equal(world.is_obstacle(world.map),
+                                      self.obstacles)
@@ -0,0 +1,47 @@
+import threading
+import time
+import unittest
+
+import slam.common.clock as sclock
+from slam.common.enums import ClockType
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_sleep(self):
+        clock = sclock.VirtualClock()
+        start = time.monotonic()
+        clock.sleep(100)
+        clock.sleep(0.5)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertAlmostEqual(clock.time(), 100.5)
+
+    def test_sleeps_of_threads_add_up(self):
+        clock = sclock.VirtualClock(start=10)
+
+        def sleep():
+            for _ in range(100):
+                clock.sleep(0.25)
+        threads = [threading.Thread(target=sleep) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertAlmostEqual(clock.time(), 110)
+
+    def test_wait(self):
+        clock = sclock.VirtualClock()
+        event = threading.Event()
+        threading.Timer(0.05, event.set).start()
+        self.assertTrue(clock.wait(event, 5))
+        self.assertFalse(clock.wait(threading.Event(), 0.01))
+        self.assertEqual(clock.time(), 0)
+
+
+class TestCreateClock(unittest.TestCase):
+    def test_types(self):
+        self.assertIsInstance(sclock.create_clock(ClockType.REAL_TIME),
+                              sclock.RealTimeClock)
+        self.assertIsInstance(sclock.create_clock(ClockType.VIRTUAL),
+                              sclock.VirtualClock)
+        with self.assertRaises(TypeError):
+            sclock.create_clock(None)
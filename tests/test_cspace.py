@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.world.cspace as cspace
+
+
+class TestConfigurationSpace(unittest.TestCase):
+    def setUp(self):
+        prediction = np.full([20, 30], -20.0)
+        prediction[5:15, 15] = 30  # Thin wall
+        self.space = cspace.ConfigurationSpace(prediction,
+                                               geometry.Point(-10, 100))
+
+    def test_empty(self):
+        space = cspace.ConfigurationSpace(np.zeros([5, 5]),
+                                          geometry.Point(0, 0))
+        self.assertTrue(space.is_point_free(geometry.Point(2, 2), 100))
+
+    def test_distance_to_obstacle(self):
+        self.assertAlmostEqual(self.space.distance_to_obstacle(
+            geometry.Point(1, 110)), 4)
+        self.assertAlmostEqual(self.space.distance_to_obstacle(
+            geometry.Point(8, 118)), 5)
+        self.assertEqual(self.space.distance_to_obstacle(
+            geometry.Point(5, 130)), np.inf)
+
+    def test_is_point_free(self):
+        self.assertTrue(self.space.is_point_free(geometry.Point(-8, 110), 3))
+        self.assertFalse(self.space.is_point_free(geometry.Point(3, 110), 3))
+        self.assertFalse(self.space.is_point_free(geometry.Point(5, 110), 3))
+
+    def test_is_segment_free(self):
+        # Crosses the wall
+        self.assertFalse(self.space.is_segment_free(
+            geometry.Point(-5, 108), geometry.Point(14, 111), 2))
+        # Passes the wall
+        self.assertTrue(self.space.is_segment_free(
+            geometry.Point(-5, 100), geometry.Point(14, 100), 4))
+        self.assertFalse(self.space.is_segment_free(
+            geometry.Point(-5, 100), geometry.Point(14, 102), 4))
+
+    def test_is_segment_free_near_start(self):
+        start = geometry.Point(2, 110)
+        self.assertFalse(self.space.is_point_free(start, 4))
+        # Moving away from the wall is allowed, moving through it is not
+        self.assertTrue(self.space.is_segment_free(
+            start, geometry.Point(-6, 110), 4))
+        self.assertFalse(self.space.is_segment_free(
+            start, geometry.Point(12, 110), 4))
+
+    def test_is_segment_free_towards_obstacle(self):
+        start = geometry.Point(1, 110)  # 4 away from the wall
+        # Moving closer to the wall is not allowed, even if it is not hit
+        self.assertFalse(self.space.is_segment_free(
+            start, geometry.Point(3, 110), 6))
+        self.assertTrue(self.space.is_segment_free(
+            start, geometry.Point(1, 107), 6))
+        free = self.space.free_cells(6, start)
+        self.assertFalse(free[10, 13])
+        self.assertTrue(free[10, 11])
+        self.assertTrue(free[10, 9])
@@ -0,0 +1,210 @@
+import queue
+import threading
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.planner.action as action
+import slam.planner.frontier as sfrontier
+import slam.planner.planner as planner
+import slam.world.observed as oworld
+import slam.world.simulated as sworld
+from tests.helpers import add_observations, scan
+
+
+def reference_unknown_locations(world: oworld.ObservedWorld, radius: int):
+    """
+    Cell by cell implementation of RrtPlanner.get_unknown_locations, copied
+    from the original planner and ObservedWorld methods (get_area_around_point,
+    is_surrrounding_free, perc_unknown_surround), so that it does not depend
+    on any of the helpers it is compared with. The borders of the world are
+    those of the prediction.
+    """
+    grid = world.last_prediction_blurred
+    y_shape, x_shape = grid.shape
+    min_border = world.prediction_origin
+    max_border = geometry.Point(min_border.x + x_shape - 1,
+                                min_border.y + y_shape - 1)
+
+    def get_area_around_point(location, radius):
+        loc_x, loc_y = *location,
+        x_min = int(round(max(min_border.x, loc_x - radius) - min_border.x))
+        x_max = int(round(min(max_border.x, loc_x + radius) - min_border.x))
+        y_min = int(round(max(min_border.y, loc_y - radius) - min_border.y))
+        y_max = int(round(min(max_border.y, loc_y + radius) - min_border.y))
+        return grid[y_min:y_max+1, x_min:x_max+1]
+
+    def is_surrrounding_free(location, radius, threshold):
+        area = get_area_around_point(location, radius)
+        area_over_threshold = area > threshold
+        return not np.any(area_over_threshold)
+
+    def perc_unknown_surround(location, radius):
+        total_area_size = ((2 * radius + 1) ** 2)
+        area = get_area_around_point(location, radius)
+        unknown = abs(area) < 1
+        unknown_count = np.sum(unknown)
+        unknkown_out_of_map = total_area_size - area.size
+        unknown_count += unknkown_out_of_map
+        return unknown_count / total_area_size
+
+    frontier = []
+    for yi in range(y_shape):
+        for xi in range(x_shape):
+            x = min_border.x + xi
+            y = min_border.y + yi
+            p = geometry.Point(x, y)
+            if grid[yi][xi] >= 0:
+                continue
+            if grid[yi][xi] < -10:
+                continue  # Enough evidence that here is a free spot
+            if not is_surrrounding_free(p, radius=radius, threshold=1.0):
+                continue
+            u = perc_unknown_surround(p, radius=radius)
+            if u < 0.3:
+                continue
+            frontier.append(p)
+    return frontier
+
+
+def create_planner(world: oworld.ObservedWorld, robot_size: float = 10.0,
+                   **kwargs):
+    dummy = action.Action(lambda *args: None)
+    return planner.RrtPlanner(world, queue.Queue(), turn_action=dummy,
+                              move_action=dummy, turn_move_action=dummy,
+                              shutdown_flag=threading.Event(),
+                              robot_size=robot_size, **kwargs)
+
+
+class TestUnknownLocations(unittest.TestCase):
+    def test_parity_predefined_worlds(self):
+        for key in range(1, 8):
+            simulated = sworld.PredefinedWorld(key)
+            world = oworld.ObservedWorld()
+            rrt = create_planner(world)
+            start = simulated.pose
+            poses = [geometry.Pose(*start),
+                     geometry.Pose(start[0] + 5, start[1] + 3, start[2] + 60)]
+            for pose in poses:
+                scan(world, simulated, pose, max_distance=30)
+                world.predict_world()
+
+                expected = reference_unknown_locations(world, radius=5)
+                frontier = rrt.get_unknown_locations()
+                self.assertEqual(frontier.frontier, expected)
+                self.assertEqual(frontier.location, world.prediction_origin)
+
+
+class TestFrontierTracker(unittest.TestCase):
+    def test_incremental_mask(self):
+        simulated = sworld.PredefinedWorld(7)
+        world = oworld.ObservedWorld()
+        tracker = sfrontier.FrontierTracker(world, radius=5)
+        poses = [(20, 20, 0), (30, 20, 0), (30, 35, 90), (30, 50, 90),
+                 (50, 50, 0), (60, 45, -90), (60, 10, -90)]
+        for pose in poses:
+            scan(world, simulated, geometry.Pose(*pose), max_distance=30)
+            world.predict_world()
+            expected = sfrontier.frontier_mask(world.last_prediction_blurred,
+                                               radius=5)
+            mask = tracker.update()
+            self.assertTrue(np.array_equal(mask, expected))
+            self.assertIs(tracker.update(), mask)
+
+
+class TestFrontierClusters(unittest.TestCase):
+    def setUp(self):
+        self.mask = np.zeros([10, 12], dtype=bool)
+        self.mask[1:4, 1:4] = True
+        self.mask[4, 4] = True  # Diagonal neighbour
+        self.mask[8, 6:11] = True
+        self.mask[0, 11] = True
+        self.origin = geometry.Point(-5, 10)
+
+    def test_cluster_frontier(self):
+        clusters = sfrontier.cluster_frontier(self.mask, self.origin)
+        clusters.sort(key=len)
+        self.assertEqual([len(c) for c in clusters], [1, 5, 10])
+
+        line = clusters[1]
+        self.assertEqual(line.centroid, geometry.Point(3, 18))
+        self.assertEqual(line.goal, geometry.Point(3, 18))
+        self.assertEqual(line.bounding_box,
+                         (geometry.Point(1, 18), geometry.Point(5, 18)))
+
+        square = clusters[2]
+        self.assertEqual(square.bounding_box,
+                         (geometry.Point(-4, 11), geometry.Point(-1, 14)))
+        self.assertTrue(any(square.goal == geometry.Point(*c)
+                            for c in square.cells))
+
+    def test_select_from_frontier(self):
+        rrt = create_planner(oworld.ObservedWorld())
+        clusters = sfrontier.cluster_frontier(self.mask, self.origin)
+
+        goal = rrt.select_from_frontier(clusters, geometry.Pose(6, 10))
+        self.assertEqual(goal, geometry.Point(3, 18))
+
+        # Single cells are never selected
+        goal = rrt.select_from_frontier(clusters, geometry.Pose(6, 10),
+                                        select_randomly=True)
+        self.assertNotEqual(goal, geometry.Point(6, 10))
+        self.assertIsNone(rrt.select_from_frontier(clusters[:0],
+                                                   geometry.Pose(0, 0)))
+
+    def test_select_by_travel_distance(self):
+        world = oworld.ObservedWorld()
+        add_observations(world, (0, 0), [(20, 12)])
+        world.predict_world()
+        self.assertEqual(world.prediction_origin, geometry.Point(0, 0))
+        rrt = create_planner(world)
+        mask = np.zeros([13, 21], dtype=bool)
+        mask[2, 2:5] = True
+        mask[10, 15:18] = True
+        clusters = sfrontier.cluster_frontier(mask, world.prediction_origin)
+        pose = geometry.Pose(0, 0)
+
+        distances = np.full(mask.shape, 50.0)
+        distances[2, 3] = 100
+        self.assertEqual(rrt.select_from_frontier(clusters, pose),
+                         geometry.Point(3, 2))
+        self.assertEqual(rrt.select_from_frontier(
+            clusters, pose, travel_distances=distances),
+            geometry.Point(16, 10))
+
+        distances[10, 16] = np.inf
+        self.assertEqual(rrt.select_from_frontier(
+            clusters, pose, select_randomly=True, travel_distances=distances),
+            geometry.Point(3, 2))
+        distances[2, 3] = np.inf
+        self.assertIsNone(rrt.select_from_frontier(
+            clusters, pose, travel_distances=distances))
+
+    def test_frontier_tour(self):
+        world = oworld.ObservedWorld()
+        add_observations(world, (0, 0), [(59, 39)])
+        world.predict_world()
+        world.last_prediction_blurred = np.full([40, 60], -20.0)
+        world.prediction_version += 1
+        origin = world.prediction_origin
+        rrt = create_planner(world, robot_size=4, frontier_tour=True)
+        clusters = [sfrontier.FrontierCluster(
+            np.array([[x + dx, 20] for dx in range(-1, 2)]) +
+            [origin.x, origin.y]) for x in [55, 25, 5]]
+        pose = geometry.Pose(20 + origin.x, 20 + origin.y)
+        distances = rrt.get_travel_distances(pose.position)
+
+        # The closest cluster is not visited first: 20 -> 5 -> 25 -> 55 is
+        # shorter than 20 -> 25 -> 5 -> 55
+        ranked = rrt.rank_frontier(clusters, pose, distances)
+        self.assertEqual(ranked, clusters[::-1])
+        tour_distances = rrt.get_tour_distances(clusters, pose.position)
+        self.assertAlmostEqual(tour_distances[0, 1], 35)
+        self.assertAlmostEqual(tour_distances[1, 2], 30)
+
+        # The tour is kept while the robot moves
+        pose = geometry.Pose(24 + origin.x, 20 + origin.y)
+        distances = rrt.get_travel_distances(pose.position)
+        self.assertEqual(rrt.rank_frontier(clusters, pose, distances),
+                         clusters[::-1])
@@ -0,0 +1,115 @@
+import queue
+import threading
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.planner.action as action
+import slam.planner.frontier as sfrontier
+import slam.planner.gain as sgain
+import slam.planner.planner as planner
+import slam.world.observed as oworld
+import slam.world.raytrace as raytrace
+from tests.helpers import add_observations
+
+
+def naive_gain(grid, x, y, heading, scan_angles, max_range):
+    height, width = grid.shape
+    revealed = set()
+    for angle in np.radians(heading + scan_angles):
+        x_end = int(np.rint(x + max_range * np.cos(angle)))
+        y_end = int(np.rint(y + max_range * np.sin(angle)))
+        _, xs, ys = raytrace.trace_rays([x], [y], [x_end], [y_end],
+                                        include_end=True)
+        for (xi, yi) in zip(xs, ys):
+            inside = 0 <= xi < width and 0 <= yi < height
+            value = grid[yi, xi] if inside else 0
+            if value > 1:
+                break
+            if abs(value) < 1:
+                revealed.add((xi, yi))
+    return len(revealed)
+
+
+class TestInformationGain(unittest.TestCase):
+    def setUp(self):
+        self.grid = np.full([30, 40], -20.0)
+        self.grid[:, 25:] = 0  # Unknown
+        self.grid[5:15, 20] = 30  # Wall
+
+    def test_scan_angles(self):
+        self.assertEqual(list(sgain.get_scan_angles(180, 90)), [-90, 0, 90])
+        self.assertEqual(len(sgain.get_scan_angles(360, 20)), 19)
+
+    def test_matches_single_rays(self):
+        xs = np.array([5, 15, 22, 30, 38])
+        ys = np.array([10, 8, 20, 15, 2])
+        headings = np.array([0, 10, -45, 180, 90])
+        scan_angles = sgain.get_scan_angles(180, 10)
+        gain = sgain.information_gain(self.grid, xs, ys, headings,
+                                      scan_angles, 15.0)
+        for i in range(len(xs)):
+            self.assertEqual(gain[i], naive_gain(self.grid, xs[i], ys[i],
+                                                 headings[i], scan_angles,
+                                                 15.0))
+
+    def test_obstacles_and_known_cells(self):
+        scan_angles = sgain.get_scan_angles(360, 10)
+        gain = sgain.information_gain(
+            self.grid, np.array([12, 15, 15]), np.array([15, 10, 20]),
+            np.zeros(3), scan_angles, 12.0)
+        # Nothing unknown in range
+        self.assertEqual(gain[0], 0)
+        # The wall hides some of the unknown cells
+        self.assertGreater(gain[2], gain[1])
+        self.assertEqual(len(sgain.information_gain(
+            self.grid, [], [], [], scan_angles, 8.0)), 0)
+
+    def test_travel_cost(self):
+        scorer = sgain.InformationGainScorer(360, 10, 10.0,
+                                             travel_cost_weight=0.1)
+        scores = scorer.score(self.grid, np.array([30, 30, 30]),
+                              np.array([20, 20, 20]), np.zeros(3),
+                              np.array([0, 10, np.inf]))
+        self.assertGreater(scores[0], 0)
+        self.assertAlmostEqual(scores[1], scores[0] * np.exp(-1))
+        self.assertEqual(scores[2], 0)
+
+
+class TestGainPlanner(unittest.TestCase):
+    def setUp(self):
+        self.world = oworld.ObservedWorld()
+        add_observations(self.world, (0, 0), [(59, 39)])
+        self.world.predict_world()
+        prediction = np.full([40, 60], -20.0)
+        prediction[:, 40:] = 0
+        self.world.last_prediction_blurred = prediction
+        self.world.prediction_version += 1
+
+    def test_rank_by_gain(self):
+        pose = geometry.Pose(10, 20, 0)
+        rrt = planner.RrtPlanner(
+            self.world, queue.Queue(), action.Action(pose.rotate),
+            action.Action(pose.move_forward), None, threading.Event(),
+            robot_size=4, information_gain=True, sensor_range=10.0)
+        origin = self.world.prediction_origin
+        near = sfrontier.FrontierCluster(
+            np.array([[15, y] for y in range(18, 23)]) + [origin.x, origin.y])
+        far = sfrontier.FrontierCluster(
+            np.array([[x, 10] for x in range(20, 38)]) + [origin.x, origin.y])
+        travel_distances = rrt.get_travel_distances(pose.position)
+        far_goal = far.goal
+        ranked = rrt.rank_frontier([near, far], pose, travel_distances)
+        # Only the far cluster reveals anything, best from its right end
+        self.assertEqual(len(ranked), 1)
+        self.assertIs(ranked[0].cells, far.cells)
+        self.assertGreater(ranked[0].goal.x, 30 + origin.x)
+        # Clusters themselves keep their goals
+        self.assertIs(far.goal, far_goal)
+
+    def test_gain_and_tour(self):
+        with self.assertRaises(ValueError):
+            planner.RrtPlanner(
+                self.world, queue.Queue(), None, None, None,
+                threading.Event(), information_gain=True, frontier_tour=True)
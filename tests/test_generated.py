@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+from scipy.ndimage import label
+
+import slam.world.factory as wfactory
+import slam.world.generated as generated
+from slam.common.enums import WorldType
+
+
+def reachable(obstacle_map: np.ndarray, x: int, y: int) -> float:
+    """
+    Fraction of free cells that can be reached from (x, y).
+    """
+    labels, _ = label(~obstacle_map)
+    return np.count_nonzero(labels == labels[y, x]) / \
+        np.count_nonzero(~obstacle_map)
+
+
+class TestGenerators(unittest.TestCase):
+    def test_seeded(self):
+        for generator in [generated.rooms, generated.cluttered,
+                          generated.maze]:
+            first = generator(300, 200, seed=4)
+            self.assertEqual(first.shape, (200, 300))
+            self.assertEqual(first.dtype, bool)
+            np.testing.assert_array_equal(first, generator(300, 200, seed=4))
+            self.assertFalse(np.array_equal(first,
+                                            generator(300, 200, seed=5)))
+
+    def test_cluttered_density(self):
+        obstacle_map = generated.cluttered(500, 500, seed=0, density=0.2)
+        self.assertGreater(obstacle_map.mean(), 0.1)
+        self.assertLessEqual(obstacle_map.mean(), 0.2)
+
+    def test_maze(self):
+        obstacle_map = generated.maze(112, 90, seed=0, corridor_width=20,
+                                      wall_thickness=2)
+        # 5x4 cells of a perfect maze have 19 passages between them
+        free = np.count_nonzero(~obstacle_map)
+        self.assertEqual(free, 20 * 20 * 20 + 19 * 20 * 2)
+        self.assertEqual(reachable(obstacle_map, 2, 2), 1.0)
+        with self.assertRaises(ValueError):
+            generated.maze(20, 20, corridor_width=20)
+
+    def test_rooms_connected(self):
+        for seed in range(5):
+            obstacle_map = generated.rooms(400, 300, seed=seed,
+                                           room_size=30, door_width=10)
+            self.assertTrue(obstacle_map.any())
+            y, x = np.argwhere(~obstacle_map)[0]
+            self.assertEqual(reachable(obstacle_map, x, y), 1.0)
+
+
+class TestCreateWorld(unittest.TestCase):
+    def test_generated_world(self):
+        world = wfactory.create_world(WorldType.MAZE, width=200, height=150,
+                                      seed=1, corridor_width=15)
+        self.assertEqual(world.map.shape, (150, 200))
+        x, y = int(world.pose.position.x), int(world.pose.position.y)
+        self.assertFalse(np.any(world.map[y-5:y+6, x-5:x+6]))
+        distances = world.cast_rays(np.arange(0, 360, 30))
+        self.assertTrue(np.all(np.isfinite(distances)))
+
+    def test_predefined_world(self):
+        world = wfactory.create_world(WorldType.PREDEFINED, key=7)
+        self.assertEqual(world.map.shape, (70, 110))
+
+    def test_unknown_type(self):
+        with self.assertRaises(TypeError):
+            wfactory.create_world(None)
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.planner.graph as sgraph
+
+
+class TestGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = sgraph.Graph(cell_size=5.0, capacity=4)
+        rng = np.random.default_rng(3)
+        self.points = rng.uniform(-40, 60, size=[300, 2])
+        self.graph.add_node(geometry.Point(*self.points[0]))
+        for (i, point) in enumerate(self.points[1:]):
+            self.graph.add_node(geometry.Point(*point), parent=i // 2)
+
+    def test_nodes(self):
+        self.assertEqual(len(self.graph), len(self.points))
+        self.assertTrue(np.array_equal(self.graph.locations, self.points))
+        node = self.graph[10]
+        self.assertEqual(node.parent.index, 4)
+        self.assertEqual(node.parent.location, geometry.Point(*self.points[4]))
+        self.assertIsNone(self.graph[0].parent)
+        with self.assertRaises(IndexError):
+            self.graph[len(self.points)]
+
+    def test_nearest(self):
+        rng = np.random.default_rng(4)
+        for (x, y) in rng.uniform(-100, 120, size=[200, 2]):
+            distances = np.hypot(self.points[:, 0] - x, self.points[:, 1] - y)
+            node = self.graph.nearest(geometry.Point(x, y))
+            self.assertAlmostEqual(distances[node.index], distances.min())
+
+    def test_within_radius(self):
+        rng = np.random.default_rng(5)
+        for (x, y) in rng.uniform(-50, 70, size=[50, 2]):
+            distances = np.hypot(self.points[:, 0] - x, self.points[:, 1] - y)
+            found = self.graph.within_radius(geometry.Point(x, y), 12)
+            self.assertEqual(sorted(found.tolist()),
+                             np.nonzero(distances <= 12)[0].tolist())
+
+    def test_descendants(self):
+        # Node i has parent (i - 1) // 2
+        expected = {3}
+        for i in range(4, len(self.points)):
+            if (i - 1) // 2 in expected:
+                expected.add(i)
+        mask = self.graph.descendants(3)
+        self.assertEqual(set(np.nonzero(mask)[0]), expected)
+
+    def test_reroot(self):
+        self.graph.reroot(9)
+        parents = self.graph.parents[:len(self.graph)]
+        self.assertEqual(parents[9], -1)
+        self.assertEqual(parents[4], 9)
+        self.assertEqual(parents[1], 4)
+        self.assertEqual(parents[0], 1)
+        self.assertEqual(np.sum(parents < 0), 1)
+        self.assertTrue(np.all(self.graph.descendants(9)))
+
+    def test_update_costs(self):
+        self.graph.update_costs()
+        for i in [0, 5, 77, 299]:
+            node, cost = self.graph[i], 0
+            while node.parent is not None:
+                cost += node.location.distance_to(node.parent.location)
+                node = node.parent
+            self.assertAlmostEqual(self.graph.costs[i], cost)
+
+    def test_remove_nodes(self):
+        removed = self.graph.descendants(2)
+        self.graph.remove_nodes(removed)
+        kept = self.points[~removed]
+        self.assertEqual(len(self.graph), len(kept))
+        self.assertTrue(np.array_equal(self.graph.locations, kept))
+        old_indices = np.nonzero(~removed)[0]
+        for (i, old) in enumerate(old_indices[1:], start=1):
+            self.assertEqual(self.graph[i].parent.location,
+                             geometry.Point(*self.points[(old - 1) // 2]))
+
+    def test_empty(self):
+        self.assertIsNone(sgraph.Graph().nearest(geometry.Point(0, 0)))
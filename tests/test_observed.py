@@ -0,0 +1,251 @@
+import unittest
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+import slam.agent.sensor as sensor
+import slam.common.datapoint as datapoint
+import slam.common.geometry as geometry
+import slam.world.grid as sgrid
+import slam.world.observed as oworld
+import slam.world.occupancy as occupancy
+import slam.world.simulated as sworld
+from tests.helpers import add_observations, scan
+
+
+class TestWorldBorders(unittest.TestCase):
+    def setUp(self):
+        self.world = oworld.ObservedWorld()
+
+    def test_empty(self):
+        self.assertEqual(self.world.get_world_borders(), (None, None))
+
+    def test_borders(self):
+        add_observations(self.world, (5, 5), [(10, 3), (2.5, 7)])
+        add_observations(self.world, (0, 6), [(4, -1)])
+        min_border, max_border = self.world.get_world_borders()
+        self.assertAlmostEqual(min_border.x, 0)
+        self.assertAlmostEqual(min_border.y, -1)
+        self.assertAlmostEqual(max_border.x, 10)
+        self.assertAlmostEqual(max_border.y, 7)
+
+    def test_borders_version(self):
+        add_observations(self.world, (5, 5), [(10, 3)])
+        version = self.world.borders_version
+
+        add_observations(self.world, (6, 4), [(9, 4)])
+        self.assertEqual(self.world.borders_version, version)
+
+        add_observations(self.world, (6, 4), [(11, 4)])
+        self.assertGreater(self.world.borders_version, version)
+
+
+class TestObstacleFilter(unittest.TestCase):
+    def test_kernel_cached(self):
+        kernel = oworld.get_obstacle_filter(sigma=1)
+        self.assertIs(oworld.get_obstacle_filter(sigma=1), kernel)
+        self.assertIsNot(oworld.get_obstacle_filter(size=5, sigma=1), kernel)
+        self.assertFalse(kernel.flags.writeable)
+
+    def test_apply_filter_on_coordinates(self):
+        kernel = oworld.get_obstacle_filter(size=5, sigma=1)
+        rng = np.random.default_rng(1)
+        x_centers = rng.integers(-3, 14, size=40)
+        y_centers = rng.integers(-3, 10, size=40)
+        x_centers[:5] = y_centers[:5] = 4
+
+        expected = np.zeros([8, 12])
+        for (x, y) in zip(x_centers, y_centers):
+            oworld.apply_filter_on_coordinate(expected, x, y, kernel)
+        grid = oworld.apply_filter_on_coordinates(np.zeros([8, 12]),
+                                                  x_centers, y_centers,
+                                                  kernel)
+        self.assertTrue(np.allclose(grid, expected))
+
+
+class TestTiledGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = sgrid.TiledGrid(tile_size=4)
+
+    def test_empty_region(self):
+        region = self.grid.get_region(-3, -2, 5, 6)
+        self.assertEqual(region.shape, (9, 9))
+        self.assertFalse(np.any(region))
+        self.assertEqual(len(self.grid), 0)
+
+    def test_add_and_get_region(self):
+        values = np.arange(30, dtype=float).reshape(5, 6) + 1
+        self.grid.add_region(-3, -2, values)
+        self.assertEqual(len(self.grid), 4)
+        self.assertTrue(np.array_equal(self.grid.get_region(-3, -2, 2, 2),
+                                       values))
+
+        self.grid.add_region(-3, -2, values)
+        region = self.grid.get_region(-4, -2, 2, 3)
+        self.assertTrue(np.array_equal(region[:5, 1:], 2 * values))
+        self.assertFalse(np.any(region[:, 0]))
+        self.assertFalse(np.any(region[5]))
+
+
+class TestIntegralImage(unittest.TestCase):
+    def test_window_sum(self):
+        values = np.arange(20).reshape(4, 5)
+        image = sgrid.IntegralImage(values)
+        expected = (values[1:4, 1:3].sum(), 6)
+        self.assertEqual(image.window_sum(1, 1, 2, 3), expected)
+        sums, sizes = image.window_sum(np.array([-2, 3, 9]),
+                                       np.array([-1, 0, 0]),
+                                       np.array([0, 7, 12]),
+                                       np.array([1, 0, 3]))
+        self.assertEqual(sums.tolist(), [values[0:2, 0:1].sum(),
+                                         values[0, 3:].sum(), 0])
+        self.assertEqual(sizes.tolist(), [2, 2, 0])
+
+
+class TestPredictWorld(unittest.TestCase):
+    poses = [(40, 40, 180), (30, 40, 180), (12, 40, -90), (12, 12, 0)]
+
+    def test_incremental_prediction(self):
+        simulated = sworld.PredefinedWorld(3)
+        incremental = oworld.ObservedWorld()
+        full = oworld.ObservedWorld()
+        for pose in self.poses:
+            scan(incremental, simulated, geometry.Pose(*pose))
+            scan(full, simulated, geometry.Pose(*pose))
+            incremental.predict_world()
+        predicted, origin = full.predict_world()
+
+        self.assertEqual(incremental.prediction_origin, origin)
+        self.assertTrue(np.allclose(incremental.last_prediction,
+                                    full.last_prediction))
+        self.assertTrue(np.allclose(incremental.last_prediction_blurred,
+                                    predicted))
+
+    def test_batched_observations(self):
+        simulated = sworld.PredefinedWorld(3)
+        scanner = sensor.FullInformationSensor(simulated, None)
+        single = oworld.ObservedWorld()
+        batched = oworld.ObservedWorld()
+        for pose in self.poses:
+            pose = geometry.Pose(*pose)
+            simulated.update_pose(pose)
+            frame = scanner.measure_frame(np.arange(-165, 166, 20))
+            observations = frame.to_observations(pose)
+            pose_data = datapoint.Pose(*pose)
+            batched.add_observations(pose_data, observations)
+            for i in range(len(observations)):
+                single.add_observation(pose_data, observations[i])
+        expected, origin = single.predict_world()
+        predicted, batched_origin = batched.predict_world()
+
+        self.assertEqual(batched.borders, single.borders)
+        self.assertEqual(batched_origin, origin)
+        self.assertTrue(np.allclose(predicted, expected))
+
+    def test_partial_blur(self):
+        simulated = sworld.PredefinedWorld(7)
+        world = oworld.ObservedWorld()
+        poses = [(20, 20, 0), (30, 20, 0), (30, 35, 90), (30, 50, 90),
+                 (50, 50, 0), (60, 45, -90), (60, 10, -90)]
+        for (i, pose) in enumerate(poses):
+            scan(world, simulated, geometry.Pose(*pose))
+            blurred, _ = world.predict_world()
+            expected = gaussian_filter(world.last_prediction, sigma=1)
+            self.assertTrue(np.allclose(blurred, expected))
+            if i > 0:
+                self.assertIsNotNone(world.dirty_regions)
+
+    def test_origin_is_stable(self):
+        simulated = sworld.PredefinedWorld(3)
+        world = oworld.ObservedWorld()
+        scan(world, simulated, geometry.Pose(*self.poses[0]))
+        world.predict_world()
+        value = world.get_state_on_coordiante(geometry.Point(35, 40),
+                                              blurred=False)
+        scan(world, simulated, geometry.Pose(*self.poses[3]))
+        world.predict_world()
+        self.assertEqual(world.get_state_on_coordiante(
+            geometry.Point(35, 40), blurred=False), value)
+
+
+class TestLogOddsModel(unittest.TestCase):
+    def setUp(self):
+        self.model = occupancy.LogOddsModel(p_hit=0.7, p_miss=0.4,
+                                            p_min=0.12, p_max=0.97)
+        self.world = oworld.ObservedWorld(self.model)
+        self.simulated = sworld.PredefinedWorld(3)
+
+    def test_values_are_clamped(self):
+        pose = geometry.Pose(40, 40, 180)
+        for _ in range(30):
+            scan(self.world, self.simulated, pose)
+            self.world.predict_world()
+        for tile in self.world.grid.tiles.values():
+            self.assertEqual(tile.dtype, np.float32)
+            self.assertTrue(np.all(tile >= self.model.limits[0] - 1e-6))
+            self.assertTrue(np.all(tile <= self.model.limits[1] + 1e-6))
+
+    def test_fixed_point(self):
+        model = occupancy.LogOddsModel(p_hit=0.7, p_miss=0.4, p_min=0.12,
+                                       p_max=0.97, dtype=np.int16)
+        world = oworld.ObservedWorld(model)
+        for pose in [(40, 40, 180), (40, 10, 90)]:
+            for _ in range(20):
+                scan(world, self.simulated, geometry.Pose(*pose))
+                scan(self.world, self.simulated, geometry.Pose(*pose))
+                world.predict_world()
+                self.world.predict_world()
+        for tile in world.grid.tiles.values():
+            self.assertEqual(tile.dtype, np.int16)
+            self.assertTrue(np.all(tile >= model.limits[0] - 1))
+            self.assertTrue(np.all(tile <= model.limits[1] + 1))
+        # Same evidence as with float32 storage, up to rounding
+        self.assertEqual(world.last_prediction.dtype, np.float32)
+        np.testing.assert_allclose(world.last_prediction,
+                                   self.world.last_prediction, atol=0.05)
+
+    def test_unsupported_dtype(self):
+        with self.assertRaises(ValueError):
+            occupancy.LogOddsModel(dtype=bool)
+
+    def test_evidence_scale(self):
+        add_observations(self.world, (0, 0), [(10, 0), (10, 0), (0, 10)])
+        self.world.predict_world()
+
+        self.assertGreater(self.world.get_state_on_coordiante(
+            geometry.Point(10, 0), blurred=False), 1)
+        self.assertLess(self.world.get_state_on_coordiante(
+            geometry.Point(5, 0), blurred=False), -10)
+        self.assertFalse(self.world.is_surrrounding_free(
+            geometry.Point(8, 0), radius=2, threshold=1))
+        self.assertTrue(self.world.is_surrrounding_free(
+            geometry.Point(0, 5), radius=1, threshold=1))
+
+
+class TestNeighbourhoodQueries(unittest.TestCase):
+    def setUp(self):
+        simulated = sworld.PredefinedWorld(4)
+        self.world = oworld.ObservedWorld()
+        for pose in [(5, 5, 90), (10, 12, 0), (30, 10, 45)]:
+            scan(self.world, simulated, geometry.Pose(*pose))
+        self.world.predict_world()
+
+    def test_parity(self):
+        min_border, max_border = self.world.get_world_borders()
+        rng = np.random.default_rng(2)
+        xs = rng.uniform(min_border.x - 8, max_border.x + 8, size=300)
+        ys = rng.uniform(min_border.y - 8, max_border.y + 8, size=300)
+        for (x, y) in zip(xs, ys):
+            location = geometry.Point(x, y)
+            for radius in [0, 2, 5]:
+                area = self.world.get_area_around_point(location, radius)
+                for threshold in [0.0, 1.0]:
+                    self.assertEqual(
+                        self.world.is_surrrounding_free(location, radius,
+                                                        threshold),
+                        not np.any(area > threshold))
+                total = (2 * radius + 1) ** 2
+                expected = (np.sum(abs(area) < 1) + total - area.size) / total
+                self.assertAlmostEqual(
+                    self.world.perc_unknown_surround(location, radius),
+                    expected)
@@ -0,0 +1,111 @@
+import pickle
+import random
+import threading
+import time
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.planner.deadline as sdeadline
+import slam.planner.parallel as sparallel
+import slam.planner.path as spath
+import slam.world.observed as oworld
+from tests.helpers import add_observations
+
+
+def create_world() -> oworld.ObservedWorld:
+    """
+    Returns a world whose right part is closed off by a wall.
+    """
+    world = oworld.ObservedWorld()
+    add_observations(world, (0, 0), [(59, 39)])
+    world.predict_world()
+    prediction = np.full([40, 60], -20.0)
+    prediction[:, 30] = 30
+    world.last_prediction_blurred = prediction
+    world.prediction_version += 1
+    return world
+
+
+class TestWorldSnapshot(unittest.TestCase):
+    def test_pickle(self):
+        world = create_world()
+        world.get_configuration_space(threshold=1.0)
+        snapshot = pickle.loads(pickle.dumps(oworld.WorldSnapshot(world)))
+
+        self.assertFalse(snapshot.last_prediction_blurred.flags.writeable)
+        self.assertEqual(snapshot.get_world_borders(),
+                         world.get_world_borders())
+        self.assertTrue(snapshot.point_in_bounds(geometry.Point(10, 10)))
+        self.assertFalse(snapshot.point_in_bounds(geometry.Point(10, 50)))
+        self.assertTrue(snapshot.point_in_bounds(snapshot.get_random_point()))
+        space = snapshot.get_configuration_space(threshold=1.0)
+        self.assertEqual(space.distance_to_obstacle(geometry.Point(27, 5)), 3)
+        self.assertIs(snapshot.get_configuration_space(threshold=1.0), space)
+
+
+class TestParallelGoalEvaluator(unittest.TestCase):
+    def setUp(self):
+        random.seed(2)
+        self.snapshot = oworld.WorldSnapshot(create_world())
+        self.start = geometry.Point(10, 20)
+        self.reachable = geometry.Point(20, 5)
+        self.unreachable = geometry.Point(50, 20)
+        self.kwargs = {"max_step_size": 10, "robot_size": 4}
+
+    def plan(self, evaluator: sparallel.ParallelGoalEvaluator):
+        try:
+            return evaluator.plan(self.snapshot, self.start,
+                                  [self.unreachable, self.reachable],
+                                  sdeadline.Deadline(30))
+        finally:
+            evaluator.shutdown()
+
+    def assertPathTo(self, path, goal):
+        self.assertEqual(path[0], self.start)
+        self.assertLess(path[-1].distance_to(goal), 5)
+
+    def test_processes(self):
+        evaluator = sparallel.ParallelGoalEvaluator(
+            spath.GridPathPlanner, self.kwargs, workers=2)
+        goal, path = self.plan(evaluator)
+        self.assertEqual(goal, self.reachable)
+        self.assertPathTo(path, self.reachable)
+
+    def test_cancel_other_workers(self):
+        # Without cancellation, RRT would search for the unreachable goal
+        # until it adds 10^6 nodes
+        kwargs = {**self.kwargs, "max_nodes": 10 ** 6}
+        evaluator = sparallel.ParallelGoalEvaluator(
+            spath.PathPlanner, kwargs, workers=2, use_processes=False)
+        start_time = time.monotonic()
+        goal, path = self.plan(evaluator)
+        self.assertLess(time.monotonic() - start_time, 10)
+        self.assertEqual(goal, self.reachable)
+        self.assertPathTo(path, self.reachable)
+        self.assertFalse(evaluator.cancel_event.is_set())
+
+    def test_no_path(self):
+        evaluator = sparallel.ParallelGoalEvaluator(
+            spath.GridPathPlanner, self.kwargs, workers=2,
+            use_processes=False)
+        self.reachable = geometry.Point(40, 30)
+        self.assertEqual(self.plan(evaluator), (None, None))
+
+    def test_shutdown_during_planning(self):
+        kwargs = {**self.kwargs, "max_nodes": 10 ** 6}
+        evaluator = sparallel.ParallelGoalEvaluator(
+            spath.PathPlanner, kwargs, workers=1, use_processes=False)
+        results = []
+        planning = threading.Thread(target=lambda: results.append(
+            evaluator.plan(self.snapshot, self.start, [self.unreachable] * 3,
+                           sdeadline.Deadline(30))))
+        start_time = time.monotonic()
+        planning.start()
+        time.sleep(0.5)
+        # Cancels the running plan and the goals waiting for a worker
+        evaluator.shutdown()
+        planning.join()
+        self.assertLess(time.monotonic() - start_time, 10)
+        self.assertEqual(results, [(None, None)])
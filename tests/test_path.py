@@ -0,0 +1,198 @@
+import queue
+import random
+import threading
+import unittest
+
+import numpy as np
+
+import slam.common.geometry as geometry
+import slam.planner.deadline as sdeadline
+import slam.planner.path as spath
+import slam.world.cspace as cspace
+import slam.world.observed as oworld
+import slam.world.simulated as sworld
+from tests.helpers import add_observations, scan
+
+
+def path_cost(node) -> float:
+    cost = 0
+    while node.parent is not None:
+        cost += node.location.distance_to(node.parent.location)
+        node = node.parent
+    return cost
+
+
+class TestRrtStarPathPlanner(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        simulated = sworld.PredefinedWorld(7)
+        self.world = oworld.ObservedWorld()
+        for x in range(10, 80, 15):
+            for y in range(10, 60, 15):
+                scan(self.world, simulated, geometry.Pose(x, y, 0),
+                     view_angle=360, precision=15)
+        self.world.predict_world()
+        self.planner = spath.RrtStarPathPlanner(
+            self.world, threading.Event(), max_step_size=20,
+            min_step_size=3, data_queue=None, robot_size=10)
+        self.start = geometry.Point(20, 20)
+        self.goal = geometry.Point(60, 10)
+
+    def test_costs(self):
+        graph = self.planner.get_tree(self.start)
+        node = self.planner.find_path(graph, self.goal)
+        self.assertLess(node.location.distance_to(self.goal), 5)
+        for i in range(0, len(graph), 7):
+            self.assertAlmostEqual(graph.costs[i], path_cost(graph[i]))
+
+    def test_tree_reuse(self):
+        graph = self.planner.get_tree(self.start)
+        node = self.planner.find_path(graph, self.goal)
+        size = len(graph)
+        while node.parent.parent is not None:
+            node = node.parent
+        step = node.location
+
+        reused = self.planner.get_tree(step)
+        self.assertIs(reused, graph)
+        self.assertEqual(len(reused), size)
+        root = reused.nearest(step)
+        self.assertIsNone(root.parent)
+        self.assertEqual(root.location, step)
+        self.assertEqual(np.sum(reused.parents[:len(reused)] < 0), 1)
+        for i in range(0, len(reused), 7):
+            self.assertAlmostEqual(reused.costs[i], path_cost(reused[i]))
+        # The goal is already reached by the tree
+        self.assertLess(self.planner.find_path(reused, self.goal).location
+                        .distance_to(self.goal), 5)
+        self.assertEqual(len(reused), size)
+
+    def test_prune(self):
+        graph = self.planner.get_tree(self.start)
+        self.planner.find_path(graph, self.goal)
+        blocked = graph.locations[len(graph) // 2]
+        for _ in range(5):
+            add_observations(self.world, self.start, [blocked])
+        self.world.predict_world()
+
+        graph = self.planner.get_tree(self.start)
+        space = self.world.get_configuration_space(threshold=1.0)
+        for node in graph:
+            if node.parent is not None:
+                self.assertTrue(space.is_point_free(node.location, 5))
+                self.assertTrue(space.is_segment_free(
+                    node.parent.location, node.location, 5))
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        prediction = np.full([40, 60], -20.0)
+        prediction[:, 30] = 30  # Wall without a gap
+        self.world = oworld.ObservedWorld()
+        add_observations(self.world, (0, 0), [(59, 39)])
+        self.world.predict_world()
+        self.world.last_prediction_blurred = prediction
+        self.world.prediction_version += 1
+        self.start = geometry.Point(10, 20)
+        self.goal = geometry.Point(50, 20)
+
+    def test_deadline(self):
+        deadline = sdeadline.Deadline()
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.used(), 0)
+        self.assertTrue(sdeadline.Deadline(0).expired())
+        self.assertGreaterEqual(sdeadline.Deadline(0).used(), 1)
+
+    def test_partial_path(self):
+        planner = spath.PathPlanner(self.world, threading.Event(),
+                                    max_step_size=10, data_queue=queue.Queue(),
+                                    robot_size=4, max_nodes=10 ** 6)
+        deadline = sdeadline.Deadline(0.1)
+        path = planner.plan_path(self.start, self.goal, deadline)
+        self.assertLess(deadline.elapsed(), 0.5)
+        self.assertEqual(path[0], self.start)
+        self.assertLess(path[-1].distance_to(self.goal),
+                        self.start.distance_to(self.goal))
+
+        graph = planner.get_tree(self.start)
+        self.assertIsNone(planner.find_path(graph, self.goal,
+                                            sdeadline.Deadline(0)))
+
+    def test_partial_grid_path(self):
+        planner = spath.GridPathPlanner(self.world, threading.Event(),
+                                        max_step_size=10,
+                                        data_queue=queue.Queue(),
+                                        robot_size=4)
+        self.assertIsNone(planner.plan_path(self.start, self.goal))
+        path = planner.plan_path(self.start, self.goal,
+                                 sdeadline.Deadline(0))
+        self.assertEqual(path[0], self.start)
+        self.assertLess(path[-1].distance_to(self.goal),
+                        self.start.distance_to(self.goal))
+
+
+class TestGridPathPlanner(unittest.TestCase):
+    def setUp(self):
+        simulated = sworld.PredefinedWorld(7)
+        self.world = oworld.ObservedWorld()
+        for x in range(10, 80, 15):
+            for y in range(10, 60, 15):
+                scan(self.world, simulated, geometry.Pose(x, y, 0),
+                     view_angle=360, precision=15)
+        self.world.predict_world()
+        self.data_queue = queue.Queue()
+        self.planner = spath.GridPathPlanner(
+            self.world, threading.Event(), max_step_size=20,
+            data_queue=self.data_queue, robot_size=10)
+
+    def test_waypoints(self):
+        start, goal = geometry.Point(20, 20), geometry.Point(60, 10)
+        path = self.planner.find_grid_path(start, goal)
+        self.assertEqual(path[0], start)
+        self.assertEqual(path[-1], goal)
+        space = self.world.get_configuration_space(threshold=1.0)
+        for (a, b) in zip(path, path[1:]):
+            self.assertLessEqual(a.distance_to(b), 20)
+            self.assertTrue(space.is_segment_free(a, b, 5))
+
+        self.assertEqual(self.planner.plan_next_step(start, goal), path[1])
+        self.assertEqual(self.data_queue.qsize(), len(path) + 1)
+
+    def test_unreachable(self):
+        goal = self.world.prediction_origin
+        self.assertIsNone(self.planner.plan_next_step(geometry.Point(20, 20),
+                                                      goal))
+
+
+class TestShortcutPath(unittest.TestCase):
+    def setUp(self):
+        prediction = np.full([40, 60], -20.0)
+        prediction[:30, 30] = 30  # Wall with a gap at the top
+        self.space = cspace.ConfigurationSpace(prediction,
+                                               geometry.Point(0, 0))
+
+    def test_free_space(self):
+        path = [geometry.Point(5 + 2 * i, 10 + (-1) ** i * 3)
+                for i in range(10)]
+        self.assertEqual(spath.shortcut_path(path, self.space, 2),
+                         [path[0], path[-1]])
+
+        shortcut = spath.shortcut_path(path, self.space, 2, max_length=7)
+        self.assertEqual(shortcut[0], path[0])
+        self.assertEqual(shortcut[-1], path[-1])
+        self.assertLess(len(shortcut), len(path))
+        for (a, b) in zip(shortcut, shortcut[1:]):
+            self.assertLessEqual(a.distance_to(b), 7)
+
+    def test_around_wall(self):
+        path = [geometry.Point(20, 10), geometry.Point(22, 20),
+                geometry.Point(25, 34), geometry.Point(30, 35),
+                geometry.Point(35, 34), geometry.Point(38, 20),
+                geometry.Point(40, 10)]
+        shortcut = spath.shortcut_path(path, self.space, 2)
+        self.assertEqual(shortcut[0], path[0])
+        self.assertEqual(shortcut[-1], path[-1])
+        self.assertLess(len(shortcut), len(path))
+        for (a, b) in zip(shortcut, shortcut[1:]):
+            self.assertTrue(self.space.is_segment_free(a, b, 2))
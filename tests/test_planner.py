@@ -0,0 +1,77 @@
+import queue
+import threading
+import unittest
+
+import slam.common.geometry as geometry
+import slam.planner.action as action
+import slam.planner.planner as planner
+import slam.world.observed as oworld
+from slam.common.enums import ObservationType
+from tests.helpers import add_observations
+
+
+class TestSelectNextActions(unittest.TestCase):
+    def setUp(self):
+        self.world = oworld.ObservedWorld()
+        for _ in range(5):
+            add_observations(self.world, (0, 0), [(40, 0)],
+                             ObservationType.FREE)
+        self.world.predict_world()
+        self.pose = geometry.Pose(0, 0, 90)
+        self.path = [geometry.Point(10, 0), geometry.Point(20, 0),
+                     geometry.Point(30, 0), geometry.Point(30, 20)]
+
+    def create_planner(self, max_waypoints: int) -> planner.RrtPlanner:
+        def rotate_move(angle: float, distance: float):
+            self.pose.rotate(angle)
+            self.pose.move_forward(distance)
+
+        rrt = planner.RrtPlanner(
+            self.world, queue.Queue(),
+            turn_action=action.Action(self.pose.rotate),
+            move_action=action.Action(self.pose.move_forward),
+            turn_move_action=action.Action(rotate_move),
+            shutdown_flag=threading.Event(), max_waypoints=max_waypoints)
+        rrt.select_new_path = lambda pose: self.path
+        return rrt
+
+    def test_known_free_segment(self):
+        self.assertTrue(self.world.is_segment_known_free(
+            geometry.Point(10, 0), geometry.Point(30, 0)))
+        self.assertFalse(self.world.is_segment_known_free(
+            geometry.Point(30, 0), geometry.Point(30, 20)))
+        self.assertFalse(self.world.is_segment_known_free(
+            geometry.Point(30, 0), geometry.Point(60, 0)))
+
+    def test_single_waypoint(self):
+        actions = self.create_planner(1).select_next_actions(self.pose)
+        self.assertEqual(len(actions), 1)
+
+    def test_waypoints_in_known_space(self):
+        actions = self.create_planner(5).select_next_actions(self.pose)
+        # The last segment leads to unknown space
+        self.assertEqual(len(actions), 3)
+        for a in actions:
+            a.execute()
+        self.assertAlmostEqual(self.pose.position.x, 30)
+        self.assertAlmostEqual(self.pose.position.y, 0)
+
+    def test_max_waypoints(self):
+        actions = self.create_planner(2).select_next_actions(self.pose)
+        self.assertEqual(len(actions), 2)
+
+
+class TestFailedPlans(unittest.TestCase):
+    def test_count_failed_plans(self):
+        world = oworld.ObservedWorld()
+        wall = [(15, y) for y in range(-10, 11)]
+        for _ in range(5):
+            add_observations(world, (0, 0), wall)
+        rrt = planner.RrtPlanner(world, queue.Queue(), None, None, None,
+                                 threading.Event())
+        self.assertEqual(rrt.failed_plans, 0)
+        # The goal behind the wall can't be reached
+        rrt.select_from_frontier = lambda *args: geometry.Point(30, 0)
+        rrt.path_planner.plan_path = lambda *args: None
+        self.assertIsNone(rrt.select_new_path(geometry.Pose(0, 0, 0)))
+        self.assertEqual(rrt.failed_plans, 1)
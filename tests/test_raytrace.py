@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+import slam.world.raytrace as raytrace
+
+
+class TestTraceRays(unittest.TestCase):
+    def trace_one(self, x_start, y_start, x_end, y_end, **kwargs):
+        ray, x, y = raytrace.trace_rays([x_start], [y_start], [x_end],
+                                        [y_end], **kwargs)
+        self.assertTrue(np.all(ray == 0))
+        return list(zip(x.tolist(), y.tolist()))
+
+    def test_horizontal(self):
+        cells = self.trace_one(0, 0, 4, 0)
+        self.assertEqual(cells, [(1, 0), (2, 0), (3, 0)])
+
+    def test_reversed(self):
+        cells = self.trace_one(4, 2, 4, -2, include_start=True,
+                               include_end=True)
+        self.assertEqual(cells, [(4, 2), (4, 1), (4, 0), (4, -1), (4, -2)])
+
+    def test_diagonal(self):
+        cells = self.trace_one(0, 0, -3, 3)
+        self.assertEqual(cells, [(-1, 1), (-2, 2)])
+
+    def test_zero_length(self):
+        self.assertEqual(self.trace_one(2, 2, 2, 2), [])
+        self.assertEqual(self.trace_one(2, 2, 2, 2, include_start=True,
+                                        include_end=True), [(2, 2)])
+
+    def test_connected(self):
+        rng = np.random.default_rng(0)
+        x_start, y_start, x_end, y_end = rng.integers(-20, 20, size=(4, 50))
+        ray, x, y = raytrace.trace_rays(x_start, y_start, x_end, y_end,
+                                        include_start=True, include_end=True)
+        for i in range(50):
+            xs, ys = x[ray == i], y[ray == i]
+            self.assertEqual((xs[0], ys[0]), (x_start[i], y_start[i]))
+            self.assertEqual((xs[-1], ys[-1]), (x_end[i], y_end[i]))
+            steps = np.maximum(np.abs(np.diff(xs)), np.abs(np.diff(ys)))
+            self.assertTrue(np.all(steps == 1))
+
+
+class TestAddOnRays(unittest.TestCase):
+    def test_add_on_rays(self):
+        grid = np.zeros([5, 5])
+        raytrace.add_on_rays(grid, [0, 0], [2, 2], [4, 6], [2, 2], -6)
+        expected = np.zeros([5, 5])
+        expected[2, 1:4] = -6
+        expected[2, 1:5] += -6
+        self.assertTrue(np.array_equal(grid, expected))
@@ -0,0 +1,47 @@
+import queue
+import random
+import unittest
+
+import numpy as np
+
+import slam.common.clock as sclock
+
+try:
+    import slam.agent.robot as robot
+except ImportError:
+    robot = None  # slam/config.py is created by make init
+
+
+class SlowDisplayQueue(queue.Queue):
+    """
+    Queue that looks non-empty for the first polls, like a queue of a
+    display that is still drawing.
+    """
+    def __init__(self, busy_polls: int):
+        super().__init__()
+        self.busy_polls = busy_polls
+
+    def empty(self) -> bool:
+        if self.busy_polls > 0:
+            self.busy_polls -= 1
+            return False
+        return True
+
+
+@unittest.skipIf(robot is None, "slam/config.py is missing")
+class TestSimulatedRobot(unittest.TestCase):
+    def robot_time_of_action(self, data_queue: queue.Queue) -> float:
+        random.seed(0)
+        np.random.seed(0)
+        clock = sclock.VirtualClock()
+        agent = robot.SimulatedRobot(data_queue, world_number=3,
+                                     limited_view=30.0, clock=clock)
+        try:
+            agent.perform_action()
+        finally:
+            agent.die()
+        return clock.time()
+
+    def test_display_does_not_take_robot_time(self):
+        self.assertEqual(self.robot_time_of_action(SlowDisplayQueue(0)),
+                         self.robot_time_of_action(SlowDisplayQueue(3)))
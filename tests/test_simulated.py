@@ -0,0 +1,148 @@
+import queue
+import unittest
+
+import numpy as np
+
+import slam.agent.sensor as sensor
+import slam.common.clock as sclock
+import slam.common.geometry as geometry
+import slam.world.simulated as sworld
+from slam.common.enums import ObservationType
+
+
+def marched_distance(world, angle, step=0.001):
+    """
+    Walks along the ray in small steps until it reaches an obstacle or the
+    border of the world.
+    """
+    angle = np.radians(world.pose.orientation.in_degrees() + angle)
+    x, y = world.pose.position.x, world.pose.position.y
+    distance = 0.0
+    while True:
+        cx = int(np.floor(x + distance * np.cos(angle) + 0.5))
+        cy = int(np.floor(y + distance * np.sin(angle) + 0.5))
+        if not world.location_in_range(cx, cy) or world.map[cy][cx] != 0:
+            return distance
+        distance += step
+
+
+class TestCastRays(unittest.TestCase):
+    def test_axis_aligned(self):
+        world = sworld.SimulatedWorld(30, 50, geometry.Pose(5, 5, 90), [])
+        np.testing.assert_allclose(world.cast_rays([0, 90, 180, -90]),
+                                   [44.5, 5.5, 5.5, 24.5], atol=1e-5)
+        world.update_pose(geometry.Pose(5, 5, 0))
+        self.assertAlmostEqual(world.get_distance_to_wall(45),
+                               np.sqrt(2) * 24.5, places=5)
+
+    def test_matches_marching(self):
+        rng = np.random.default_rng(0)
+        for key in [1, 4, 7]:
+            world = sworld.PredefinedWorld(key)
+            angles = rng.uniform(-180, 180, 10)
+            distances = world.cast_rays(angles)
+            for (angle, distance) in zip(angles, distances):
+                self.assertAlmostEqual(distance,
+                                       marched_distance(world, angle),
+                                       delta=0.002)
+
+    def test_max_range(self):
+        world = sworld.PredefinedWorld(3)  # Obstacle from x = 20 to 30
+        world.update_pose(geometry.Pose(40, 25, 180))
+        np.testing.assert_allclose(world.cast_rays([0, 90], 20),
+                                   [9.5, np.inf], atol=1e-5)
+        np.testing.assert_allclose(world.cast_rays([0, 90]), [9.5, 25.5],
+                                   atol=1e-5)
+        self.assertEqual(len(world.cast_rays([])), 0)
+
+    def test_inside_obstacle(self):
+        world = sworld.PredefinedWorld(3)
+        world.update_pose(geometry.Pose(25, 25, 0))
+        np.testing.assert_array_equal(world.cast_rays([0, 90]), [0, 0])
+
+    def test_from_array(self):
+        obstacle_map = np.zeros((50, 50), dtype=bool)
+        obstacle_map[20:31, 20:31] = True
+        world = sworld.SimulatedWorld.from_array(obstacle_map,
+                                                 geometry.Pose(40, 40, 180))
+        self.assertIs(world.map, obstacle_map)
+        predefined = sworld.PredefinedWorld(3)
+        angles = np.arange(0, 360, 10)
+        np.testing.assert_allclose(world.cast_rays(angles),
+                                   predefined.cast_rays(angles))
+
+    def test_random_free_pose(self):
+        world = sworld.PredefinedWorld(7)
+        for seed in range(10):
+            pose = world.random_free_pose(clearance=5, seed=seed)
+            x, y = int(pose.position.x), int(pose.position.y)
+            self.assertFalse(np.any(world.map[y-5:y+6, x-5:x+6]))
+        self.assertEqual(list(world.random_free_pose(seed=3)),
+                         list(world.random_free_pose(seed=3)))
+        with self.assertRaises(ValueError):
+            world.random_free_pose(clearance=40)
+
+
+class TestSimulatedSensors(unittest.TestCase):
+    def test_limited_view(self):
+        world = sworld.PredefinedWorld(3)
+        world.update_pose(geometry.Pose(40, 25, 180))
+        scanner = sensor.LimitedInformationSensor(
+            world, queue.Queue(), max_distance=20, safety_distance=5)
+        frame = scanner.measure_frame([0, 90])
+        self.assertEqual(len(frame), 2)
+        obstacle, free = frame[0], frame[1]
+        self.assertEqual(obstacle.type, ObservationType.OBSTACLE)
+        self.assertAlmostEqual(obstacle.polar.radius, 9.5, places=5)
+        self.assertEqual(free.type, ObservationType.FREE)
+        self.assertAlmostEqual(free.polar.radius, 15)
+        self.assertAlmostEqual(scanner.measure(0).polar.radius, 9.5,
+                               places=5)
+
+    def test_frame_to_observations(self):
+        world = sworld.PredefinedWorld(7)
+        scanner = sensor.FullInformationSensor(world, queue.Queue(),
+                                               precision=30)
+        pose = geometry.Pose(20, 20, 30)
+        world.update_pose(pose)
+        frame = scanner.measure_frame(np.arange(-180, 181, 30))
+        observations = frame.to_observations(pose)
+        self.assertEqual(observations.location, pose.position)
+        for i in range(len(frame)):
+            polar = frame[i].polar
+            polar.change(angle=pose.orientation.in_degrees())
+            location = pose.position.plus_polar(polar)
+            self.assertEqual(observations[i].location, location)
+            self.assertEqual(observations[i].type, ObservationType.OBSTACLE)
+
+        measurements = [frame[i] for i in range(len(frame))]
+        rebuilt = sensor.ScanFrame.from_measurements(measurements)
+        np.testing.assert_allclose(rebuilt.ranges, frame.ranges)
+
+    def test_hits_observed_in_obstacle_cells(self):
+        """
+        Observed locations round (half to even, like
+        ObservedWorld.locations_to_cells) into the hit cells for odd and even
+        positions of walls.
+        """
+        pose = geometry.Pose(10, 10, 0)
+        for wall_x in [21, 22, 23, 24]:
+            simulated = sworld.SimulatedWorld(
+                40, 40, pose, [(wall_x, wall_x, 0, 39), (0, 39, 25, 25)])
+            scanner = sensor.FullInformationSensor(simulated, queue.Queue())
+            frame = scanner.measure_frame([0, 90])
+            observations = frame.to_observations(pose)
+            xs, ys = np.rint(observations.xs), np.rint(observations.ys)
+            np.testing.assert_array_equal(xs, [wall_x, 10])
+            np.testing.assert_array_equal(ys, [10, 25])
+
+    def test_scan_with_virtual_clock(self):
+        world = sworld.PredefinedWorld(7)
+        clock = sclock.VirtualClock()
+        observation_queue = queue.Queue()
+        scanner = sensor.FullInformationSensor(world, observation_queue,
+                                               precision=10, clock=clock)
+        scanner.scan()
+        frame = observation_queue.get_nowait()
+        self.assertEqual(len(frame), 37)
+        self.assertAlmostEqual(clock.time(), 0.2 * 37)
@@ -5,7 +5,7 @@ import numpy as np
 import slam.common.datapoint as datapoint
 import slam.common.geometry as geometry
 import slam.display.storage as storage
-from slam.common.enums import Existence
+from slam.common.enums import Existence, ObservationType
 
 raw_scatter_data = np.array([
     [5, 7, 0.1, 0.5, 0.6, 0.3],
@@ -54,6 +54,20 @@ class TestScatterStorage(unittest.TestCase):
         self.assertTrue(
             arrays_almost_equal(stored_temporary_data, np.empty([0, 6])))
 
+    def test_add_batch(self):
+        observations = datapoint.Observations(
+            0, 0, [1, 2, 3], [4, 5, 6],
+            [ObservationType.OBSTACLE, ObservationType.FREE,
+             ObservationType.OBSTACLE])
+        self.storage.add_batch(observations)
+        batched = self.storage.get_data()
+
+        self.storage = storage.ScatterStorage()
+        for i in range(len(observations)):
+            self.storage.add_data(observations[i])
+        for (a, b) in zip(batched, self.storage.get_data()):
+            self.assertTrue(arrays_almost_equal(a, b))
+
 
 raw_heatmap_data = np.array([
     [10, 9],
@@ -0,0 +1,86 @@
+import itertools
+import unittest
+
+import numpy as np
+
+import slam.planner.frontier as sfrontier
+import slam.planner.tour as stour
+
+
+def distance_matrix(points):
+    points = np.array(points, dtype=float)
+    return np.hypot(points[:, None, 0] - points[None, :, 0],
+                    points[:, None, 1] - points[None, :, 1])
+
+
+def shortest_tour_length(distances):
+    n = len(distances)
+    return min(stour.tour_length([0] + list(p), distances)
+               for p in itertools.permutations(range(1, n)))
+
+
+def cluster_at(x, y):
+    return sfrontier.FrontierCluster(
+        np.array([[x - 1, y], [x, y], [x + 1, y]], dtype=float))
+
+
+class TestTour(unittest.TestCase):
+    def test_line(self):
+        # Visiting the closer end first is shorter
+        distances = distance_matrix([(0, 0), (-10, 0), (5, 0), (30, 0),
+                                     (-20, 0)])
+        tour = stour.two_opt(stour.nearest_insertion(distances), distances)
+        self.assertIn(tour[:2], [[0, 1], [0, 4]])
+        self.assertAlmostEqual(stour.tour_length(tour, distances), 70)
+
+    def test_random_tours(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            distances = distance_matrix(rng.uniform(0, 100, [7, 2]))
+            tour = stour.nearest_insertion(distances)
+            self.assertEqual(tour[0], 0)
+            self.assertEqual(sorted(tour), list(range(7)))
+            improved = stour.two_opt(tour, distances)
+            self.assertEqual(improved[0], 0)
+            self.assertEqual(sorted(improved), list(range(7)))
+            length = stour.tour_length(improved, distances)
+            self.assertLessEqual(length, stour.tour_length(tour, distances))
+            self.assertLessEqual(length,
+                                 1.2 * shortest_tour_length(distances))
+
+    def test_trivial(self):
+        self.assertEqual(stour.nearest_insertion(np.zeros([0, 0])), [])
+        self.assertEqual(stour.nearest_insertion(np.zeros([1, 1])), [0])
+
+
+class TestFrontierTour(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def get_distances(self, clusters):
+        self.calls += 1
+        return distance_matrix([(0, 0)] + [(c.centroid.x, c.centroid.y)
+                                           for c in clusters])
+
+    def test_keep_tour(self):
+        tour = stour.FrontierTour(match_distance=5)
+        clusters = [cluster_at(30, 0), cluster_at(10, 0), cluster_at(20, 0)]
+        ordered = tour.order(clusters, self.get_distances)
+        self.assertEqual(ordered, [clusters[1], clusters[2], clusters[0]])
+
+        # The same clusters with slightly moved centroids
+        moved = [cluster_at(21, 1), cluster_at(31, 0), cluster_at(11, 0)]
+        ordered = tour.order(moved, self.get_distances)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(ordered, [moved[2], moved[0], moved[1]])
+
+        # A cluster vanished
+        ordered = tour.order(moved[:2], self.get_distances)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(ordered, [moved[0], moved[1]])
+
+        # A new cluster appeared in place of the vanished one
+        tour.order([cluster_at(21, 0), cluster_at(30, 30)],
+                   self.get_distances)
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(tour.order([], self.get_distances), [])